@@ -1,139 +1,225 @@
-from typing import Dict
+from typing import Callable, Tuple
 
 from Instruction import Instruction
 from InterpretError import InterpretErrorEnum, InterpretError
-from Symbol import SymbolType, SymbolTypeHelper, Symbol
-from Variable import Variable
+from Symbol import Symbol
+from Value import Value, ValueType, bool_value
 
 
 class ArithmeticManager:
+    """
+    Arithmetic, relational, boolean and conversion instructions. Every instruction has stack variant (ADDS, LTS, ...)
+    which takes operands from data stack (the second operand is on top) and pushes the result back.
+    """
+
     def __init__(self, interpret):
         self.interpret = interpret
 
     def add(self, instruction: Instruction):
-        var, symb1, symb2 = self._add_sub_mul_idiv(instruction)
-        var.symbol_value.value = symb1.value + symb2.value
+        self._binary(instruction, self._add)
 
     def sub(self, instruction: Instruction):
-        var, symb1, symb2 = self._add_sub_mul_idiv(instruction)
-        var.symbol_value.value = symb1.value - symb2.value
+        self._binary(instruction, self._sub)
 
     def mul(self, instruction: Instruction):
-        var, symb1, symb2 = self._add_sub_mul_idiv(instruction)
-        var.symbol_value.value = symb1.value * symb2.value
+        self._binary(instruction, self._mul)
 
     def idiv(self, instruction: Instruction):
-        var, symb1, symb2 = self._add_sub_mul_idiv(instruction)
-        if symb2.value == 0:
-            raise InterpretError(InterpretErrorEnum.WRONG_OPERAND_VALUE, "Division by zero")
-        var.symbol_value.value = symb1.value // symb2.value
+        self._binary(instruction, self._idiv)
 
     def lt(self, instruction: Instruction):
-        var, symb1, symb2 = self._lt_gt_eq(instruction)
-        self._check_if_same(symb1, symb2)
-        if symb1.type == SymbolType.NIL:
-            raise InterpretError(InterpretErrorEnum.WRONG_OPERAND_TYPE, "Cannot compare with nil")
-        var.symbol_value.value = symb1.value < symb2.value
+        self._binary(instruction, self._lt)
 
     def gt(self, instruction: Instruction):
-        var, symb1, symb2 = self._lt_gt_eq(instruction)
-        self._check_if_same(symb1, symb2)
-        if symb1.type == SymbolType.NIL:
-            raise InterpretError(InterpretErrorEnum.WRONG_OPERAND_TYPE, "Cannot compare with nil")
-        var.symbol_value.value = symb1.value > symb2.value
+        self._binary(instruction, self._gt)
 
     def eq(self, instruction: Instruction):
-        var, symb1, symb2 = self._lt_gt_eq(instruction)
-
-        # if both symbols are non-nil, they have to be the same type
-        if symb1.type != SymbolType.NIL and symb2.type != SymbolType.NIL:
-            self._check_if_same(symb1, symb2)
-            var.symbol_value.value = symb1.value == symb2.value
-        else:
-            # at least one of symbols is nil -> compare types
-            var.symbol_value.value = symb1.type == symb2.type
+        self._binary(instruction, self._eq)
 
     def and_fn(self, instruction: Instruction):
-        var, symb1, symb2 = self._and_or(instruction)
-        var.symbol_value.value = symb1.value and symb2.value
+        self._binary(instruction, self._and)
 
     def or_fn(self, instruction: Instruction):
-        var, symb1, symb2 = self._and_or(instruction)
-        var.symbol_value.value = symb1.value or symb2.value
+        self._binary(instruction, self._or)
 
     def not_fn(self, instruction: Instruction):
-        instruction.check_format([[SymbolType.VAR], SymbolTypeHelper.DATABLE_NIL])
-
         symb_var: Symbol = instruction.args.get(1)
-        symb1: Symbol = self.interpret.memory.symbol_or_var_symbol(instruction.args.get(2))
-        var: Variable = self.interpret.memory.get_variable(symb_var.value, symb_var.frame)
-
-        if symb1.type != SymbolType.BOOL:
-            raise InterpretError(InterpretErrorEnum.WRONG_OPERAND_TYPE, "Not can be used only with bool")
+        symb = self.interpret.memory.value_of(instruction.args.get(2))
+        self.interpret.memory.check_variable(symb_var)
 
-        var.symbol_value.value = not symb1.value
-        var.symbol_value.type = SymbolType.BOOL
+        self.interpret.memory.set_value(symb_var, self._not(symb))
 
     def int2char(self, instruction: Instruction):
-        instruction.check_format([[SymbolType.VAR], [SymbolType.VAR, SymbolType.INT]])
         symb_var: Symbol = instruction.args.get(1)
-        symb1: Symbol = self.interpret.memory.symbol_or_var_symbol(instruction.args.get(2))
-        if symb1.type != SymbolType.INT:
+        symb = self.interpret.memory.value_of(instruction.args.get(2))
+        self._check_int2char(symb)
+        self.interpret.memory.check_variable(symb_var)
+
+        self.interpret.memory.set_value(symb_var, self._int2char(symb))
+
+    def stri2int(self, instruction: Instruction):
+        self._binary(instruction, self._stri2int)
+
+    # stack variants
+
+    def adds(self, instruction: Instruction):
+        self._binary_stack(self._add)
+
+    def subs(self, instruction: Instruction):
+        self._binary_stack(self._sub)
+
+    def muls(self, instruction: Instruction):
+        self._binary_stack(self._mul)
+
+    def idivs(self, instruction: Instruction):
+        self._binary_stack(self._idiv)
+
+    def lts(self, instruction: Instruction):
+        self._binary_stack(self._lt)
+
+    def gts(self, instruction: Instruction):
+        self._binary_stack(self._gt)
+
+    def eqs(self, instruction: Instruction):
+        self._binary_stack(self._eq)
+
+    def ands(self, instruction: Instruction):
+        self._binary_stack(self._and)
+
+    def ors(self, instruction: Instruction):
+        self._binary_stack(self._or)
+
+    def nots(self, instruction: Instruction):
+        memory = self.interpret.memory
+        memory.push_data_stack(self._not(memory.pop_data_stack()))
+
+    def int2chars(self, instruction: Instruction):
+        memory = self.interpret.memory
+        symb = memory.pop_data_stack()
+        self._check_int2char(symb)
+        memory.push_data_stack(self._int2char(symb))
+
+    def stri2ints(self, instruction: Instruction):
+        self._binary_stack(self._stri2int)
+
+    # operations with values
+
+    def _add(self, symb1: Value, symb2: Value) -> Value:
+        (_, value1), (_, value2) = self._check_ints(symb1, symb2)
+        return ValueType.INT, value1 + value2
+
+    def _sub(self, symb1: Value, symb2: Value) -> Value:
+        (_, value1), (_, value2) = self._check_ints(symb1, symb2)
+        return ValueType.INT, value1 - value2
+
+    def _mul(self, symb1: Value, symb2: Value) -> Value:
+        (_, value1), (_, value2) = self._check_ints(symb1, symb2)
+        return ValueType.INT, value1 * value2
+
+    def _idiv(self, symb1: Value, symb2: Value) -> Value:
+        (_, value1), (_, value2) = self._check_ints(symb1, symb2)
+        if value2 == 0:
+            raise InterpretError(InterpretErrorEnum.WRONG_OPERAND_VALUE, "Division by zero")
+        return ValueType.INT, value1 // value2
+
+    def _lt(self, symb1: Value, symb2: Value) -> Value:
+        (_, value1), (_, value2) = self._check_comparable(symb1, symb2)
+        return bool_value(value1 < value2)
+
+    def _gt(self, symb1: Value, symb2: Value) -> Value:
+        (_, value1), (_, value2) = self._check_comparable(symb1, symb2)
+        return bool_value(value1 > value2)
+
+    def _eq(self, symb1: Value, symb2: Value) -> Value:
+        (type1, value1), (type2, value2) = symb1, symb2
+
+        # if both symbols are non-nil, they have to be the same type
+        if type1 != ValueType.NIL and type2 != ValueType.NIL:
+            self._check_if_same(type1, type2)
+            return bool_value(value1 == value2)
+        else:
+            # at least one of symbols is nil -> compare types
+            return bool_value(type1 == type2)
+
+    def _and(self, symb1: Value, symb2: Value) -> Value:
+        (_, value1), (_, value2) = self._check_bools(symb1, symb2)
+        return bool_value(value1 and value2)
+
+    def _or(self, symb1: Value, symb2: Value) -> Value:
+        (_, value1), (_, value2) = self._check_bools(symb1, symb2)
+        return bool_value(value1 or value2)
+
+    def _not(self, symb: Value) -> Value:
+        symb_type, symb_value = symb
+        if symb_type != ValueType.BOOL:
+            raise InterpretError(InterpretErrorEnum.WRONG_OPERAND_TYPE, "Not can be used only with bool")
+        return bool_value(not symb_value)
+
+    def _check_int2char(self, symb: Value):
+        if symb[0] != ValueType.INT:
             raise InterpretError(InterpretErrorEnum.WRONG_OPERAND_TYPE, "Int2Char requires integer")
-        var: Variable = self.interpret.memory.get_variable(symb_var.value, symb_var.frame)
 
+    def _int2char(self, symb: Value) -> Value:
         try:
-            var.symbol_value.value = chr(symb1.value)
-            var.symbol_value.type = SymbolType.STRING
-
-        except ValueError:
+            return ValueType.STRING, chr(symb[1])
+        except (ValueError, OverflowError):
             raise InterpretError(InterpretErrorEnum.WRONG_STRING_OPERATION)
 
-    def stri2int(self, instruction: Instruction):
-        var, symb1, symb2 = self._parse_args(instruction)
-        if symb1.type != SymbolType.STRING or symb2.type != SymbolType.INT:
+    def _stri2int(self, symb1: Value, symb2: Value) -> Value:
+        (type1, value1), (type2, value2) = symb1, symb2
+        if type1 != ValueType.STRING or type2 != ValueType.INT:
             raise InterpretError(InterpretErrorEnum.WRONG_OPERAND_TYPE)
 
-        if symb2.value < 0:
+        if value2 < 0:
             raise InterpretError(InterpretErrorEnum.WRONG_STRING_OPERATION)
 
         try:
-            var.symbol_value.value = ord(symb1.value[symb2.value])
-            var.symbol_value.type = SymbolType.INT
+            return ValueType.INT, ord(value1[value2])
         except (IndexError, ValueError):
             raise InterpretError(InterpretErrorEnum.WRONG_STRING_OPERATION, "Wrong indexing of stri2int")
 
-    def _lt_gt_eq(self, instruction: Instruction):
-        var, symb1, symb2 = self._parse_args(instruction)
-        var.symbol_value.type = SymbolType.BOOL
-        return var, symb1, symb2
+    # checks of operands
 
-    def _and_or(self, instruction: Instruction):
-        var, symb1, symb2 = self._parse_args(instruction)
-        if symb1.type != SymbolType.BOOL or symb2.type != SymbolType.BOOL:
+    def _check_ints(self, symb1: Value, symb2: Value) -> Tuple[Value, Value]:
+        # check if symb1 and symb2 are both type of int
+        if symb1[0] != ValueType.INT or symb2[0] != ValueType.INT:
+            raise InterpretError(InterpretErrorEnum.WRONG_OPERAND_TYPE, "Add/Sub/Mul/IDiv argument is not int")
+        return symb1, symb2
+
+    def _check_bools(self, symb1: Value, symb2: Value) -> Tuple[Value, Value]:
+        if symb1[0] != ValueType.BOOL or symb2[0] != ValueType.BOOL:
             raise InterpretError(InterpretErrorEnum.WRONG_OPERAND_TYPE, "And/Or can be used only with bools")
-        var.symbol_value.type = SymbolType.BOOL
-        return var, symb1, symb2
+        return symb1, symb2
 
-    def _add_sub_mul_idiv(self, instruction: Instruction):
-        var, symb1, symb2 = self._parse_args(instruction)
+    def _check_comparable(self, symb1: Value, symb2: Value) -> Tuple[Value, Value]:
+        self._check_if_same(symb1[0], symb2[0])
+        if symb1[0] == ValueType.NIL:
+            raise InterpretError(InterpretErrorEnum.WRONG_OPERAND_TYPE, "Cannot compare with nil")
+        return symb1, symb2
 
-        # check if symb1 and symb2 are both type of int
-        if symb1.type != SymbolType.INT or symb2.type != SymbolType.INT:
-            raise InterpretError(InterpretErrorEnum.WRONG_OPERAND_TYPE, "Add/Sub/Mul/IDiv argument is not int")
+    def _check_if_same(self, type1: int, type2: int):
+        if type1 != type2:
+            raise InterpretError(InterpretErrorEnum.WRONG_OPERAND_TYPE, "Type of symbol 1 is not equal to the type of symbol 2")
 
-        var.symbol_value.type = SymbolType.INT
-        return var, symb1, symb2
+    # operands of instructions
+
+    def _binary(self, instruction: Instruction, operation: Callable[[Value, Value], Value]):
+        var, symb1, symb2 = self._parse_args(instruction)
+        self.interpret.memory.set_value(var, operation(symb1, symb2))
+
+    def _binary_stack(self, operation: Callable[[Value, Value], Value]):
+        memory = self.interpret.memory
+        symb2 = memory.pop_data_stack()
+        symb1 = memory.pop_data_stack()
+        memory.push_data_stack(operation(symb1, symb2))
 
     def _parse_args(self, instruction: Instruction):
-        instruction.check_format([[SymbolType.VAR], SymbolTypeHelper.DATABLE_NIL, SymbolTypeHelper.DATABLE_NIL])
+        """
+        Returns variable argument and values of both symbols.
+        """
         symb_var: Symbol = instruction.args.get(1)
-        symb1: Symbol = self.interpret.memory.symbol_or_var_symbol(instruction.args.get(2))
-        symb2: Symbol = self.interpret.memory.symbol_or_var_symbol(instruction.args.get(3))
-
-        var: Variable = self.interpret.memory.get_variable(symb_var.value, symb_var.frame)
-        return var, symb1, symb2
+        symb1 = self.interpret.memory.value_of(instruction.args.get(2))
+        symb2 = self.interpret.memory.value_of(instruction.args.get(3))
 
-    def _check_if_same(self, symb1, symb2):
-        if symb1.type != symb2.type:
-            raise InterpretError(InterpretErrorEnum.WRONG_OPERAND_TYPE, "Type of symbol 1 is not equal to the type of symbol 2")
\ No newline at end of file
+        self.interpret.memory.check_variable(symb_var)
+        return symb_var, symb1, symb2
@@ -0,0 +1,169 @@
+import time
+from typing import Callable, List, Optional, Sequence
+
+from FrameType import FrameType
+from Instruction import Instruction
+from InterpretError import InterpretErrorEnum, InterpretError
+from StringBuffer import encoded_length
+from Value import ValueType
+
+STRING = ValueType.STRING
+
+# maximum number of instructions executed between checks of budgets
+BUDGET_CHECK_INTERVAL = 4096
+# number of instructions executed for each value scanned by the periodic check of length of strings
+STRING_SCAN_INSTRUCTIONS = 16
+# instructions which create long strings in the variable of their first operand
+STRING_OPCODES = {'CONCAT', 'READ'}
+
+
+class BudgetExceeded(InterpretError):
+    """
+    Raised by checks of budgets, the interpretation loop replaces it by InterpretError with summary of the execution
+    (see Budget.stop), because only the loop knows the number of executed instructions.
+    """
+
+    def __init__(self, error_type: int, budget: str, in_instruction: bool = False):
+        super().__init__(error_type, f"Budget of {budget} exceeded")
+        self.budget = budget
+        self.in_instruction = in_instruction  # raised after the instruction was executed, it is counted
+
+
+class Budget:
+    """
+    Limits of execution of untrusted programs, None means unlimited. Budgets are checked by the interpretation loop
+    (see Interpret._run_budgeted) every BUDGET_CHECK_INTERVAL instructions, so depths of stacks and number of frames
+    can exceed their budget by at most that many before the program is stopped. Limit of instructions is exact.
+
+    Length of strings is the sum of lengths in bytes of UTF-8 of all string values in frames and on data stack (see
+    encoded_length, ASCII strings are not encoded and buffers update their length by changes). Only CONCAT and READ
+    create long strings (other instructions create strings of a few characters), so they are wrapped (see wrap) and
+    add the change of length of their variable to the total from the last scan of all values, all values are scanned
+    again when the total could exceed the budget. Copies of strings (MOVE, PUSHS, ...) share their content, they are
+    counted by periodic scan, which is repeated after STRING_SCAN_INSTRUCTIONS instructions for each scanned value.
+    """
+
+    def __init__(self, max_instructions: Optional[int] = None, timeout: Optional[float] = None,
+                 max_data_stack: Optional[int] = None, max_call_stack: Optional[int] = None,
+                 max_frames: Optional[int] = None, max_string_length: Optional[int] = None):
+        self.max_instructions = max_instructions
+        self.timeout = timeout  # seconds of wall time
+        self.max_data_stack = max_data_stack
+        self.max_call_stack = max_call_stack
+        self.max_frames = max_frames  # local frames and temporary frame
+        self.max_string_length = max_string_length
+        self.start_time = 0.0
+        self.string_length = 0  # total bytes of strings from the last scan and changes by CONCAT and READ since it
+        self.next_string_scan = 0  # number of executed instructions when strings are scanned again
+
+    def start(self):
+        self.start_time = time.perf_counter()
+        self.string_length = 0
+        self.next_string_scan = 0
+
+    def wrap(self, program: Sequence[Instruction], ops: Sequence[Callable]) -> List[Callable]:
+        """
+        Returns compiled instructions with CONCAT and READ counting length of strings, if their budget is set.
+        """
+        ops = list(ops)
+        if self.max_string_length is None:
+            return ops
+        for index, instruction in enumerate(program):
+            if instruction.opcode in STRING_OPCODES:
+                ops[index] = self._counted_string(instruction.args.get(1), ops[index])
+        return ops
+
+    def _counted_string(self, var, op: Callable) -> Callable:
+        is_global, is_local = var.frame == FrameType.GF, var.frame == FrameType.LF
+        slot = var.slot
+        max_string_length = self.max_string_length
+
+        def counted(interpret):
+            memory = interpret.memory
+            if is_global:
+                values = memory.global_frame.values
+            elif is_local and memory.local_frames:
+                values = memory.local_frames[-1].values
+            elif not is_local and memory.temp_frame is not None:
+                values = memory.temp_frame.values
+            else:
+                # missing frame is reported by the instruction itself, after errors of its operands
+                return op(interpret)
+            old = values[slot]
+            # length of older version of StringBuffer is known only before CONCAT appends to it
+            old_length = encoded_length(old[1]) if old is not None and old[0] == STRING else 0
+            next_index = op(interpret)
+            new = values[slot]
+            # READ stores also values of other types
+            self.string_length += (encoded_length(new[1]) if new[0] == STRING else 0) - old_length
+            if self.string_length > max_string_length:
+                self.string_length = self._string_length(interpret)
+                if self.string_length > max_string_length:
+                    raise BudgetExceeded(InterpretErrorEnum.STRING_BUDGET, f"{max_string_length} bytes of "
+                                                                           f"strings", True)
+            return next_index
+        return counted
+
+    def check(self, interpret, executed: int) -> int:
+        """
+        Checks budgets after `executed` instructions, raises BudgetExceeded if some is exceeded.
+        :return: number of instructions which can be executed before the next check
+        """
+        memory = interpret.memory
+        interval = BUDGET_CHECK_INTERVAL
+        if self.max_instructions is not None:
+            if executed >= self.max_instructions:
+                raise BudgetExceeded(InterpretErrorEnum.INSTRUCTION_BUDGET, f"{self.max_instructions} instructions")
+            interval = min(interval, self.max_instructions - executed)
+        if self.timeout is not None and time.perf_counter() - self.start_time > self.timeout:
+            raise BudgetExceeded(InterpretErrorEnum.TIME_BUDGET, f"{self.timeout} s")
+        if self.max_data_stack is not None and len(memory.data_stack) > self.max_data_stack:
+            raise BudgetExceeded(InterpretErrorEnum.DATA_STACK_BUDGET, f"{self.max_data_stack} values on data stack")
+        if self.max_call_stack is not None and len(interpret.call_stack) > self.max_call_stack:
+            raise BudgetExceeded(InterpretErrorEnum.CALL_STACK_BUDGET, f"{self.max_call_stack} calls on call stack")
+        if self.max_frames is not None and self._frames(interpret) > self.max_frames:
+            raise BudgetExceeded(InterpretErrorEnum.FRAME_BUDGET, f"{self.max_frames} frames")
+        if self.max_string_length is not None and executed >= self.next_string_scan:
+            self.string_length = self._string_length(interpret)
+            if self.string_length > self.max_string_length:
+                raise BudgetExceeded(InterpretErrorEnum.STRING_BUDGET, f"{self.max_string_length} bytes of "
+                                                                       f"strings")
+            self.next_string_scan = executed + STRING_SCAN_INSTRUCTIONS * self._values(interpret)
+        return interval
+
+    @staticmethod
+    def _frames(interpret) -> int:
+        memory = interpret.memory
+        return len(memory.local_frames) + (memory.temp_frame is not None)
+
+    @staticmethod
+    def _value_lists(interpret) -> List[list]:
+        memory = interpret.memory
+        value_lists = [memory.global_frame.values, memory.data_stack]
+        value_lists.extend(frame.values for frame in memory.local_frames)
+        if memory.temp_frame is not None:
+            value_lists.append(memory.temp_frame.values)
+        return value_lists
+
+    def _values(self, interpret) -> int:
+        return sum(len(values) for values in self._value_lists(interpret))
+
+    def _string_length(self, interpret) -> int:
+        """
+        Returns total length in bytes of UTF-8 of string values in frames and on data stack.
+        """
+        return sum(encoded_length(value[1]) for values in self._value_lists(interpret) for value in values
+                   if value is not None and value[0] == ValueType.STRING)
+
+    def stop(self, exceeded: BudgetExceeded, interpret, executed: int):
+        """
+        Raises InterpretError of exceeded budget with summary of the execution.
+        :param executed: number of instructions executed before the instruction being executed
+        """
+        memory = interpret.memory
+        executed += exceeded.in_instruction
+        raise InterpretError(exceeded.error_type, f"Budget of {exceeded.budget} exceeded: executed {executed} "
+                                                  f"instructions in {time.perf_counter() - self.start_time:.3f} s, "
+                                                  f"data stack {len(memory.data_stack)}, call stack "
+                                                  f"{len(interpret.call_stack)}, frames {self._frames(interpret)}, "
+                                                  f"strings {self._string_length(interpret)} bytes") from None
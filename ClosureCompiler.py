@@ -0,0 +1,733 @@
+import operator
+import sys
+from typing import Callable, List
+
+from FrameType import FrameType
+from Instruction import Instruction
+from InterpretError import InterpretErrorEnum, InterpretError
+from Memory import Memory
+from StringBuffer import concat, set_char
+from Symbol import Symbol, SymbolType
+from Value import Value, ValueType, UNINITIALIZED, TRUE_VALUE, FALSE_VALUE, to_str, type_to_str, \
+    from_input
+
+INT = ValueType.INT
+BOOL = ValueType.BOOL
+STRING = ValueType.STRING
+NIL = ValueType.NIL
+
+
+class ClosureCompiler:
+    """
+    Compiles every instruction of the program into one specialized function (closure). Operands are bound when the
+    program is loaded: constants are baked in and variables are turned into getters for the correct frame.
+
+    Compiled function accepts interpret and returns index of the next instruction, so the interpretation loop is just
+    `counter = ops[counter](interpret)`. Managers stay the reference implementation of all instructions,
+    closures have to behave exactly the same (including error codes).
+    """
+
+    def __init__(self):
+        # opcode -> method building closure, other instructions (DPRINT, BREAK) are executed by managers
+        self.builders = {
+            "MOVE": self._move,
+            "CREATEFRAME": self._create_frame,
+            "PUSHFRAME": self._push_frame,
+            "POPFRAME": self._pop_frame,
+            "DEFVAR": self._defvar,
+            "CALL": self._call,
+            "RETURN": self._return,
+            "PUSHS": self._pushs,
+            "POPS": self._pops,
+            "ADD": self._add,
+            "SUB": self._sub,
+            "MUL": self._mul,
+            "IDIV": self._idiv,
+            "LT": self._lt,
+            "GT": self._gt,
+            "EQ": self._eq,
+            "AND": self._and,
+            "OR": self._or,
+            "NOT": self._not,
+            "INT2CHAR": self._int2char,
+            "STRI2INT": self._stri2int,
+            "READ": self._read,
+            "WRITE": self._write,
+            "CONCAT": self._concat,
+            "STRLEN": self._strlen,
+            "GETCHAR": self._getchar,
+            "SETCHAR": self._setchar,
+            "TYPE": self._type,
+            "JUMP": self._jump,
+            "JUMPIFEQ": self._jumpifeq,
+            "JUMPIFNEQ": self._jumpifneq,
+            "EXIT": self._exit,
+            # STACK extension
+            "CLEARS": self._clears,
+            "ADDS": self._adds,
+            "SUBS": self._subs,
+            "MULS": self._muls,
+            "IDIVS": self._idivs,
+            "LTS": self._lts,
+            "GTS": self._gts,
+            "EQS": self._eqs,
+            "ANDS": self._ands,
+            "ORS": self._ors,
+            "NOTS": self._nots,
+            "INT2CHARS": self._int2chars,
+            "STRI2INTS": self._stri2ints,
+            "JUMPIFEQS": self._jumpifeqs,
+            "JUMPIFNEQS": self._jumpifneqs,
+        }
+
+    def compile(self, program: List[Instruction]) -> List[Callable]:
+        """
+        Compiles list of instructions into list of functions with the same indexes.
+        :param program:
+        :return:
+        """
+        return [self._compile_instruction(instruction, index) for index, instruction in enumerate(program)]
+
+    def _compile_instruction(self, instruction: Instruction, index: int, next_index: int = None) -> Callable:
+        """
+        Builds function of one instruction.
+        :param instruction:
+        :param index: index of the instruction in program
+        :param next_index: index of the following instruction, index + 1 by default
+        :return:
+        """
+        builder = self.builders.get(instruction.opcode)
+        if builder is None:
+            return lambda interpret: interpret.run_instruction(index)
+
+        if next_index is None:
+            next_index = index + 1
+        args = instruction.args
+        return builder(instruction, next_index, *[args.get(i) for i in range(1, len(args) + 1)])
+
+    # operand accessors
+
+    def _frame_values(self, symbol: Symbol) -> Callable[[Memory], List[Value]]:
+        """
+        Returns getter of list with values of variables from frame of the symbol.
+        """
+        if symbol.frame == FrameType.GF:
+            return lambda memory: memory.global_frame.values
+        elif symbol.frame == FrameType.LF:
+            def frame_values(memory: Memory) -> List[Value]:
+                if not memory.local_frames:
+                    raise InterpretError(InterpretErrorEnum.NON_EXISTING_FRAME)
+                return memory.local_frames[-1].values
+        else:
+            def frame_values(memory: Memory) -> List[Value]:
+                if memory.temp_frame is None:
+                    raise InterpretError(InterpretErrorEnum.NON_EXISTING_FRAME)
+                return memory.temp_frame.values
+        return frame_values
+
+    def _target(self, var: Symbol) -> Callable[[Memory], List[Value]]:
+        """
+        Returns getter of list with values of variables from frame of the variable which will be written to.
+        Checks that the variable is defined, so the result can be stored directly to slot of the variable.
+        """
+        frame_values = self._frame_values(var)
+        slot = var.slot
+        name = var.value
+
+        def target(memory: Memory) -> List[Value]:
+            values = frame_values(memory)
+            if values[slot] is None:
+                raise InterpretError(InterpretErrorEnum.NON_EXISTING_VAR, f"Non existing variable {name}")
+            return values
+        return target
+
+    def _value(self, symbol: Symbol, check_if_initialized: bool = True) -> Callable[[Memory], Value]:
+        """
+        Returns getter of symbol value, constant is returned directly, variable is found in memory.
+        """
+        if symbol.type != SymbolType.VAR:
+            constant = symbol.constant
+            return lambda memory: constant
+
+        frame_values = self._frame_values(symbol)
+        slot = symbol.slot
+        name = symbol.value
+
+        def value(memory: Memory) -> Value:
+            variable_value = frame_values(memory)[slot]
+            if variable_value is None:
+                raise InterpretError(InterpretErrorEnum.NON_EXISTING_VAR, f"Non existing variable {name}")
+            if variable_value is UNINITIALIZED and check_if_initialized:
+                raise InterpretError(InterpretErrorEnum.NON_EXISTING_VALUE, "Not initialized value")
+            return variable_value
+        return value
+
+    # frames and function calls
+
+    def _move(self, instruction: Instruction, next_index: int, var: Symbol, symb: Symbol):
+        target = self._target(var)
+        slot = var.slot
+        source = self._value(symb)
+
+        def op(interpret):
+            memory = interpret.memory
+            values = target(memory)
+            values[slot] = source(memory)
+            return next_index
+        return op
+
+    def _create_frame(self, instruction: Instruction, next_index: int):
+        def op(interpret):
+            interpret.memory.new_temp_frame()
+            return next_index
+        return op
+
+    def _push_frame(self, instruction: Instruction, next_index: int):
+        def op(interpret):
+            interpret.memory.push_temp_to_local()
+            return next_index
+        return op
+
+    def _pop_frame(self, instruction: Instruction, next_index: int):
+        def op(interpret):
+            interpret.memory.pop_local_to_temp()
+            return next_index
+        return op
+
+    def _defvar(self, instruction: Instruction, next_index: int, var: Symbol):
+        frame_values = self._frame_values(var)
+        slot = var.slot
+        name = var.value
+
+        def op(interpret):
+            values = frame_values(interpret.memory)
+            if values[slot] is not None:
+                raise InterpretError(InterpretErrorEnum.SEMANTIC_ERR, "Redefining variable " + name)
+            values[slot] = UNINITIALIZED
+            return next_index
+        return op
+
+    def _call(self, instruction: Instruction, next_index: int, label: Symbol):
+        target = instruction.target
+
+        def op(interpret):
+            interpret.call_stack.append(next_index)
+            return target
+        return op
+
+    def _return(self, instruction: Instruction, next_index: int):
+        def op(interpret):
+            if not interpret.call_stack:
+                raise InterpretError(InterpretErrorEnum.NON_EXISTING_VALUE)
+            return interpret.call_stack.pop()
+        return op
+
+    # data stack
+
+    def _pushs(self, instruction: Instruction, next_index: int, symb: Symbol):
+        source = self._value(symb)
+
+        def op(interpret):
+            memory = interpret.memory
+            memory.data_stack.append(source(memory))
+            return next_index
+        return op
+
+    def _pops(self, instruction: Instruction, next_index: int, var: Symbol):
+        target = self._target(var)
+        slot = var.slot
+
+        def op(interpret):
+            memory = interpret.memory
+            values = target(memory)
+            values[slot] = memory.pop_data_stack()
+            return next_index
+        return op
+
+    # arithmetic, relational and boolean instructions
+
+    def _add(self, instruction: Instruction, next_index: int, var: Symbol, symb1: Symbol, symb2: Symbol):
+        return self._arithmetic(operator.add, next_index, var, symb1, symb2)
+
+    def _sub(self, instruction: Instruction, next_index: int, var: Symbol, symb1: Symbol, symb2: Symbol):
+        return self._arithmetic(operator.sub, next_index, var, symb1, symb2)
+
+    def _mul(self, instruction: Instruction, next_index: int, var: Symbol, symb1: Symbol, symb2: Symbol):
+        return self._arithmetic(operator.mul, next_index, var, symb1, symb2)
+
+    def _idiv(self, instruction: Instruction, next_index: int, var: Symbol, symb1: Symbol, symb2: Symbol):
+        return self._arithmetic(self._checked_floordiv, next_index, var, symb1, symb2)
+
+    @staticmethod
+    def _checked_floordiv(a: int, b: int) -> int:
+        if b == 0:
+            raise InterpretError(InterpretErrorEnum.WRONG_OPERAND_VALUE, "Division by zero")
+        return a // b
+
+    def _arithmetic(self, operation: Callable, next_index: int, var: Symbol, symb1: Symbol, symb2: Symbol):
+        target = self._target(var)
+        slot = var.slot
+        first = self._value(symb1)
+        second = self._value(symb2)
+
+        def op(interpret):
+            memory = interpret.memory
+            type1, value1 = first(memory)
+            type2, value2 = second(memory)
+            values = target(memory)
+            if type1 != INT or type2 != INT:
+                raise InterpretError(InterpretErrorEnum.WRONG_OPERAND_TYPE, "Add/Sub/Mul/IDiv argument is not int")
+            values[slot] = (INT, operation(value1, value2))
+            return next_index
+        return op
+
+    def _lt(self, instruction: Instruction, next_index: int, var: Symbol, symb1: Symbol, symb2: Symbol):
+        return self._relational(operator.lt, next_index, var, symb1, symb2)
+
+    def _gt(self, instruction: Instruction, next_index: int, var: Symbol, symb1: Symbol, symb2: Symbol):
+        return self._relational(operator.gt, next_index, var, symb1, symb2)
+
+    def _relational(self, operation: Callable, next_index: int, var: Symbol, symb1: Symbol, symb2: Symbol):
+        target = self._target(var)
+        slot = var.slot
+        first = self._value(symb1)
+        second = self._value(symb2)
+
+        def op(interpret):
+            memory = interpret.memory
+            type1, value1 = first(memory)
+            type2, value2 = second(memory)
+            values = target(memory)
+            if type1 != type2:
+                raise InterpretError(InterpretErrorEnum.WRONG_OPERAND_TYPE,
+                                     "Type of symbol 1 is not equal to the type of symbol 2")
+            if type1 == NIL:
+                raise InterpretError(InterpretErrorEnum.WRONG_OPERAND_TYPE, "Cannot compare with nil")
+            values[slot] = TRUE_VALUE if operation(value1, value2) else FALSE_VALUE
+            return next_index
+        return op
+
+    def _eq(self, instruction: Instruction, next_index: int, var: Symbol, symb1: Symbol, symb2: Symbol):
+        target = self._target(var)
+        slot = var.slot
+        first = self._value(symb1)
+        second = self._value(symb2)
+        equals = self._equals
+
+        def op(interpret):
+            memory = interpret.memory
+            type1, value1 = first(memory)
+            type2, value2 = second(memory)
+            values = target(memory)
+            values[slot] = TRUE_VALUE if equals(type1, value1, type2, value2) else FALSE_VALUE
+            return next_index
+        return op
+
+    @staticmethod
+    def _equals(type1: int, value1, type2: int, value2) -> bool:
+        """
+        Compares values like EQ, nil can be compared with any type, other types have to be the same.
+        """
+        if type1 == NIL or type2 == NIL:
+            return type1 == type2
+        if type1 != type2:
+            raise InterpretError(InterpretErrorEnum.WRONG_OPERAND_TYPE,
+                                 "Type of symbol 1 is not equal to the type of symbol 2")
+        return value1 == value2
+
+    def _and(self, instruction: Instruction, next_index: int, var: Symbol, symb1: Symbol, symb2: Symbol):
+        return self._boolean(lambda a, b: a and b, next_index, var, symb1, symb2)
+
+    def _or(self, instruction: Instruction, next_index: int, var: Symbol, symb1: Symbol, symb2: Symbol):
+        return self._boolean(lambda a, b: a or b, next_index, var, symb1, symb2)
+
+    def _boolean(self, operation: Callable, next_index: int, var: Symbol, symb1: Symbol, symb2: Symbol):
+        target = self._target(var)
+        slot = var.slot
+        first = self._value(symb1)
+        second = self._value(symb2)
+
+        def op(interpret):
+            memory = interpret.memory
+            type1, value1 = first(memory)
+            type2, value2 = second(memory)
+            values = target(memory)
+            if type1 != BOOL or type2 != BOOL:
+                raise InterpretError(InterpretErrorEnum.WRONG_OPERAND_TYPE, "And/Or can be used only with bools")
+            values[slot] = TRUE_VALUE if operation(value1, value2) else FALSE_VALUE
+            return next_index
+        return op
+
+    def _not(self, instruction: Instruction, next_index: int, var: Symbol, symb: Symbol):
+        target = self._target(var)
+        slot = var.slot
+        source = self._value(symb)
+
+        def op(interpret):
+            memory = interpret.memory
+            value_type, value = source(memory)
+            values = target(memory)
+            if value_type != BOOL:
+                raise InterpretError(InterpretErrorEnum.WRONG_OPERAND_TYPE, "Not can be used only with bool")
+            values[slot] = FALSE_VALUE if value else TRUE_VALUE
+            return next_index
+        return op
+
+    def _int2char(self, instruction: Instruction, next_index: int, var: Symbol, symb: Symbol):
+        target = self._target(var)
+        slot = var.slot
+        source = self._value(symb)
+
+        def op(interpret):
+            memory = interpret.memory
+            value_type, value = source(memory)
+            if value_type != INT:
+                raise InterpretError(InterpretErrorEnum.WRONG_OPERAND_TYPE, "Int2Char requires integer")
+            values = target(memory)
+            try:
+                values[slot] = (STRING, chr(value))
+            except (ValueError, OverflowError):
+                raise InterpretError(InterpretErrorEnum.WRONG_STRING_OPERATION)
+            return next_index
+        return op
+
+    def _stri2int(self, instruction: Instruction, next_index: int, var: Symbol, symb1: Symbol, symb2: Symbol):
+        target = self._target(var)
+        slot = var.slot
+        first = self._value(symb1)
+        second = self._value(symb2)
+
+        def op(interpret):
+            memory = interpret.memory
+            string_type, string = first(memory)
+            index_type, index = second(memory)
+            values = target(memory)
+            if string_type != STRING or index_type != INT:
+                raise InterpretError(InterpretErrorEnum.WRONG_OPERAND_TYPE)
+            if index < 0:
+                raise InterpretError(InterpretErrorEnum.WRONG_STRING_OPERATION)
+            try:
+                values[slot] = (INT, ord(string[index]))
+            except IndexError:
+                raise InterpretError(InterpretErrorEnum.WRONG_STRING_OPERATION, "Wrong indexing of stri2int")
+            return next_index
+        return op
+
+    # input / output
+
+    def _read(self, instruction: Instruction, next_index: int, var: Symbol, type_symb: Symbol):
+        target = self._target(var)
+        slot = var.slot
+        read_type = type_symb.value
+
+        def op(interpret):
+            value = from_input(read_type, interpret.input_one_value())
+            target(interpret.memory)[slot] = value
+            return next_index
+        return op
+
+    def _write(self, instruction: Instruction, next_index: int, symb: Symbol):
+        source = self._value(symb)
+
+        def op(interpret):
+            interpret.output.write(to_str(source(interpret.memory)))
+            return next_index
+        return op
+
+    # strings
+
+    def _concat(self, instruction: Instruction, next_index: int, var: Symbol, symb1: Symbol, symb2: Symbol):
+        target = self._target(var)
+        slot = var.slot
+        first = self._value(symb1)
+        second = self._value(symb2)
+
+        def op(interpret):
+            memory = interpret.memory
+            type1, value1 = first(memory)
+            type2, value2 = second(memory)
+            if type1 != STRING or type2 != STRING:
+                raise InterpretError(InterpretErrorEnum.WRONG_OPERAND_TYPE, "Both symbols have to be strings.")
+            values = target(memory)
+            values[slot] = (STRING, concat(value1, value2))
+            return next_index
+        return op
+
+    def _strlen(self, instruction: Instruction, next_index: int, var: Symbol, symb: Symbol):
+        target = self._target(var)
+        slot = var.slot
+        source = self._value(symb)
+
+        def op(interpret):
+            memory = interpret.memory
+            value_type, value = source(memory)
+            if value_type != STRING:
+                raise InterpretError(InterpretErrorEnum.WRONG_OPERAND_TYPE, "Symbol has to be strings.")
+            values = target(memory)
+            values[slot] = (INT, len(value))
+            return next_index
+        return op
+
+    def _getchar(self, instruction: Instruction, next_index: int, var: Symbol, symb1: Symbol, symb2: Symbol):
+        target = self._target(var)
+        slot = var.slot
+        first = self._value(symb1)
+        second = self._value(symb2)
+
+        def op(interpret):
+            memory = interpret.memory
+            string_type, string = first(memory)
+            index_type, index = second(memory)
+            if string_type != STRING or index_type != INT:
+                raise InterpretError(InterpretErrorEnum.WRONG_OPERAND_TYPE, "Wrong operand types for getchar")
+            if index < 0:
+                raise InterpretError(InterpretErrorEnum.WRONG_STRING_OPERATION, "Wrong indexing in getchar")
+            values = target(memory)
+            try:
+                values[slot] = (STRING, string[index])
+            except IndexError:
+                raise InterpretError(InterpretErrorEnum.WRONG_STRING_OPERATION, "Wrong indexing in getchar")
+            return next_index
+        return op
+
+    def _setchar(self, instruction: Instruction, next_index: int, var: Symbol, symb1: Symbol, symb2: Symbol):
+        target = self._target(var)
+        slot = var.slot
+        first = self._value(symb1)
+        second = self._value(symb2)
+
+        def op(interpret):
+            memory = interpret.memory
+            index_type, index = first(memory)
+            replace_with_type, replace_with = second(memory)
+            values = target(memory)
+            if values[slot] is UNINITIALIZED:
+                raise InterpretError(InterpretErrorEnum.NON_EXISTING_VALUE, "Not initialized value")
+            string_type, string = values[slot]
+            if index_type != INT or replace_with_type != STRING or string_type != STRING:
+                raise InterpretError(InterpretErrorEnum.WRONG_OPERAND_TYPE, "Wrong operand values for setchar")
+            position = index
+            if position < 0 or position >= len(string) or replace_with == '':
+                raise InterpretError(InterpretErrorEnum.WRONG_STRING_OPERATION, "Wrong indexing in setchar")
+            values[slot] = (STRING, set_char(string, position, replace_with[0]))
+            return next_index
+        return op
+
+    # types
+
+    def _type(self, instruction: Instruction, next_index: int, var: Symbol, symb: Symbol):
+        target = self._target(var)
+        slot = var.slot
+        source = self._value(symb, False)
+
+        def op(interpret):
+            memory = interpret.memory
+            value = source(memory)
+            values = target(memory)
+            values[slot] = (STRING, type_to_str(value))
+            return next_index
+        return op
+
+    # program flow
+
+    def _jump(self, instruction: Instruction, next_index: int, label: Symbol):
+        target = instruction.target
+        return lambda interpret: target
+
+    def _jumpifeq(self, instruction: Instruction, next_index: int, label: Symbol, symb1: Symbol, symb2: Symbol):
+        return self._conditional_jump(instruction, next_index, label, symb1, symb2, True)
+
+    def _jumpifneq(self, instruction: Instruction, next_index: int, label: Symbol, symb1: Symbol, symb2: Symbol):
+        return self._conditional_jump(instruction, next_index, label, symb1, symb2, False)
+
+    def _conditional_jump(self, instruction: Instruction, next_index: int, label: Symbol, symb1: Symbol,
+                          symb2: Symbol, jump_if_equal: bool):
+        target = instruction.target
+        first = self._value(symb1)
+        second = self._value(symb2)
+        equals = self._equals
+
+        def op(interpret):
+            memory = interpret.memory
+            type1, value1 = first(memory)
+            type2, value2 = second(memory)
+            if equals(type1, value1, type2, value2) == jump_if_equal:
+                return target
+            return next_index
+        return op
+
+    def _exit(self, instruction: Instruction, next_index: int, symb: Symbol):
+        source = self._value(symb)
+
+        def op(interpret):
+            value_type, value = source(interpret.memory)
+            if value_type != INT:
+                raise InterpretError(InterpretErrorEnum.WRONG_OPERAND_TYPE)
+            elif not (0 <= value <= 49):
+                raise InterpretError(InterpretErrorEnum.WRONG_OPERAND_VALUE)
+            sys.exit(value)
+        return op
+
+    # STACK extension, operands are taken from data stack (the second operand is on top), result replaces them
+
+    @staticmethod
+    def _check_stack(stack: List[Value], count: int):
+        if len(stack) < count:
+            raise InterpretError(InterpretErrorEnum.NON_EXISTING_VALUE, "Data stack is empty, cannot pop")
+
+    def _clears(self, instruction: Instruction, next_index: int):
+        def op(interpret):
+            interpret.memory.data_stack.clear()
+            return next_index
+        return op
+
+    def _adds(self, instruction: Instruction, next_index: int):
+        return self._arithmetic_stack(operator.add, next_index)
+
+    def _subs(self, instruction: Instruction, next_index: int):
+        return self._arithmetic_stack(operator.sub, next_index)
+
+    def _muls(self, instruction: Instruction, next_index: int):
+        return self._arithmetic_stack(operator.mul, next_index)
+
+    def _idivs(self, instruction: Instruction, next_index: int):
+        return self._arithmetic_stack(self._checked_floordiv, next_index)
+
+    def _arithmetic_stack(self, operation: Callable, next_index: int):
+        check_stack = self._check_stack
+
+        def op(interpret):
+            stack = interpret.memory.data_stack
+            check_stack(stack, 2)
+            type2, value2 = stack.pop()
+            type1, value1 = stack[-1]
+            if type1 != INT or type2 != INT:
+                raise InterpretError(InterpretErrorEnum.WRONG_OPERAND_TYPE, "Add/Sub/Mul/IDiv argument is not int")
+            stack[-1] = (INT, operation(value1, value2))
+            return next_index
+        return op
+
+    def _lts(self, instruction: Instruction, next_index: int):
+        return self._relational_stack(operator.lt, next_index)
+
+    def _gts(self, instruction: Instruction, next_index: int):
+        return self._relational_stack(operator.gt, next_index)
+
+    def _relational_stack(self, operation: Callable, next_index: int):
+        check_stack = self._check_stack
+
+        def op(interpret):
+            stack = interpret.memory.data_stack
+            check_stack(stack, 2)
+            type2, value2 = stack.pop()
+            type1, value1 = stack[-1]
+            if type1 != type2:
+                raise InterpretError(InterpretErrorEnum.WRONG_OPERAND_TYPE,
+                                     "Type of symbol 1 is not equal to the type of symbol 2")
+            if type1 == NIL:
+                raise InterpretError(InterpretErrorEnum.WRONG_OPERAND_TYPE, "Cannot compare with nil")
+            stack[-1] = TRUE_VALUE if operation(value1, value2) else FALSE_VALUE
+            return next_index
+        return op
+
+    def _eqs(self, instruction: Instruction, next_index: int):
+        check_stack = self._check_stack
+        equals = self._equals
+
+        def op(interpret):
+            stack = interpret.memory.data_stack
+            check_stack(stack, 2)
+            type2, value2 = stack.pop()
+            type1, value1 = stack[-1]
+            stack[-1] = TRUE_VALUE if equals(type1, value1, type2, value2) else FALSE_VALUE
+            return next_index
+        return op
+
+    def _ands(self, instruction: Instruction, next_index: int):
+        return self._boolean_stack(lambda a, b: a and b, next_index)
+
+    def _ors(self, instruction: Instruction, next_index: int):
+        return self._boolean_stack(lambda a, b: a or b, next_index)
+
+    def _boolean_stack(self, operation: Callable, next_index: int):
+        check_stack = self._check_stack
+
+        def op(interpret):
+            stack = interpret.memory.data_stack
+            check_stack(stack, 2)
+            type2, value2 = stack.pop()
+            type1, value1 = stack[-1]
+            if type1 != BOOL or type2 != BOOL:
+                raise InterpretError(InterpretErrorEnum.WRONG_OPERAND_TYPE, "And/Or can be used only with bools")
+            stack[-1] = TRUE_VALUE if operation(value1, value2) else FALSE_VALUE
+            return next_index
+        return op
+
+    def _nots(self, instruction: Instruction, next_index: int):
+        check_stack = self._check_stack
+
+        def op(interpret):
+            stack = interpret.memory.data_stack
+            check_stack(stack, 1)
+            value_type, value = stack[-1]
+            if value_type != BOOL:
+                raise InterpretError(InterpretErrorEnum.WRONG_OPERAND_TYPE, "Not can be used only with bool")
+            stack[-1] = FALSE_VALUE if value else TRUE_VALUE
+            return next_index
+        return op
+
+    def _int2chars(self, instruction: Instruction, next_index: int):
+        check_stack = self._check_stack
+
+        def op(interpret):
+            stack = interpret.memory.data_stack
+            check_stack(stack, 1)
+            value_type, value = stack[-1]
+            if value_type != INT:
+                raise InterpretError(InterpretErrorEnum.WRONG_OPERAND_TYPE, "Int2Char requires integer")
+            try:
+                stack[-1] = (STRING, chr(value))
+            except (ValueError, OverflowError):
+                raise InterpretError(InterpretErrorEnum.WRONG_STRING_OPERATION)
+            return next_index
+        return op
+
+    def _stri2ints(self, instruction: Instruction, next_index: int):
+        check_stack = self._check_stack
+
+        def op(interpret):
+            stack = interpret.memory.data_stack
+            check_stack(stack, 2)
+            index_type, index = stack.pop()
+            string_type, string = stack[-1]
+            if string_type != STRING or index_type != INT:
+                raise InterpretError(InterpretErrorEnum.WRONG_OPERAND_TYPE)
+            if index < 0:
+                raise InterpretError(InterpretErrorEnum.WRONG_STRING_OPERATION)
+            try:
+                stack[-1] = (INT, ord(string[index]))
+            except IndexError:
+                raise InterpretError(InterpretErrorEnum.WRONG_STRING_OPERATION, "Wrong indexing of stri2int")
+            return next_index
+        return op
+
+    def _jumpifeqs(self, instruction: Instruction, next_index: int, label: Symbol):
+        return self._conditional_jump_stack(instruction, next_index, True)
+
+    def _jumpifneqs(self, instruction: Instruction, next_index: int, label: Symbol):
+        return self._conditional_jump_stack(instruction, next_index, False)
+
+    def _conditional_jump_stack(self, instruction: Instruction, next_index: int, jump_if_equal: bool):
+        target = instruction.target
+        check_stack = self._check_stack
+        equals = self._equals
+
+        def op(interpret):
+            stack = interpret.memory.data_stack
+            check_stack(stack, 2)
+            type2, value2 = stack.pop()
+            type1, value1 = stack.pop()
+            if equals(type1, value1, type2, value2) == jump_if_equal:
+                return target
+            return next_index
+        return op
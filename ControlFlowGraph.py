@@ -0,0 +1,149 @@
+from typing import Callable, Dict, List, Optional, Set, Tuple, TypeVar
+
+from Instruction import Instruction
+
+# kinds of edges between basic blocks
+FALLTHROUGH = 'fallthrough'  # continuation by the following instruction
+JUMP = 'jump'  # taken (conditional) jump
+CALL = 'call'  # CALL to the first instruction of function
+CALL_RETURN = 'call-return'  # from CALL to the instruction following it, where RETURN continues
+
+BRANCH_OPCODES = ['JUMPIFEQ', 'JUMPIFNEQ', 'JUMPIFEQS', 'JUMPIFNEQS']
+# instructions which end basic block
+TERMINATOR_OPCODES = ['JUMP', 'CALL', 'RETURN', 'EXIT'] + BRANCH_OPCODES
+
+State = TypeVar('State')
+
+
+class BasicBlock:
+    """
+    Sequence of instructions which is always executed from the first to the last one.
+    """
+    __slots__ = ('id', 'start', 'end', 'instructions', 'successors', 'predecessors')
+
+    def __init__(self, id: int, start: int, end: int, instructions: List[Instruction]):
+        self.id = id
+        self.start = start  # index of the first instruction in program
+        self.end = end  # index after the last instruction
+        self.instructions = instructions
+        self.successors: List[Tuple[int, str]] = []  # (id of block, kind of edge)
+        self.predecessors: List[Tuple[int, str]] = []
+
+    @property
+    def last(self) -> Instruction:
+        return self.instructions[-1]
+
+    def __str__(self):
+        successors = ', '.join(f"{kind} B{block_id}" for block_id, kind in self.successors)
+        return f"B{self.id} [{self.start}, {self.end}) -> {successors or 'end'}"
+
+
+class ControlFlowGraph:
+    """
+    Control flow graph of compiled program (dense list of instructions with resolved jump targets), see
+    ProgramCompiler. Graph is used by optimizations and can be used by other tools analysing programs.
+
+    Functions are not separated: CALL has an edge to the called label and CALL_RETURN edge to the following
+    instruction, because RETURN continues there. RETURN itself has no successors, as its target is known only at
+    runtime. Analyses have to treat CALL_RETURN edge as if the called function changed anything it can.
+    """
+
+    def __init__(self, program: List[Instruction]):
+        self.program = program
+        self.blocks: List[BasicBlock] = []
+        self.block_of_instruction: List[int] = []  # index of instruction -> id of its block
+        self._build()
+
+    def _build(self):
+        length = len(self.program)
+        leaders = {0} if length else set()
+        for index, instruction in enumerate(self.program):
+            if instruction.target is not None:
+                leaders.add(instruction.target)
+            if instruction.opcode in TERMINATOR_OPCODES:
+                leaders.add(index + 1)
+        # jump to the end of program (label after the last instruction) ends the program
+        starts = sorted(leader for leader in leaders if leader < length)
+
+        for block_id, start in enumerate(starts):
+            end = starts[block_id + 1] if block_id + 1 < len(starts) else length
+            self.blocks.append(BasicBlock(block_id, start, end, self.program[start:end]))
+            self.block_of_instruction.extend([block_id] * (end - start))
+
+        for block in self.blocks:
+            for index, kind in self._successor_indexes(block):
+                if index < length:
+                    successor = self.blocks[self.block_of_instruction[index]]
+                    block.successors.append((successor.id, kind))
+                    successor.predecessors.append((block.id, kind))
+
+    def _successor_indexes(self, block: BasicBlock) -> List[Tuple[int, str]]:
+        last = block.last
+        if last.opcode == 'JUMP':
+            return [(last.target, JUMP)]
+        if last.opcode in BRANCH_OPCODES:
+            return [(block.end, FALLTHROUGH), (last.target, JUMP)]
+        if last.opcode == 'CALL':
+            return [(last.target, CALL), (block.end, CALL_RETURN)]
+        if last.opcode in ['RETURN', 'EXIT']:
+            return []
+        return [(block.end, FALLTHROUGH)]
+
+    def block_at(self, index: int) -> BasicBlock:
+        """
+        Returns block containing instruction with the index.
+        """
+        return self.blocks[self.block_of_instruction[index]]
+
+    def reachable(self) -> Set[int]:
+        """
+        Returns ids of blocks reachable from the first instruction of the program.
+        """
+        if not self.blocks:
+            return set()
+        reached = {0}
+        stack = [0]
+        while stack:
+            for successor, _ in self.blocks[stack.pop()].successors:
+                if successor not in reached:
+                    reached.add(successor)
+                    stack.append(successor)
+        return reached
+
+    def forward(self, entry: State, transfer: Callable[[BasicBlock, State], State],
+                meet: Callable[[State, State], State],
+                edge: Optional[Callable[[BasicBlock, BasicBlock, str, State], State]] = None) -> Dict[int, State]:
+        """
+        Solves forward dataflow problem by worklist algorithm. States have to form a lattice of finite height
+        and functions cannot modify the states they get.
+        :param entry: state at the beginning of the program
+        :param transfer: returns state at the end of block from state at its beginning
+        :param meet: joins states coming from two edges
+        :param edge: modifies state passed along an edge, e.g. for CALL_RETURN
+        :return: id of reachable block -> state at its beginning
+        """
+        if not self.blocks:
+            return {}
+        states: Dict[int, State] = {0: entry}
+        worklist = [0]
+        queued = {0}
+        while worklist:
+            block = self.blocks[worklist.pop()]
+            queued.discard(block.id)
+            out = transfer(block, states[block.id])
+
+            for successor_id, kind in block.successors:
+                successor = self.blocks[successor_id]
+                state = edge(block, successor, kind, out) if edge is not None else out
+                if successor_id in states:
+                    state = meet(states[successor_id], state)
+                    if state == states[successor_id]:
+                        continue
+                states[successor_id] = state
+                if successor_id not in queued:
+                    queued.add(successor_id)
+                    worklist.append(successor_id)
+        return states
+
+    def __str__(self):
+        return "\n".join(str(block) for block in self.blocks)
@@ -0,0 +1,224 @@
+import copy
+from collections import Counter
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Tuple
+
+from ClosureCompiler import ClosureCompiler
+from ControlFlowGraph import ControlFlowGraph, BasicBlock, CALL_RETURN
+from FrameType import FrameType
+from Instruction import Instruction
+from InterpretError import InterpretError
+from Memory import Memory
+from ProgramValidator import ProgramValidator, VAR
+from Symbol import Symbol, SymbolType
+from Value import Value, ValueType, UNINITIALIZED
+
+# known values of global variables, slot -> value, variables which are not in the dictionary are not constant
+Constants = Dict[int, Value]
+
+# instructions which compute value of the variable only from their operands
+FOLDABLE_OPCODES = ['ADD', 'SUB', 'MUL', 'IDIV', 'LT', 'GT', 'EQ', 'AND', 'OR', 'NOT', 'INT2CHAR', 'STRI2INT',
+                    'CONCAT', 'STRLEN', 'GETCHAR', 'TYPE']
+FOLDABLE_JUMP_OPCODES = ['JUMPIFEQ', 'JUMPIFNEQ']
+
+SYMBOL_TYPES = {
+    ValueType.INT: SymbolType.INT,
+    ValueType.BOOL: SymbolType.BOOL,
+    ValueType.STRING: SymbolType.STRING,
+    ValueType.NIL: SymbolType.NIL,
+}
+
+# jump target used when conditional jump is evaluated, so the taken jump can be recognized
+_EVALUATED_TARGET = -1
+
+
+class DataflowOptimizer:
+    """
+    Optimizations of compiled program based on control flow graph:
+
+    - constant propagation: operands which are global variables with value known at compile time are replaced by
+      the constant (known value implies that the variable is defined and initialized, so no error is lost),
+    - constant folding: instruction with constant operands is replaced by MOVE of the result, conditional jump
+      is replaced by JUMP or removed; instructions which would fail are left unchanged,
+    - removal of unreachable blocks.
+
+    Only global variables are tracked, local and temporary frames change at runtime. Function called by CALL can
+    change any global variable, so nothing is known after CALL.
+    """
+
+    # optimization is repeated, because folded jumps can make other blocks unreachable
+    MAX_ROUNDS = 4
+
+    def __init__(self, global_names: List[str], local_names: List[str]):
+        self.global_names = global_names
+        self.local_names = local_names
+        self.closure_compiler = ClosureCompiler()
+        # name of optimization -> how many times it was applied
+        self.optimizations: Counter = Counter()
+
+    def optimize(self, program: List[Instruction], labels: Dict[str, int]) -> Tuple[List[Instruction], Dict[str, int]]:
+        """
+        Returns optimized copy of the program, instructions of the given program are not modified.
+        :param program:
+        :param labels:
+        :return: optimized program and labels pointing to it
+        """
+        for _ in range(self.MAX_ROUNDS):
+            applied = sum(self.optimizations.values())
+            program, labels = self._optimize_round(program, labels)
+            if sum(self.optimizations.values()) == applied:
+                break
+        return program, labels
+
+    def _optimize_round(self, program: List[Instruction],
+                        labels: Dict[str, int]) -> Tuple[List[Instruction], Dict[str, int]]:
+        graph = ControlFlowGraph(program)
+        states = graph.forward({}, self._transfer, self._meet, self._edge)
+
+        optimized: List[Instruction] = []
+        # index in program -> index in optimized program, removed instruction is replaced by the following one
+        new_indexes = [0] * (len(program) + 1)
+        for block in graph.blocks:
+            if block.id not in states:
+                for index in range(block.start, block.end):
+                    new_indexes[index] = len(optimized)
+                self.optimizations["unreachable instructions"] += block.end - block.start
+                continue
+
+            constants = dict(states[block.id])
+            for index, instruction in enumerate(block.instructions, block.start):
+                new_indexes[index] = len(optimized)
+                result = self._process(instruction, constants)
+                self._count(instruction, result)
+                if result is not None:
+                    optimized.append(result)
+        new_indexes[len(program)] = len(optimized)
+
+        for index, instruction in enumerate(optimized):
+            if instruction.target is not None:
+                instruction = copy.copy(instruction)
+                instruction.target = new_indexes[instruction.target]
+                optimized[index] = instruction
+        return optimized, {label: new_indexes[index] for label, index in labels.items()}
+
+    def _count(self, instruction: Instruction, result: Optional[Instruction]):
+        if result is None:
+            self.optimizations["removed never taken jumps"] += 1
+        elif result.opcode != instruction.opcode:
+            self.optimizations["folded instructions"] += 1
+        elif result is not instruction:
+            self.optimizations["constant operands"] += 1
+
+    # dataflow analysis
+
+    def _transfer(self, block: BasicBlock, constants: Constants) -> Constants:
+        constants = dict(constants)
+        for instruction in block.instructions:
+            self._process(instruction, constants)
+        return constants
+
+    @staticmethod
+    def _meet(constants1: Constants, constants2: Constants) -> Constants:
+        return {slot: value for slot, value in constants1.items() if constants2.get(slot) == value}
+
+    @staticmethod
+    def _edge(block: BasicBlock, successor: BasicBlock, kind: str, constants: Constants) -> Constants:
+        # called function could change any variable
+        return {} if kind == CALL_RETURN else constants
+
+    # optimization of instructions
+
+    def _process(self, instruction: Instruction, constants: Constants) -> Optional[Instruction]:
+        """
+        Returns optimized instruction (None if it can be removed) and updates known constants by its effect.
+        """
+        instruction = self._propagate(instruction, constants)
+        if instruction.opcode in FOLDABLE_OPCODES:
+            instruction = self._fold(instruction)
+        elif instruction.opcode in FOLDABLE_JUMP_OPCODES:
+            instruction = self._fold_jump(instruction)
+            if instruction is None:
+                return None
+
+        correct_format = ProgramValidator.FORMATS[instruction.opcode]
+        if correct_format and correct_format[0] == VAR:
+            var = instruction.args.get(1)
+            if var.frame == FrameType.GF:
+                value = instruction.args.get(2)
+                if instruction.opcode == 'MOVE' and value.type != SymbolType.VAR:
+                    constants[var.slot] = value.constant
+                else:
+                    constants.pop(var.slot, None)
+        return instruction
+
+    def _propagate(self, instruction: Instruction, constants: Constants) -> Instruction:
+        """
+        Replaces operands which are global variables with known value by constants.
+        """
+        if not constants:
+            return instruction
+        correct_format = ProgramValidator.FORMATS[instruction.opcode]
+        args = None
+        for number, symbol in instruction.args.items():
+            if correct_format[number - 1] == VAR or symbol.type != SymbolType.VAR:
+                # written variable or not a variable
+                continue
+            if symbol.frame == FrameType.GF and symbol.slot in constants:
+                if args is None:
+                    args = dict(instruction.args)
+                args[number] = self._constant_symbol(constants[symbol.slot])
+
+        if args is None:
+            return instruction
+        return self._copy(instruction, instruction.opcode, args)
+
+    def _fold(self, instruction: Instruction) -> Instruction:
+        var = instruction.args.get(1)
+        if any(symbol.type == SymbolType.VAR for number, symbol in instruction.args.items() if number > 1):
+            return instruction
+
+        memory = Memory(self.global_names, self.local_names)
+        memory.new_temp_frame()
+        memory.push_temp_to_local()
+        memory.new_temp_frame()
+        values = memory.get_frame(var.frame).values
+        values[var.slot] = UNINITIALIZED
+        try:
+            self.closure_compiler.compile([instruction])[0](SimpleNamespace(memory=memory))
+        except InterpretError:
+            # error has to be raised when the instruction is executed
+            return instruction
+        return self._copy(instruction, 'MOVE', {1: var, 2: self._constant_symbol(values[var.slot])})
+
+    def _fold_jump(self, instruction: Instruction) -> Optional[Instruction]:
+        """
+        Returns JUMP if the conditional jump is always taken, None if it is never taken.
+        """
+        if instruction.args.get(2).type == SymbolType.VAR or instruction.args.get(3).type == SymbolType.VAR:
+            return instruction
+
+        evaluated = copy.copy(instruction)
+        evaluated.target = _EVALUATED_TARGET
+        try:
+            taken = self.closure_compiler.compile([evaluated])[0](SimpleNamespace(memory=None)) == _EVALUATED_TARGET
+        except InterpretError:
+            return instruction
+        if not taken:
+            return None
+        return self._copy(instruction, 'JUMP', {1: instruction.args.get(1)})
+
+    @staticmethod
+    def _copy(instruction: Instruction, opcode: str, args: Dict[int, Symbol]) -> Instruction:
+        result = Instruction(opcode, instruction.order, args)
+        result.target = instruction.target
+        return result
+
+    @staticmethod
+    def _constant_symbol(value: Value) -> Symbol:
+        value_type, python_value = value
+        if value_type == ValueType.STRING:
+            # folded CONCAT can return buffer, constants are plain strings
+            python_value = str(python_value)
+            value = (value_type, python_value)
+        symbol_type = SYMBOL_TYPES[value_type]
+        return Symbol.parsed(symbol_type, 'nil' if symbol_type == SymbolType.NIL else python_value, value)
@@ -1,7 +1,7 @@
 import sys
 
 from Instruction import Instruction
-from Symbol import SymbolTypeHelper
+from Value import to_debug_str
 
 
 class DebugManager:
@@ -9,11 +9,11 @@ class DebugManager:
         self.interpret = interpret
 
     def dprint(self, instruction: Instruction):
-        instruction.check_format([SymbolTypeHelper.DATABLE_NIL])
-        symb = self.interpret.memory.symbol_or_var_symbol(instruction.args.get(1))
-        print(symb, file=sys.stderr)
+        value = self.interpret.memory.value_of(instruction.args.get(1))
+        # stdout is buffered, flush it to keep order of both outputs
+        self.interpret.output.flush()
+        print(to_debug_str(value), file=sys.stderr)
 
     def break_fn(self, instruction: Instruction):
-        instruction.check_format([])
-
+        self.interpret.output.flush()
         print(self.interpret, file=sys.stderr)
\ No newline at end of file
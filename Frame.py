@@ -1,21 +1,39 @@
-from enum import Enum
-from typing import Dict
+from typing import List
 
 from InterpretError import InterpretErrorEnum, InterpretError
-from Variable import Variable
+from Value import Value, UNINITIALIZED, to_debug_str
 
 
 class Frame:
-    def __init__(self):
-        self.variables: Dict[str, Variable] = {}
+    """
+    Frame stores values of variables in a list, index of variable (slot) is assigned when the program is compiled.
+    Value None means that variable is not defined, defined variable without value holds UNINITIALIZED.
+    """
+    __slots__ = ('names', 'values')
 
-    def define_variable(self, name):
-        if name in self.variables:
-            raise InterpretError(InterpretErrorEnum.SEMANTIC_ERR, "Redefining variable " + name)
-        self.variables[name] = Variable(name)
+    def __init__(self, names: List[str]):
+        self.names = names  # slot -> variable name, shared by all frames of the same kind
+        self.values: List[Value] = [None] * len(names)
+
+    def define_variable(self, slot: int):
+        if self.values[slot] is not None:
+            raise InterpretError(InterpretErrorEnum.SEMANTIC_ERR, "Redefining variable " + self.names[slot])
+        self.values[slot] = UNINITIALIZED
+
+    def get_value(self, slot: int) -> Value:
+        value = self.values[slot]
+        if value is None:
+            raise InterpretError(InterpretErrorEnum.NON_EXISTING_VAR, f"Non existing variable {self.names[slot]}")
+        return value
+
+    def set_value(self, slot: int, value: Value):
+        if self.values[slot] is None:
+            raise InterpretError(InterpretErrorEnum.NON_EXISTING_VAR, f"Non existing variable {self.names[slot]}")
+        self.values[slot] = value
 
     def __str__(self):
         ret_str = "\n"
-        for var in self.variables.values():
-            ret_str += f"\tVariable {var.name}: {str(var.symbol_value)}\n"
-        return ret_str
\ No newline at end of file
+        for name, value in zip(self.names, self.values):
+            if value is not None:
+                ret_str += f"\tVariable {name}: {to_debug_str(value)}\n"
+        return ret_str
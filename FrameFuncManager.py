@@ -1,7 +1,4 @@
 from Instruction import Instruction
-from InterpretError import InterpretErrorEnum, InterpretError
-from Symbol import SymbolType, SymbolTypeHelper
-from Variable import Variable
 
 
 class FrameFuncManager:
@@ -9,42 +6,32 @@ class FrameFuncManager:
         self.interpret = interpret
 
     def move(self, instruction: Instruction):
-        instruction.check_format([[SymbolType.VAR], SymbolTypeHelper.DATABLE_NIL])
         move_to = instruction.args.get(1)
         move_from = instruction.args.get(2)
 
-        move_to_var: Variable = self.interpret.memory.get_variable(move_to.value, move_to.frame)
-        move_from = self.interpret.memory.symbol_or_var_symbol(move_from)
+        self.interpret.memory.check_variable(move_to)
+        move_from = self.interpret.memory.value_of(move_from)
 
-        move_to_var.symbol_value = move_from
+        self.interpret.memory.set_value(move_to, move_from)
 
     def create_frame(self, instruction: Instruction):
-        instruction.check_format([])
         self.interpret.memory.new_temp_frame()
 
     def push_frame(self, instruction: Instruction):
-        instruction.check_format([])
         self.interpret.memory.push_temp_to_local()
 
     def pop_frame(self, instruction: Instruction):
-        instruction.check_format([])
         self.interpret.memory.pop_local_to_temp()
 
     def defvar(self, instruction: Instruction):
-        instruction.check_format([[SymbolType.VAR]])
         var_arg = instruction.args.get(1)
-        self.interpret.memory.def_variable(var_arg.value, var_arg.frame)
+        self.interpret.memory.def_variable(var_arg)
 
     def call(self, instruction: Instruction):
-        instruction.check_format([[SymbolType.LABEL]])
-
-        label_name = instruction.args.get(1).value
-
         self.interpret.push_counter()
-        self.interpret.jump_label(label_name)
+        self.interpret.jump(instruction)
 
     def return_fn(self, instruction: Instruction):
-        instruction.check_format([])
         self.interpret.pop_counter()
 
 
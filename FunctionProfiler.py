@@ -0,0 +1,212 @@
+from time import perf_counter
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from Instruction import Instruction
+
+# name of the code which is not in any function, labels cannot contain '<'
+TOP_LEVEL = '<main>'
+# deeper calls are attributed to the function at this depth, so deep recursion does not create huge paths
+MAX_PATH_DEPTH = 256
+# number of the hottest call paths printed in the report
+PROFILE_TOP_PATHS = 10
+
+
+class CallNode:
+    """
+    Function in the call tree, one node for each call path. Time and instructions are exclusive (without called
+    functions).
+    """
+    __slots__ = ('label', 'parent', 'children', 'depth', 'calls', 'time', 'instructions')
+
+    def __init__(self, label: str, parent: Optional['CallNode'] = None):
+        self.label = label
+        self.parent = parent
+        self.children: Dict[int, CallNode] = {}  # index of the first instruction of called function -> node
+        self.depth = parent.depth + 1 if parent is not None else 0
+        self.calls = 0
+        self.time = 0.0
+        self.instructions = 0
+
+    def path(self) -> List[str]:
+        labels = []
+        node = self
+        while node is not None:
+            labels.append(node.label)
+            node = node.parent
+        return labels[::-1]
+
+
+class FunctionProfiler:
+    """
+    Call graph profile of functions (targets of CALL) collected by the instrumented interpretation loop (see
+    Interpret._run_function_profiling), which reports only boundaries of functions: CALL (also fused with
+    PUSHFRAME by --optimize), RETURN, entries of functions (memoized function can return immediately) and JUMP
+    to entry of function (replaced tail call). Other instructions are only counted.
+
+    Calls are detected by change of call stack, so the profile follows the call stack also when function jumps out
+    without RETURN: it stays in the path until its return address is popped. Tail call replaces the calling
+    function in the path, because it does not return to it.
+    """
+
+    def __init__(self, program: List[Instruction], labels: Dict[str, int]):
+        self.program = program
+        # index of the first instruction -> name of function
+        self.names: Dict[int, str] = {}
+        for label, index in sorted(labels.items(), reverse=True):
+            self.names[index] = label
+        self.entries = {instruction.target for instruction in program if instruction.opcode == 'CALL'}
+        self.tail_calls = {index for index, instruction in enumerate(program)
+                           if instruction.opcode == 'JUMP' and instruction.target in self.entries}
+        self.root = CallNode(TOP_LEVEL)
+        self.root.calls = 1
+        self.stack: List[CallNode] = [self.root]  # node of each return address on call stack
+        self.executed = 0  # instructions executed until the last boundary
+        self.clock = 0.0  # time of the last boundary
+
+    def boundaries(self, fused_calls: bool, memoized: Iterable[int]) -> bytearray:
+        """
+        Returns flags of instructions whose execution can change the function being executed.
+        :param fused_calls: instruction before CALL can be fused with it
+        :param memoized: entries of memoized functions
+        """
+        flags = bytearray(len(self.program))
+        for index, instruction in enumerate(self.program):
+            if (instruction.opcode in ['CALL', 'RETURN'] or index in self.tail_calls
+                    or (fused_calls and index + 1 < len(self.program) and self.program[index + 1].opcode == 'CALL')):
+                flags[index] = 1
+        for index in memoized:
+            flags[index] = 1
+        return flags
+
+    def _name(self, index: int) -> str:
+        name = self.names.get(index)
+        if name is None:
+            order = self.program[index].order if index < len(self.program) else 0
+            name = self.names[index] = f'<order {order}>'
+        return name
+
+    def boundary(self, executed: int, depth: int, new_depth: int, index: int, next_index: int):
+        """
+        Updates the call path after boundary instruction was executed.
+        :param executed: number of executed instructions including the boundary one
+        :param depth: length of call stack before the instruction
+        :param new_depth: length of call stack after it
+        :param index: index of the instruction
+        :param next_index: index of the following instruction
+        """
+        if new_depth == depth and (index not in self.tail_calls or len(self.stack) == 1):
+            return
+
+        now = perf_counter()
+        stack = self.stack
+        node = stack[-1]
+        node.time += now - self.clock
+        node.instructions += executed - self.executed
+        self.clock = now
+        self.executed = executed
+
+        if new_depth > depth:
+            caller = node
+        elif new_depth < depth:
+            for _ in range(depth - new_depth):
+                if len(stack) > 1:
+                    stack.pop()
+            return
+        else:
+            stack.pop()
+            # node is repeated in the stack when depth of path is limited
+            caller = node if node is stack[-1] else node.parent
+        if caller.depth < MAX_PATH_DEPTH:
+            node = caller.children.get(next_index)
+            if node is None:
+                node = caller.children[next_index] = CallNode(self._name(next_index), caller)
+        else:
+            node = caller
+        node.calls += 1
+        stack.append(node)
+
+    def start(self):
+        self.clock = perf_counter()
+
+    def stop(self, executed: int):
+        now = perf_counter()
+        node = self.stack[-1]
+        node.time += now - self.clock
+        node.instructions += executed - self.executed
+        self.clock = now
+        self.executed = executed
+
+    def nodes(self) -> List[CallNode]:
+        nodes = []
+        pending = [self.root]
+        while pending:
+            node = pending.pop()
+            nodes.append(node)
+            pending.extend(node.children.values())
+        return nodes
+
+    def functions(self) -> List[Tuple[str, int, float, float, int, int]]:
+        """
+        Returns (label, calls, inclusive time, exclusive time, inclusive instructions, exclusive instructions) of
+        each function, sorted by inclusive time.
+        """
+        calls: Counter = Counter()
+        exclusive_time: Counter = Counter()
+        exclusive_instructions: Counter = Counter()
+        inclusive_time: Counter = Counter()
+        inclusive_instructions: Counter = Counter()
+        # labels on the path of node -> how many times, recursive function is included once
+        on_path: Counter = Counter()
+        pending: List[Tuple[CallNode, bool]] = [(self.root, True)]
+        while pending:
+            node, entering = pending.pop()
+            if not entering:
+                on_path[node.label] -= 1
+                continue
+            on_path[node.label] += 1
+            pending.append((node, False))
+            pending.extend((child, True) for child in node.children.values())
+            calls[node.label] += node.calls
+            exclusive_time[node.label] += node.time
+            exclusive_instructions[node.label] += node.instructions
+            for label, count in on_path.items():
+                if count:
+                    inclusive_time[label] += node.time
+                    inclusive_instructions[label] += node.instructions
+        result = [(label, calls[label], inclusive_time[label], exclusive_time[label], inclusive_instructions[label],
+                   exclusive_instructions[label]) for label in calls]
+        result.sort(key=lambda item: item[2], reverse=True)
+        return result
+
+    def collapsed_stacks(self) -> List[str]:
+        """
+        Returns lines of collapsed stacks (path separated by semicolons and exclusive time in microseconds), which
+        are read by flamegraph tools.
+        """
+        lines = []
+        for node in self.nodes():
+            microseconds = round(node.time * 1e6)
+            if microseconds:
+                lines.append(f"{';'.join(node.path())} {microseconds}")
+        lines.sort()
+        return lines
+
+    def write_flamegraph(self, path: str):
+        with open(path, 'w') as file:
+            for line in self.collapsed_stacks():
+                file.write(line + "\n")
+
+    def report(self) -> str:
+        total = sum(node.time for node in self.nodes()) or 1.0
+        lines = ["Function profile:",
+                 f"  {'function':<20}{'calls':>10}{'incl. [s]':>12}{'incl. %':>9}{'excl. [s]':>12}{'excl. %':>9}"
+                 f"{'incl. instr':>13}{'excl. instr':>13}"]
+        for label, calls, inclusive, exclusive, inclusive_instructions, exclusive_instructions in self.functions():
+            lines.append(f"  {label:<20}{calls:>10}{inclusive:>12.6f}{100 * inclusive / total:>9.1f}"
+                         f"{exclusive:>12.6f}{100 * exclusive / total:>9.1f}{inclusive_instructions:>13}"
+                         f"{exclusive_instructions:>13}")
+        lines.append("  hottest call paths (exclusive time):")
+        for node in sorted(self.nodes(), key=lambda node: node.time, reverse=True)[:PROFILE_TOP_PATHS]:
+            lines.append(f"  {node.time:>12.6f} {100 * node.time / total:>6.1f} %  {';'.join(node.path())}")
+        return "\n".join(lines)
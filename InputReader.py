@@ -0,0 +1,87 @@
+import codecs
+import io
+from typing import List, Optional, TextIO
+
+# size of blocks in which input which is not interactive is read
+INPUT_BLOCK_SIZE = 1 << 16
+
+
+class InputReader:
+    """
+    Provides lines of input for READ instructions. Input from file or pipe is read in blocks of up to block_size
+    which are split into lines, so reading one value does not need a call of the stream. Block is only what the
+    stream has available (read1 of its binary buffer, decoded incrementally), so the program does not wait for a full
+    block from a pipe whose writer waits for the output. Interactive input (terminal) is read line by line, so the
+    program does not wait for more lines than it needs.
+    """
+
+    def __init__(self, stream: TextIO, block_size: int = INPUT_BLOCK_SIZE):
+        self.stream = stream
+        self.block_size = block_size
+        self.interactive = stream.isatty()
+
+        self.lines: List[str] = []  # complete lines of the last block
+        self.position = 0  # index of the next line in lines
+        self.rest = ''  # beginning of a line which continues in the next block
+        self.eof = False
+
+        # binary stream below text stream (not StringIO) and decoder of its bytes with universal newlines
+        self.buffer = getattr(stream, 'buffer', None) if not self.interactive else None
+        self.decoder = None
+        if self.buffer is not None and hasattr(self.buffer, 'read1'):
+            decoder = codecs.getincrementaldecoder(stream.encoding)(stream.errors or 'strict')
+            self.decoder = io.IncrementalNewlineDecoder(decoder, translate=True)
+
+    def buffered(self) -> bool:
+        """
+        Returns whether the next line is known without reading the stream.
+        """
+        return self.position < len(self.lines)
+
+    def readline(self) -> Optional[str]:
+        """
+        Returns the next line without line ending, None at the end of input.
+        :return:
+        """
+        if self.position < len(self.lines):
+            line = self.lines[self.position]
+            self.position += 1
+            return line
+
+        if self.interactive:
+            line = self.stream.readline()
+            if line == '':
+                return None
+            return line.rstrip("\n")
+        return self._next_block_line()
+
+    def _read_block(self) -> str:
+        if self.decoder is None:
+            return self.stream.read(self.block_size)
+        while True:
+            data = self.buffer.read1(self.block_size)
+            block = self.decoder.decode(data, final=not data)
+            # block is empty also when data end inside of encoded character
+            if block or not data:
+                return block
+
+    def _next_block_line(self) -> Optional[str]:
+        while not self.eof:
+            block = self._read_block()
+            if block == '':
+                self.eof = True
+                break
+
+            lines = (self.rest + block).split("\n")
+            self.rest = lines.pop()
+            if lines:
+                self.lines = lines
+                self.position = 1
+                return lines[0]
+
+        # the last line does not need to end by line ending
+        if self.rest:
+            line = self.rest
+            self.rest = ''
+            return line
+        return None
@@ -9,11 +9,12 @@ class Instruction:
         self.opcode = opcode.upper()
         self.order = order
         self.args = args
+        self.target: int = None  # index of jump target, resolved by ProgramCompiler
 
     def __str__(self):
         return f'{self.opcode} {self.order} {self.args}'
 
-    # eg.  correct_format = [[SymbolType.VAR, SymbolType.String], [SymbolType.String]]
+    # eg.  correct_format = [[SymbolType.VAR, SymbolType.STRING], [SymbolType.STRING]], see ProgramValidator.FORMATS
     def check_format(self, correct_format):
         ok = self._are_args_ok(correct_format)
         if not ok:
@@ -4,12 +4,19 @@ class InterpretErrorEnum:
     WRONG_XML_FORMAT=31
     UNEXPECTED_XML=32
     SEMANTIC_ERR=52
-    WRONG_OPERAND_TYPE= 53,
-    NON_EXISTING_VAR=54,
-    NON_EXISTING_FRAME=55,
-    NON_EXISTING_VALUE=56,
-    WRONG_OPERAND_VALUE=57, # TODO: Check if 57 or 53 is correct for all usages
+    WRONG_OPERAND_TYPE= 53
+    NON_EXISTING_VAR=54
+    NON_EXISTING_FRAME=55
+    NON_EXISTING_VALUE=56
+    WRONG_OPERAND_VALUE=57 # TODO: Check if 57 or 53 is correct for all usages
     WRONG_STRING_OPERATION=58
+    # execution budgets (see Budget)
+    INSTRUCTION_BUDGET=60
+    TIME_BUDGET=61
+    DATA_STACK_BUDGET=62
+    CALL_STACK_BUDGET=63
+    FRAME_BUDGET=64
+    STRING_BUDGET=65
 
 
 class InterpretError(Exception):
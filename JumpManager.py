@@ -2,7 +2,7 @@ import sys
 
 from Instruction import Instruction
 from InterpretError import InterpretErrorEnum, InterpretError
-from Symbol import SymbolType, SymbolTypeHelper, Symbol
+from Value import Value, ValueType
 
 
 class JumpManager:
@@ -10,58 +10,55 @@ class JumpManager:
         self.interpret = interpret
 
     def label(self, instruction: Instruction):
-        instruction.check_format([[SymbolType.LABEL]])
-        label_name = instruction.args.get(1).value
-        label_counter = instruction.order
-
-        self.interpret.save_label(label_name, label_counter)
+        # labels are resolved when the program is loaded, LABEL is never executed
+        pass
 
     def jump(self, instruction: Instruction):
-        instruction.check_format([[SymbolType.LABEL]])
-        label_name = instruction.args.get(1).value
-
-        self.interpret.jump_label(label_name)
+        self.interpret.jump(instruction)
 
     def jumpifeq(self, instruction: Instruction):
-        instruction.check_format([[SymbolType.LABEL], SymbolTypeHelper.DATABLE_NIL, SymbolTypeHelper.DATABLE_NIL])
-
-        label_name = instruction.args.get(1).value
-        symb1: Symbol = self.interpret.memory.symbol_or_var_symbol(instruction.args.get(2))
-        symb2: Symbol = self.interpret.memory.symbol_or_var_symbol(instruction.args.get(3))
-
-        self.interpret.does_label_exist(label_name)
-
-        at_least_one_nil = symb1.type == SymbolType.NIL or symb2.type == SymbolType.NIL
-        if (symb1.type != symb2.type) and not at_least_one_nil:
-            raise InterpretError(InterpretErrorEnum.WRONG_OPERAND_TYPE, "Wrong operand type")
+        symb1 = self.interpret.memory.value_of(instruction.args.get(2))
+        symb2 = self.interpret.memory.value_of(instruction.args.get(3))
 
-        if (at_least_one_nil and symb1.type == symb2.type) or (symb1.value == symb2.value):
-            self.interpret.jump_label(label_name)
+        if self._equals(symb1, symb2):
+            self.interpret.jump(instruction)
 
     def jumpifneq(self, instruction: Instruction):
-        instruction.check_format([[SymbolType.LABEL], SymbolTypeHelper.DATABLE_NIL, SymbolTypeHelper.DATABLE_NIL])
+        symb1 = self.interpret.memory.value_of(instruction.args.get(2))
+        symb2 = self.interpret.memory.value_of(instruction.args.get(3))
 
-        label_name = instruction.args.get(1).value
-        symb1: Symbol = self.interpret.memory.symbol_or_var_symbol(instruction.args.get(2))
-        symb2: Symbol = self.interpret.memory.symbol_or_var_symbol(instruction.args.get(3))
+        if not self._equals(symb1, symb2):
+            self.interpret.jump(instruction)
 
-        self.interpret.does_label_exist(label_name)
+    def jumpifeqs(self, instruction: Instruction):
+        symb2 = self.interpret.memory.pop_data_stack()
+        symb1 = self.interpret.memory.pop_data_stack()
 
-        at_least_one_nil = symb1.type == SymbolType.NIL or symb2.type == SymbolType.NIL
-        if (symb1.type != symb2.type) and not at_least_one_nil:
-            raise InterpretError(InterpretErrorEnum.WRONG_OPERAND_TYPE, "Wrong operand type")
+        if self._equals(symb1, symb2):
+            self.interpret.jump(instruction)
 
-        if (at_least_one_nil and symb1.type == symb2.type) or (symb1.value == symb2.value):
-            return
-        self.interpret.jump_label(label_name)
+    def jumpifneqs(self, instruction: Instruction):
+        symb2 = self.interpret.memory.pop_data_stack()
+        symb1 = self.interpret.memory.pop_data_stack()
 
-    def exit(self, instruction: Instruction):
-        instruction.check_format([[SymbolType.INT, SymbolType.VAR]])
+        if not self._equals(symb1, symb2):
+            self.interpret.jump(instruction)
 
-        symb:Symbol = self.interpret.memory.symbol_or_var_symbol(instruction.args.get(1))
-        if symb.type != SymbolType.INT:
+    def exit(self, instruction: Instruction):
+        symb_type, symb_value = self.interpret.memory.value_of(instruction.args.get(1))
+        if symb_type != ValueType.INT:
             raise InterpretError(InterpretErrorEnum.WRONG_OPERAND_TYPE)
-        elif not (0 <= symb.value <= 49):
+        elif not (0 <= symb_value <= 49):
             raise InterpretError(InterpretErrorEnum.WRONG_OPERAND_VALUE)
 
-        sys.exit(symb.value)
\ No newline at end of file
+        sys.exit(symb_value)
+
+    def _equals(self, symb1: Value, symb2: Value) -> bool:
+        (type1, value1), (type2, value2) = symb1, symb2
+
+        at_least_one_nil = type1 == ValueType.NIL or type2 == ValueType.NIL
+        if (type1 != type2) and not at_least_one_nil:
+            raise InterpretError(InterpretErrorEnum.WRONG_OPERAND_TYPE,
+                                 "Type of symbol 1 is not equal to the type of symbol 2")
+
+        return (at_least_one_nil and type1 == type2) or (value1 == value2)
\ No newline at end of file
@@ -0,0 +1,166 @@
+import sys
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from Frame import Frame
+from Instruction import Instruction
+from PureFunctionAnalysis import FunctionSummary, ENTRY, OWN, NO_FRAME, MIXED
+from Value import Value
+
+# default maximum number of cached results
+MEMO_CACHE_SIZE = 4096
+
+# (index of the first instruction, arguments from data stack, values of local frame or None, values of temporary frame
+# of the caller or None)
+Key = Tuple[int, Tuple[Value, ...], Optional[Tuple[Value, ...]], Optional[Tuple[Value, ...]]]
+# (values replacing the arguments on data stack, values of local frame, state of temporary frame, its values)
+Result = Tuple[Tuple[Value, ...], Optional[Tuple[Value, ...]], str, Optional[Tuple[Value, ...]]]
+# call being executed: (length of call stack, key, start of arguments on data stack, local frame, summary)
+PendingCall = Tuple[int, Key, int, Optional[Frame], FunctionSummary]
+
+
+class Memoizer:
+    """
+    Memoizes results of pure functions found by PureFunctionAnalysis in LRU cache.
+
+    Function of the first instruction of pure function is wrapped: when the inputs of the function are cached, their
+    result is applied to memory and the function returns immediately (without executing any instruction of it).
+    Otherwise the call is remembered and RETURN which ends it stores the result. Inputs are arguments on data stack,
+    local frame and temporary frame of the caller, as far as the function uses them. Function can be entered by CALL or
+    JUMP (replaced tail call), it returns to the top of call stack in both cases. Only calls which succeed are
+    cached, functions which fail are executed again and fail the same way.
+
+    Memoizer is part of Program shared by its executions, calls being executed are held by each Interpret
+    (memo_pending) and the cache is guarded by lock, so executions can overlap.
+    """
+
+    def __init__(self, summaries: Dict[int, FunctionSummary], cache_size: int = MEMO_CACHE_SIZE):
+        self.summaries = summaries
+        self.cache_size = cache_size
+        self.cache: OrderedDict[Key, Result] = OrderedDict()  # the least recently used result is the first
+        self.lock = threading.Lock()  # guards cache and its statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.memory = 0  # estimated size of cached keys and results in bytes
+
+    def wrap(self, program: List[Instruction], ops: List[Callable]) -> List[Callable]:
+        """
+        Returns compiled instructions with memoized pure functions.
+        """
+        ops = list(ops)
+        returns = set()
+        for entry, summary in self.summaries.items():
+            ops[entry] = self._memoized_entry(entry, summary, ops[entry])
+            returns.update(index for index in summary.body if program[index].opcode == 'RETURN')
+        for index in returns:
+            ops[index] = self._memoized_return(index, ops[index])
+        return ops
+
+    def _memoized_entry(self, entry: int, summary: FunctionSummary, op: Callable) -> Callable:
+        arguments = summary.arguments
+        uses_local_frame = summary.uses_local_frame
+        uses_temp_frame = summary.uses_temp_frame
+        cache = self.cache
+        lock = self.lock
+
+        def memoized(interpret):
+            memory = interpret.memory
+            call_stack = interpret.call_stack
+            data_stack = memory.data_stack
+            base = len(data_stack) - arguments
+            if not call_stack or base < 0 or (uses_local_frame and not memory.local_frames) or \
+                    (uses_temp_frame and memory.temp_frame is None):
+                # the function fails
+                return op(interpret)
+
+            local_frame = memory.local_frames[-1] if uses_local_frame else None
+            key = (entry, tuple(data_stack[base:]), tuple(local_frame.values) if local_frame is not None else None,
+                   tuple(memory.temp_frame.values) if uses_temp_frame else None)
+            with lock:
+                result = cache.get(key)
+                if result is None:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+                    cache.move_to_end(key)
+            pending = interpret.memo_pending
+            if result is None:
+                pending.append((len(call_stack), key, base, local_frame, summary))
+                return op(interpret)
+
+            results, local_values, temp_frame, temp_values = result
+            data_stack[base:] = results
+            if local_frame is not None:
+                local_frame.values[:] = local_values
+            if temp_frame == OWN:
+                memory.new_temp_frame()
+                memory.temp_frame.values[:] = temp_values
+            elif temp_frame == ENTRY and temp_values is not None:
+                memory.temp_frame.values[:] = temp_values
+            elif temp_frame == NO_FRAME:
+                memory.temp_frame = None
+            if pending and pending[-1][0] == len(call_stack):
+                # functions which entered this one by JUMP return with the same result
+                self._store(interpret, None, temp_frame if temp_frame != ENTRY else MIXED)
+            return call_stack.pop()
+        return memoized
+
+    def _memoized_return(self, index: int, op: Callable) -> Callable:
+        def memoized(interpret):
+            pending = interpret.memo_pending
+            if pending and pending[-1][0] == len(interpret.call_stack):
+                self._store(interpret, index)
+            return op(interpret)
+        return memoized
+
+    def _store(self, interpret, index: Optional[int], temp_frame: str = MIXED):
+        """
+        Caches results of calls which end by RETURN with the index, function entered by JUMP from other function
+        ends together with it. Without the index the calls end by cached result of function they entered by JUMP,
+        temp_frame is then the state of temporary frame (ENTRY is not known for them).
+        """
+        memory = interpret.memory
+        pending = interpret.memo_pending
+        depth = len(interpret.call_stack)
+        while pending and pending[-1][0] == depth:
+            _, key, base, local_frame, summary = pending.pop()
+            if index is not None:
+                temp_frame = summary.returns.get(index, MIXED)
+            if temp_frame == MIXED:
+                # state of temporary frame depends on the path
+                continue
+            # temporary frame of the caller can be changed by the function
+            changed_temp_frame = temp_frame == OWN or (temp_frame == ENTRY and summary.uses_temp_frame)
+            result = (tuple(memory.data_stack[base:]),
+                      tuple(local_frame.values) if local_frame is not None else None, temp_frame,
+                      tuple(memory.temp_frame.values) if changed_temp_frame else None)
+            with self.lock:
+                if key in self.cache:
+                    # the result was cached by recursive call or other execution
+                    continue
+                self.cache[key] = result
+                self.memory += self._size(key) + self._size(result)
+                if len(self.cache) > self.cache_size:
+                    evicted_key, evicted_result = self.cache.popitem(last=False)
+                    self.memory -= self._size(evicted_key) + self._size(evicted_result)
+                    self.evictions += 1
+
+    @staticmethod
+    def _size(entry: tuple) -> int:
+        size = sys.getsizeof(entry)
+        for part in entry:
+            if type(part) is tuple:
+                size += sys.getsizeof(part)
+                for value in part:
+                    if value is not None:
+                        size += sys.getsizeof(value) + sys.getsizeof(value[1])
+        return size
+
+    def report(self) -> str:
+        calls = self.hits + self.misses
+        hit_rate = 100 * self.hits / calls if calls else 0
+        return (f"Memoization: {len(self.summaries)} pure functions, {self.hits} hits, {self.misses} misses "
+                f"({hit_rate:.1f} % hit rate), {len(self.cache)} cached results, {self.evictions} evictions, "
+                f"{self.memory / 1024:.1f} KiB")
@@ -3,16 +3,27 @@ from Frame import Frame
 from FrameType import FrameType
 from InterpretError import InterpretError, InterpretErrorEnum
 from Symbol import Symbol, SymbolType
-from Variable import Variable
+from Value import Value, UNINITIALIZED
+
+# maximum number of discarded frames kept for reuse
+FRAME_POOL_SIZE = 256
 
 
 class Memory:
 
-    def __init__(self):
-        self.global_frame = Frame()
+    def __init__(self, global_names: List[str] = None, local_names: List[str] = None,
+                 frame_pool_size: int = FRAME_POOL_SIZE):
+        # names of variables by their slots, local and temporary frames share slots
+        self.global_names: List[str] = global_names if global_names is not None else []
+        self.local_names: List[str] = local_names if local_names is not None else []
+        self.global_frame = Frame(self.global_names)
         self.temp_frame: Frame = None  #
         self.local_frames: List[Frame] = []
-        self.data_stack: List[Symbol] = []
+        self.data_stack: List[Value] = []
+        # temporary frames discarded by CREATEFRAME and POPFRAME are cleared and reused, calls do not allocate them
+        self.frame_pool: List[Frame] = []
+        self.frame_pool_size = frame_pool_size
+        self.empty_values: List[Value] = [None] * len(self.local_names)
 
     def get_frame(self, frame_type: FrameType) -> Frame:
         """
@@ -39,10 +50,18 @@ class Memory:
         return self.local_frames[-1]
 
     def new_local_frame(self):
-        self.local_frames.append(Frame())
+        self.local_frames.append(Frame(self.local_names))
 
     def new_temp_frame(self):
-        self.temp_frame = Frame()
+        frame = self.temp_frame
+        if frame is not None and self.frame_pool_size:
+            # replaced frame is reused directly
+            frame.values[:] = self.empty_values
+        elif self.frame_pool:
+            frame = self.frame_pool.pop()
+        else:
+            frame = Frame(self.local_names)
+        self.temp_frame = frame
 
     def push_temp_to_local(self):
         if self.temp_frame is None:
@@ -51,39 +70,52 @@ class Memory:
         self.temp_frame = None
 
     def pop_local_to_temp(self):
+        discarded = self.temp_frame
         self.temp_frame = self.get_local_frame() # could use pop, but that would raise wrong exception
         self.local_frames.pop() # pop local frame
+        if discarded is not None and len(self.frame_pool) < self.frame_pool_size:
+            discarded.values[:] = self.empty_values
+            self.frame_pool.append(discarded)
 
-    def def_variable(self, var_name: str, frame: FrameType):
-        frame = self.get_frame(frame)
-        frame.define_variable(var_name)
+    def def_variable(self, var: Symbol):
+        self.get_frame(var.frame).define_variable(var.slot)
+
+    def check_variable(self, var: Symbol):
+        """
+        Checks if variable is defined in its frame.
+        """
+        self.get_frame(var.frame).get_value(var.slot)
 
-    def get_variable(self, var_name: str, frame: FrameType) -> Variable:
-        frame = self.get_frame(frame)
-        if var_name not in frame.variables:
-            raise InterpretError(InterpretErrorEnum.NON_EXISTING_VAR, f"Non existing variable {var_name}")
-        return frame.variables.get(var_name)
+    def set_value(self, var: Symbol, value: Value):
+        """
+        Stores value into defined variable.
+        """
+        self.get_frame(var.frame).set_value(var.slot, value)
 
-    def symbol_or_var_symbol(self, symbol: Symbol, check_if_initialized: bool = True) -> Symbol:
+    def value_of(self, symbol: Symbol, check_if_initialized: bool = True) -> Value:
         """
-        Returns real value from symbol, or in case of variable, finds variable in memory and returns its symbol_value.
+        Returns runtime value of constant argument, or in case of variable, finds variable in memory and returns its
+        value.
         """
         if symbol.type != SymbolType.VAR:
-            return symbol
+            return symbol.constant
 
         # is variable -> check if initialized
-        variable: Variable = self.get_variable(symbol.value, symbol.frame)
-        if check_if_initialized and (variable.symbol_value.type == SymbolType.NOT_INITIALIZED):
+        value = self.get_frame(symbol.frame).get_value(symbol.slot)
+        if check_if_initialized and value is UNINITIALIZED:
             raise InterpretError(InterpretErrorEnum.NON_EXISTING_VALUE, "Not initialized value")
-        return variable.symbol_value
+        return value
 
-    def push_data_stack(self, symbol: Symbol):
-        self.data_stack.append(symbol)
+    def push_data_stack(self, value: Value):
+        self.data_stack.append(value)
 
-    def pop_data_stack(self) -> Symbol:
+    def pop_data_stack(self) -> Value:
         if len(self.data_stack) == 0:
             raise InterpretError(InterpretErrorEnum.NON_EXISTING_VALUE, "Data stack is empty, cannot pop")
         return self.data_stack.pop()
 
+    def clear_data_stack(self):
+        self.data_stack.clear()
+
     def __str__(self):
         return f"Global: {self.global_frame}\n Local frames: {self.local_frames}\n Temporary frame: {self.temp_frame}"
\ No newline at end of file
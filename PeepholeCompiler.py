@@ -0,0 +1,251 @@
+import copy
+import operator
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ClosureCompiler import NIL
+from FrameType import FrameType
+from Instruction import Instruction
+from InterpretError import InterpretErrorEnum, InterpretError
+from Symbol import Symbol, SymbolType
+from TypeInference import VariableTypes
+from TypedCompiler import TypedCompiler
+from Value import TRUE_VALUE, FALSE_VALUE, UNINITIALIZED
+
+
+class PeepholeCompiler(TypedCompiler):
+    """
+    Closure compiler with peephole optimizations, which reduce number of dispatches of the interpretation loop
+    (instructions which are not fused are also specialized by proven types, see TypedCompiler):
+
+    - jump threading: instruction which continues to JUMP (or jumps to it) continues directly to the target of JUMP,
+    - compare and branch: LT/GT/EQ followed by JUMPIFEQ/JUMPIFNEQ which compares the result with bool constant is
+      executed as one superinstruction, which also stores the result,
+    - CREATEFRAME followed by DEFVAR of temporary variable and PUSHFRAME followed by CALL (calling convention).
+
+    Fused function replaces only function of the first instruction, functions of the following instructions stay in
+    the program, so jumps into the middle of fused sequence work. Instructions which can fail are always the first
+    ones of fused sequence, so errors are reported with the same instruction.
+    """
+
+    CONDITIONAL_JUMP_OPCODES = ['JUMPIFEQ', 'JUMPIFNEQ', 'JUMPIFEQS', 'JUMPIFNEQS']
+    COMPARE_OPCODES = {'LT': operator.lt, 'GT': operator.gt}
+
+    def __init__(self, types: Optional[List[VariableTypes]] = None):
+        super().__init__(types)
+        # (opcode, opcode of the following instruction) -> method building superinstruction
+        self.fused_builders = {
+            ('LT', 'JUMPIFEQ'): self._compare_branch,
+            ('LT', 'JUMPIFNEQ'): self._compare_branch,
+            ('GT', 'JUMPIFEQ'): self._compare_branch,
+            ('GT', 'JUMPIFNEQ'): self._compare_branch,
+            ('EQ', 'JUMPIFEQ'): self._compare_branch,
+            ('EQ', 'JUMPIFNEQ'): self._compare_branch,
+            ('CREATEFRAME', 'DEFVAR'): self._create_frame_defvar,
+            ('PUSHFRAME', 'CALL'): self._push_frame_call,
+        }
+        self.program: List[Instruction] = []
+        # (index, index of the next function) -> number of instructions executed by the transition, if it is not 1
+        self.costs: Dict[Tuple[int, int], int] = {}
+
+    def compile(self, program: List[Instruction]) -> List[Callable]:
+        self.program = program
+        ops = []
+        for index, instruction in enumerate(program):
+            op = self._compile_fused(instruction, index)
+            if op is None:
+                op = self._compile_threaded(instruction, index)
+            ops.append(op)
+        return ops
+
+    def _compile_threaded(self, instruction: Instruction, index: int) -> Callable:
+        """
+        Compiles instruction so that it skips JUMP instructions which would follow it.
+        """
+        opcode = instruction.opcode
+        if opcode not in self.builders or opcode in ['RETURN', 'EXIT']:
+            return self._compile_instruction(instruction, index)
+
+        if opcode in self.CONDITIONAL_JUMP_OPCODES:
+            next_index, next_skipped = self._resolve(index + 1)
+            target, target_skipped = self._resolve(instruction.target)
+            if not self._add_costs(index, 1, next_index, next_skipped, target, target_skipped):
+                return self._compile_instruction(instruction, index)
+            if next_skipped or target_skipped:
+                self.optimizations[f"{opcode}+JUMP"] += 1
+            return self._compile_instruction(self._with_target(instruction, target), index, next_index)
+
+        if opcode in ['JUMP', 'CALL']:
+            # CALL does not skip JUMP after it, so RETURN returns to the same instruction as without optimization
+            target, target_skipped = self._resolve(instruction.target)
+            if target_skipped:
+                self.costs[(index, target)] = 1 + target_skipped
+                self.optimizations[f"{opcode}+JUMP"] += 1
+            return self._compile_instruction(self._with_target(instruction, target), index)
+
+        next_index, next_skipped = self._resolve(index + 1)
+        if next_skipped:
+            self.costs[(index, next_index)] = 1 + next_skipped
+            self.optimizations[f"{opcode}+JUMP"] += 1
+        return self._compile_instruction(instruction, index, next_index)
+
+    def _compile_fused(self, instruction: Instruction, index: int) -> Optional[Callable]:
+        """
+        Returns superinstruction which executes the instruction together with the following one, None if there
+        is no superinstruction for them.
+        """
+        if index + 1 >= len(self.program):
+            return None
+        following = self.program[index + 1]
+        builder = self.fused_builders.get((instruction.opcode, following.opcode))
+        if builder is None:
+            return None
+
+        op = builder(instruction, following, index)
+        if op is not None:
+            self.optimizations[f"{instruction.opcode}+{following.opcode}"] += 1
+        return op
+
+    def _compare_branch(self, instruction: Instruction, jump: Instruction, index: int) -> Optional[Callable]:
+        var = instruction.args.get(1)
+        jump_symb1 = jump.args.get(2)
+        jump_symb2 = jump.args.get(3)
+        if self._is_same_var(var, jump_symb1) and jump_symb2.type == SymbolType.BOOL:
+            constant = jump_symb2.value
+        elif self._is_same_var(var, jump_symb2) and jump_symb1.type == SymbolType.BOOL:
+            constant = jump_symb1.value
+        else:
+            return None
+
+        next_index, next_skipped = self._resolve(index + 2)
+        target, target_skipped = self._resolve(jump.target)
+        if not self._add_costs(index, 2, next_index, next_skipped, target, target_skipped):
+            return None
+
+        # result of comparison for which the jump is taken
+        jump_when = constant if jump.opcode == 'JUMPIFEQ' else not constant
+        return self._build_compare_branch(instruction, next_index, target, jump_when)
+
+    def _build_compare_branch(self, instruction: Instruction, next_index: int, jump_target: int, jump_when: bool):
+        var, symb1, symb2 = instruction.args.get(1), instruction.args.get(2), instruction.args.get(3)
+        target = self._target(var)
+        slot = var.slot
+        first = self._value(symb1)
+        second = self._value(symb2)
+
+        if instruction.opcode == 'EQ':
+            equals = self._equals
+
+            def op(interpret):
+                memory = interpret.memory
+                type1, value1 = first(memory)
+                type2, value2 = second(memory)
+                values = target(memory)
+                result = equals(type1, value1, type2, value2)
+                values[slot] = TRUE_VALUE if result else FALSE_VALUE
+                return jump_target if result == jump_when else next_index
+            return op
+
+        operation = self.COMPARE_OPCODES[instruction.opcode]
+
+        def op(interpret):
+            memory = interpret.memory
+            type1, value1 = first(memory)
+            type2, value2 = second(memory)
+            values = target(memory)
+            if type1 != type2:
+                raise InterpretError(InterpretErrorEnum.WRONG_OPERAND_TYPE,
+                                     "Type of symbol 1 is not equal to the type of symbol 2")
+            if type1 == NIL:
+                raise InterpretError(InterpretErrorEnum.WRONG_OPERAND_TYPE, "Cannot compare with nil")
+            result = operation(value1, value2)
+            values[slot] = TRUE_VALUE if result else FALSE_VALUE
+            return jump_target if result == jump_when else next_index
+        return op
+
+    def _create_frame_defvar(self, instruction: Instruction, defvar: Instruction, index: int) -> Optional[Callable]:
+        var = defvar.args.get(1)
+        if var.frame != FrameType.TF:
+            return None
+        # new temporary frame is empty, so DEFVAR cannot fail
+        slot = var.slot
+        next_index, next_skipped = self._resolve(index + 2)
+        self.costs[(index, next_index)] = 2 + next_skipped
+
+        def op(interpret):
+            memory = interpret.memory
+            memory.new_temp_frame()
+            memory.temp_frame.values[slot] = UNINITIALIZED
+            return next_index
+        return op
+
+    def _push_frame_call(self, instruction: Instruction, call: Instruction, index: int) -> Optional[Callable]:
+        # CALL cannot fail, return address stays the instruction following CALL
+        return_index = index + 2
+        target, target_skipped = self._resolve(call.target)
+        self.costs[(index, target)] = 2 + target_skipped
+
+        def op(interpret):
+            interpret.memory.push_temp_to_local()
+            interpret.call_stack.append(return_index)
+            return target
+        return op
+
+    def _resolve(self, index: int) -> Tuple[int, int]:
+        """
+        Follows chain of JUMP instructions starting at index.
+        :return: index of the first instruction which is not JUMP and number of skipped JUMP instructions
+        """
+        start = index
+        skipped = 0
+        visited = set()
+        while index < len(self.program) and self.program[index].opcode == 'JUMP':
+            if index in visited:
+                # infinite loop of jumps stays as it is
+                return start, 0
+            visited.add(index)
+            index = self.program[index].target
+            skipped += 1
+        return index, skipped
+
+    def _add_costs(self, index: int, executed: int, next_index: int, next_skipped: int,
+                   target: int, target_skipped: int) -> bool:
+        """
+        Saves number of instructions executed by both transitions of branching function. Returns False if both
+        transitions lead to the same function with different number of instructions, the function cannot be
+        optimized then, because the number of executed instructions would not be known.
+        """
+        if next_index == target and next_skipped != target_skipped:
+            return False
+        if executed + next_skipped != 1:
+            self.costs[(index, next_index)] = executed + next_skipped
+        if executed + target_skipped != 1:
+            self.costs[(index, target)] = executed + target_skipped
+        return True
+
+    @staticmethod
+    def _with_target(instruction: Instruction, target: int) -> Instruction:
+        # loaded program is not changed, so it can be executed (or cached) without optimizations
+        instruction = copy.copy(instruction)
+        instruction.target = target
+        return instruction
+
+    @staticmethod
+    def _is_same_var(var: Symbol, symbol: Symbol) -> bool:
+        return symbol.type == SymbolType.VAR and symbol.frame == var.frame and symbol.value == var.value
+
+    def report(self, dispatches: int, executed: int) -> str:
+        """
+        Returns description of applied optimizations and of the reduction of dispatches.
+        :param dispatches: number of executed functions
+        :param executed: number of instructions which would be executed without peephole optimizations
+        :return:
+        """
+        lines = ["Optimizations:"]
+        for name, count in self.optimizations.most_common():
+            lines.append(f"  {name:<28} {count}")
+        if not self.optimizations:
+            lines.append("  none")
+        saved = executed - dispatches
+        percent = 100 * saved / executed if executed else 0
+        lines.append(f"Dispatches: {dispatches} for {executed} instructions ({saved} fewer, {percent:.1f} %)")
+        return "\n".join(lines)
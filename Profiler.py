@@ -0,0 +1,73 @@
+import json
+from typing import Any, Dict, List
+
+from Instruction import Instruction
+
+# number of the slowest instructions printed in the report, JSON contains all executed instructions
+PROFILE_TOP_INSTRUCTIONS = 20
+
+
+class Profiler:
+    """
+    Execution counts and cumulative wall time of compiled instructions, collected by the instrumented interpretation
+    loop (see Interpret._run_profiling), the normal loop is not affected. Time of instruction includes one call of
+    the timer. Superinstructions of --optimize are counted as their first instruction.
+    """
+
+    def __init__(self, program: List[Instruction]):
+        self.program = program
+        # index of instruction -> number of executions and seconds spent in it
+        self.counts: List[int] = [0] * len(program)
+        self.times: List[float] = [0.0] * len(program)
+
+    def instructions(self) -> List[Dict[str, Any]]:
+        """
+        Returns statistics of executed instructions, the slowest first.
+        """
+        statistics = [{'order': instruction.order, 'opcode': instruction.opcode, 'count': self.counts[index],
+                       'time': self.times[index]}
+                      for index, instruction in enumerate(self.program) if self.counts[index]]
+        statistics.sort(key=lambda item: item['time'], reverse=True)
+        return statistics
+
+    def opcodes(self) -> List[Dict[str, Any]]:
+        """
+        Returns statistics of executed instructions summed by opcodes, the slowest first.
+        """
+        by_opcode: Dict[str, Dict[str, Any]] = {}
+        for index, instruction in enumerate(self.program):
+            if self.counts[index]:
+                item = by_opcode.setdefault(instruction.opcode, {'opcode': instruction.opcode, 'count': 0, 'time': 0.0})
+                item['count'] += self.counts[index]
+                item['time'] += self.times[index]
+        return sorted(by_opcode.values(), key=lambda item: item['time'], reverse=True)
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            'instructions_executed': sum(self.counts),
+            'time': sum(self.times),
+            'opcodes': self.opcodes(),
+            'instructions': self.instructions(),
+        }
+
+    def write_json(self, path: str):
+        with open(path, 'w') as file:
+            json.dump(self.to_json(), file, indent=2)
+
+    def report(self) -> str:
+        executed = sum(self.counts)
+        total = sum(self.times) or 1.0
+        lines = [f"Profile: {executed} instructions executed in {sum(self.times):.6f} s",
+                 f"  {'opcode':<12}{'count':>12}{'time [s]':>12}{'time %':>8}{'avg [us]':>10}"]
+        for item in self.opcodes():
+            lines.append(f"  {item['opcode']:<12}{item['count']:>12}{item['time']:>12.6f}"
+                         f"{100 * item['time'] / total:>8.1f}{1e6 * item['time'] / item['count']:>10.3f}")
+
+        instructions = self.instructions()
+        lines.append(f"  slowest instructions ({min(len(instructions), PROFILE_TOP_INSTRUCTIONS)} of "
+                     f"{len(instructions)} executed):")
+        lines.append(f"  {'order':>8} {'opcode':<12}{'count':>12}{'time [s]':>12}{'time %':>8}{'avg [us]':>10}")
+        for item in instructions[:PROFILE_TOP_INSTRUCTIONS]:
+            lines.append(f"  {item['order']:>8} {item['opcode']:<12}{item['count']:>12}{item['time']:>12.6f}"
+                         f"{100 * item['time'] / total:>8.1f}{1e6 * item['time'] / item['count']:>10.3f}")
+        return "\n".join(lines)
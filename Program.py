@@ -0,0 +1,142 @@
+import io
+from collections import Counter
+from typing import BinaryIO, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from ClosureCompiler import ClosureCompiler
+from DataflowOptimizer import DataflowOptimizer
+from Instruction import Instruction
+from Memoizer import Memoizer
+from PeepholeCompiler import PeepholeCompiler
+from ProgramCache import ProgramCache
+from ProgramCompiler import ProgramCompiler
+from ProgramValidator import ProgramValidator
+from PureFunctionAnalysis import PureFunctionAnalysis
+from PythonCompiler import PythonCompiler
+from TailCallOptimizer import TailCallOptimizer
+from TypeInference import TypeInference
+from XmlInstructionsFactory import XmlInstructionsFactory
+
+
+class Program(NamedTuple):
+    """
+    Loaded program (see ProgramLoader) which can be executed any number of times, each execution has its own
+    Interpret (see Interpret.from_program) with memory, call stack, counter, input and output. Executions do not
+    change the program, only the cache of memoized results of pure functions is shared by them (guarded by lock of
+    Memoizer), so they can overlap.
+    """
+    engine: str
+    optimize: bool  # compiled by PeepholeCompiler
+    instructions: Tuple[Instruction, ...]  # dense list of instructions with labels resolved to indexes
+    labels: Dict[str, int]
+    global_names: Tuple[str, ...]  # slot -> name of global variable
+    local_names: Tuple[str, ...]  # slot -> name of local/temporary variable
+    ops: Tuple[Callable, ...]  # compiled instructions, each returns index of the next instruction
+    compiler: Optional[ClosureCompiler]
+    memoizer: Optional[Memoizer]
+    tail_calls: Dict[int, int]  # index of CALL replaced by JUMP -> number of JUMPs from its return address to RETURN
+    program_function: Optional[Callable]  # whole program compiled into python by pycompile engine
+    program_source: str  # source of program_function
+
+
+class ProgramLoader:
+    """
+    Loads, validates and compiles program from XML source for the selected engine and options of compilation.
+    """
+
+    def __init__(self, engine: str = 'closure', cache: Optional[ProgramCache] = None):
+        self.engine = engine
+        self.cache = cache
+        self.optimize = False  # peephole optimizations of closure engine
+        self.tail_calls = True  # CALL followed by RETURN inside function is executed as JUMP
+        self.memo_cache_size = 0  # maximum number of memoized results of pure functions, 0 disables memoization
+
+    def load(self, source: BinaryIO) -> Program:
+        """
+        If cache is set, compiled program is taken from the cache when the same source was already compiled, otherwise
+        it is compiled and stored into the cache.
+        """
+        if self.cache is None:
+            program, labels, global_names, local_names = self.compile_program(self.parse_instructions(source))
+        else:
+            source = source.read()
+            key = self.cache.key(source)
+            compiled = self.cache.load(key)
+            if compiled is not None:
+                program, labels, global_names, local_names = compiled
+            else:
+                compiled = self.compile_program(self.parse_instructions(io.BytesIO(source)))
+                # cached program does not depend on options of execution, they are applied by prepare_execution
+                self.cache.store(key, compiled)
+                program, labels, global_names, local_names = compiled
+
+        return self.prepare_execution(program, labels, global_names, local_names)
+
+    @staticmethod
+    def parse_instructions(source: BinaryIO) -> Dict[int, Instruction]:
+        """
+        Loads instructions from source file / stdin into dictionary and validates whole program, so instructions do
+        not need to check their format when executed.
+        :return: order -> instruction
+        """
+        factory = XmlInstructionsFactory()
+
+        instructions = factory.load_instructions(source)
+        ProgramValidator().validate(instructions)
+        return instructions
+
+    @staticmethod
+    def compile_program(instructions: Dict[int, Instruction]) \
+            -> Tuple[List[Instruction], Dict[str, int], List[str], List[str]]:
+        """
+        Compiles loaded instructions into dense list of instructions with labels resolved to indexes.
+        :return: program, labels, names of global variables and names of local/temporary variables ordered by slots
+        """
+        compiler = ProgramCompiler()
+        program, labels = compiler.compile(instructions)
+        global_names, local_names = compiler.bind_operands(program)
+        return program, labels, global_names, local_names
+
+    def prepare_execution(self, program: List[Instruction], labels: Dict[str, int], global_names: List[str],
+                          local_names: List[str]) -> Program:
+        """
+        Builds function for each instruction according to selected engine.
+        """
+        optimize = self.engine == 'closure' and self.optimize
+        optimizations = Counter()
+        tail_calls = {}
+        if optimize:
+            optimizer = DataflowOptimizer(global_names, local_names)
+            program, labels = optimizer.optimize(program, labels)
+            optimizations.update(optimizer.optimizations)
+        if self.tail_calls and self.engine != 'reference':
+            tail_call_optimizer = TailCallOptimizer()
+            program = tail_call_optimizer.optimize(program)
+            tail_calls = tail_call_optimizer.tail_calls
+            optimizations.update(tail_call_optimizer.optimizations)
+
+        compiler = None
+        program_function = None
+        program_source = ''
+        if optimize:
+            compiler = PeepholeCompiler(TypeInference(program).infer())
+            compiler.optimizations.update(optimizations)
+            ops = compiler.compile(program)
+        elif self.engine == 'closure':
+            compiler = ClosureCompiler()
+            ops = compiler.compile(program)
+        elif self.engine == 'pycompile':
+            # closures execute instructions which are not generated inline
+            compiler = ClosureCompiler()
+            ops = compiler.compile(program)
+            program_function, program_source = PythonCompiler().compile(program, ops, TypeInference(program).infer())
+        else:
+            # reference engine executes every instruction by managers
+            ops = [lambda interpret, index=index: interpret.run_instruction(index) for index in range(len(program))]
+
+        memoizer = None
+        if self.memo_cache_size and self.engine == 'closure':
+            memoizer = Memoizer(PureFunctionAnalysis(program).analyse(), self.memo_cache_size)
+            ops = memoizer.wrap(program, ops)
+
+        return Program(self.engine, optimize, tuple(program), labels, tuple(global_names), tuple(local_names),
+                       tuple(ops), compiler, memoizer, tail_calls, program_function, program_source)
@@ -0,0 +1,123 @@
+import hashlib
+import marshal
+import os
+import tempfile
+from typing import Dict, List, Optional, Tuple
+
+from FrameType import FrameType
+from Instruction import Instruction
+from Symbol import Symbol, SymbolType
+
+# compiled program: instructions, labels, names of global variables, names of local variables
+CompiledProgram = Tuple[List[Instruction], Dict[str, int], List[str], List[str]]
+
+# dictionaries are faster than lookup of enum member by name
+_SYMBOL_TYPES = {symbol_type.name: symbol_type for symbol_type in SymbolType}
+_FRAME_TYPES = {frame_type.name: frame_type for frame_type in FrameType}
+
+# size of SHA-256 digest of the serialized program in the entry
+DIGEST_SIZE = 32
+
+
+class ProgramCache:
+    """
+    On-disk cache of compiled programs, so the XML source does not need to be parsed, validated and compiled again.
+    Entries are keyed by hash of the source. Entry starts with a header (magic and version of the format) and SHA-256
+    digest of the rest, which is the compiled program serialized by marshal. Entry which cannot be read (also when
+    the digest does not match) is ignored and program is compiled again.
+    """
+
+    MAGIC = b'IPPC'
+    # has to be increased whenever compiled program or its serialization changes
+    FORMAT_VERSION = 2
+    HEADER = MAGIC + bytes([FORMAT_VERSION, marshal.version])
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def key(self, source: bytes) -> str:
+        return hashlib.sha256(source).hexdigest()
+
+    def load(self, key: str) -> Optional[CompiledProgram]:
+        """
+        Returns compiled program from cache, None if there is no valid entry for the key.
+        :param key:
+        :return:
+        """
+        try:
+            with open(self._path(key), 'rb') as file:
+                data = file.read()
+        except OSError:
+            return None
+
+        if not data.startswith(self.HEADER):
+            return None
+        digest = data[len(self.HEADER):len(self.HEADER) + DIGEST_SIZE]
+        payload = data[len(self.HEADER) + DIGEST_SIZE:]
+        if hashlib.sha256(payload).digest() != digest:
+            # truncated or corrupted entry, marshal could fail on it by any exception (also MemoryError)
+            return None
+        try:
+            stored_key, labels, global_names, local_names, instructions = marshal.loads(payload)
+            if stored_key != key:
+                return None
+            program = [self._restore_instruction(instruction) for instruction in instructions]
+        except Exception:
+            # entry of the same format which does not describe a program
+            return None
+        return program, labels, global_names, local_names
+
+    def store(self, key: str, compiled: CompiledProgram):
+        """
+        Saves compiled program into cache. Entry is written into temporary file which atomically replaces the entry,
+        so processes storing the same program at the same time cannot corrupt it. Cache is only an optimization,
+        so failure of writing is ignored.
+        :param key:
+        :param compiled:
+        :return:
+        """
+        program, labels, global_names, local_names = compiled
+        payload = marshal.dumps(
+            (key, labels, global_names, local_names, [self._dump_instruction(instruction) for instruction in program]))
+        data = self.HEADER + hashlib.sha256(payload).digest() + payload
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix='.' + key, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as file:
+                    file.write(data)
+                os.replace(temp_path, self._path(key))
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        except OSError:
+            pass
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + '.ippc')
+
+    def _dump_instruction(self, instruction: Instruction) -> tuple:
+        args = []
+        for number, symbol in instruction.args.items():
+            value = symbol.value.name if symbol.type == SymbolType.TYPE else symbol.value
+            frame = symbol.frame.name if symbol.type == SymbolType.VAR else None
+            slot = symbol.slot if symbol.type == SymbolType.VAR else None
+            args.append((number, symbol.type.name, value, frame, slot, symbol.constant))
+        return instruction.opcode, instruction.order, instruction.target, args
+
+    def _restore_instruction(self, dumped: tuple) -> Instruction:
+        opcode, order, target, dumped_args = dumped
+        args: Dict[int, Symbol] = {}
+        for number, type_name, value, frame, slot, constant in dumped_args:
+            symbol_type = _SYMBOL_TYPES[type_name]
+            symbol = Symbol.parsed(symbol_type, _SYMBOL_TYPES[value] if symbol_type == SymbolType.TYPE else value,
+                                   constant)
+            if symbol.type == SymbolType.VAR:
+                symbol.frame = _FRAME_TYPES[frame]
+                symbol.slot = slot
+            args[number] = symbol
+
+        instruction = Instruction(opcode, order, args)
+        instruction.target = target
+        return instruction
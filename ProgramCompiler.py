@@ -0,0 +1,60 @@
+from typing import Dict, List, Tuple
+
+from FrameType import FrameType
+from Instruction import Instruction
+from Symbol import SymbolType
+from Value import from_symbol
+
+
+class ProgramCompiler:
+    """
+    Compiles instructions loaded by factory (dictionary indexed by order) into dense list of instructions.
+    LABEL instructions are removed from the list, every label points to index of the instruction following it.
+    Program has to be validated by ProgramValidator first.
+    """
+
+    JUMP_OPCODES = ['JUMP', 'JUMPIFEQ', 'JUMPIFNEQ', 'CALL', 'JUMPIFEQS', 'JUMPIFNEQS']
+    NOT_CONSTANT_TYPES = [SymbolType.VAR, SymbolType.LABEL, SymbolType.TYPE]
+
+    def compile(self, instructions: Dict[int, Instruction]) -> Tuple[List[Instruction], Dict[str, int]]:
+        """
+        Orders instructions by their order number, resolves labels and sets jump target of all jump instructions.
+        :param instructions:
+        :return: list of instructions and dictionary with index of instruction for each label
+        """
+        program: List[Instruction] = []
+        labels: Dict[str, int] = {}
+
+        for order in sorted(instructions.keys()):
+            instruction = instructions[order]
+            if instruction.opcode == 'LABEL':
+                labels[instruction.args.get(1).value] = len(program)
+            else:
+                program.append(instruction)
+
+        for instruction in program:
+            if instruction.opcode in self.JUMP_OPCODES:
+                instruction.target = labels[instruction.args.get(1).value]
+
+        return program, labels
+
+    def bind_operands(self, program: List[Instruction]) -> Tuple[List[str], List[str]]:
+        """
+        Converts constant arguments into runtime values and assigns index in frame (slot) to every variable argument.
+        Global frame has its own slots, local and temporary frames share slots because temporary frame becomes local
+        frame.
+        :param program:
+        :return: names of global variables and names of local/temporary variables ordered by slots
+        """
+        global_slots: Dict[str, int] = {}
+        local_slots: Dict[str, int] = {}
+
+        for instruction in program:
+            for symbol in instruction.args.values():
+                if symbol.type == SymbolType.VAR:
+                    slots = global_slots if symbol.frame == FrameType.GF else local_slots
+                    symbol.slot = slots.setdefault(symbol.value, len(slots))
+                elif symbol.type not in self.NOT_CONSTANT_TYPES:
+                    symbol.constant = from_symbol(symbol)
+
+        return list(global_slots.keys()), list(local_slots.keys())
@@ -0,0 +1,106 @@
+from typing import Dict, Set
+
+from Instruction import Instruction
+from InterpretError import InterpretErrorEnum, InterpretError
+from Symbol import SymbolType, SymbolTypeHelper
+
+VAR = frozenset([SymbolType.VAR])
+SYMB = frozenset(SymbolTypeHelper.DATABLE_NIL)
+LABEL = frozenset([SymbolType.LABEL])
+TYPE = frozenset([SymbolType.TYPE])
+INT_SYMB = frozenset([SymbolType.VAR, SymbolType.INT])
+STRING_SYMB = frozenset([SymbolType.VAR, SymbolType.STRING])
+
+
+class ProgramValidator:
+    """
+    Static validation of whole program. Checks everything that does not depend on values of variables, so the
+    instructions do not need to check their format when they are executed.
+    """
+
+    # opcode -> allowed types of arguments
+    FORMATS = {
+        "MOVE": (VAR, SYMB),
+        "CREATEFRAME": (),
+        "PUSHFRAME": (),
+        "POPFRAME": (),
+        "DEFVAR": (VAR,),
+        "CALL": (LABEL,),
+        "RETURN": (),
+        "PUSHS": (SYMB,),
+        "POPS": (VAR,),
+        "ADD": (VAR, SYMB, SYMB),
+        "SUB": (VAR, SYMB, SYMB),
+        "MUL": (VAR, SYMB, SYMB),
+        "IDIV": (VAR, SYMB, SYMB),
+        "LT": (VAR, SYMB, SYMB),
+        "GT": (VAR, SYMB, SYMB),
+        "EQ": (VAR, SYMB, SYMB),
+        "AND": (VAR, SYMB, SYMB),
+        "OR": (VAR, SYMB, SYMB),
+        "NOT": (VAR, SYMB),
+        "INT2CHAR": (VAR, INT_SYMB),
+        "STRI2INT": (VAR, SYMB, SYMB),
+        "READ": (VAR, TYPE),
+        "WRITE": (SYMB,),
+        "CONCAT": (VAR, STRING_SYMB, STRING_SYMB),
+        "STRLEN": (VAR, STRING_SYMB),
+        "GETCHAR": (VAR, STRING_SYMB, INT_SYMB),
+        "SETCHAR": (VAR, INT_SYMB, STRING_SYMB),
+        "TYPE": (VAR, SYMB),
+        "LABEL": (LABEL,),
+        "JUMP": (LABEL,),
+        "JUMPIFEQ": (LABEL, SYMB, SYMB),
+        "JUMPIFNEQ": (LABEL, SYMB, SYMB),
+        "EXIT": (INT_SYMB,),
+        "DPRINT": (SYMB,),
+        "BREAK": (),
+        # STACK extension
+        "CLEARS": (),
+        "ADDS": (),
+        "SUBS": (),
+        "MULS": (),
+        "IDIVS": (),
+        "LTS": (),
+        "GTS": (),
+        "EQS": (),
+        "ANDS": (),
+        "ORS": (),
+        "NOTS": (),
+        "INT2CHARS": (),
+        "STRI2INTS": (),
+        "JUMPIFEQS": (LABEL,),
+        "JUMPIFNEQS": (LABEL,),
+    }
+
+    JUMP_OPCODES = ['JUMP', 'JUMPIFEQ', 'JUMPIFNEQ', 'CALL', 'JUMPIFEQS', 'JUMPIFNEQS']
+
+    def validate(self, instructions: Dict[int, Instruction]):
+        """
+        Checks opcodes, number and types of arguments of all instructions and whether labels are defined exactly once.
+        :param instructions:
+        :return:
+        """
+        labels: Set[str] = set()
+
+        for order in sorted(instructions.keys()):
+            instruction = instructions[order]
+            self._check_format(instruction)
+
+            if instruction.opcode == 'LABEL':
+                label_name = instruction.args.get(1).value
+                if label_name in labels:
+                    raise InterpretError(InterpretErrorEnum.SEMANTIC_ERR, f"Redefining label {label_name}")
+                labels.add(label_name)
+
+        for order in sorted(instructions.keys()):
+            instruction = instructions[order]
+            if instruction.opcode in self.JUMP_OPCODES and instruction.args.get(1).value not in labels:
+                raise InterpretError(InterpretErrorEnum.SEMANTIC_ERR,
+                                     f"Not defined label {instruction.args.get(1).value}")
+
+    def _check_format(self, instruction: Instruction):
+        correct_format = self.FORMATS.get(instruction.opcode)
+        if correct_format is None:
+            raise InterpretError(InterpretErrorEnum.UNEXPECTED_XML, f"Wrong opcode {instruction.opcode}")
+        instruction.check_format(correct_format)
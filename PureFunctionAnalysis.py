@@ -0,0 +1,237 @@
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from ControlFlowGraph import ControlFlowGraph, BasicBlock
+from FrameType import FrameType
+from Instruction import Instruction
+from Symbol import SymbolType
+
+# state of temporary frame in function
+ENTRY = 'entry'  # frame of the caller
+OWN = 'own'  # frame created by the function
+NO_FRAME = 'none'  # frame was pushed by the function
+MIXED = 'mixed'  # one of the previous states, depends on the path
+
+# functions which read more values from data stack are not memoized
+MAX_ARGUMENTS = 64
+
+# opcode -> (number of values popped from data stack, number of values pushed)
+STACK_EFFECTS = {
+    'PUSHS': (0, 1), 'POPS': (1, 0),
+    'ADDS': (2, 1), 'SUBS': (2, 1), 'MULS': (2, 1), 'IDIVS': (2, 1), 'LTS': (2, 1), 'GTS': (2, 1), 'EQS': (2, 1),
+    'ANDS': (2, 1), 'ORS': (2, 1), 'NOTS': (1, 1), 'INT2CHARS': (1, 1), 'STRI2INTS': (2, 1),
+    'JUMPIFEQS': (2, 0), 'JUMPIFNEQS': (2, 0),
+}
+
+# instructions without effects outside of frames and data stack, READ, WRITE, DPRINT, BREAK, EXIT and CLEARS are not
+PURE_OPCODES = {
+    'MOVE', 'CREATEFRAME', 'PUSHFRAME', 'POPFRAME', 'DEFVAR', 'CALL', 'RETURN', 'ADD', 'SUB', 'MUL', 'IDIV', 'LT',
+    'GT', 'EQ', 'AND', 'OR', 'NOT', 'INT2CHAR', 'STRI2INT', 'CONCAT', 'STRLEN', 'GETCHAR', 'SETCHAR', 'TYPE', 'JUMP',
+    'JUMPIFEQ', 'JUMPIFNEQ',
+} | set(STACK_EFFECTS)
+
+
+class FunctionSummary(NamedTuple):
+    """
+    Effect of pure function, it depends only on top `arguments` values of data stack, on the local frame (if
+    `uses_local_frame`) and on the temporary frame of the caller (if `uses_temp_frame`). After RETURN these values are
+    replaced by the top `arguments + stack_change` values, the local frame by its new content and the temporary frame
+    is replaced according to state of temporary frame at the RETURN (frame of the caller keeps its new content).
+    """
+    arguments: int
+    stack_change: int
+    uses_local_frame: bool
+    uses_temp_frame: bool
+    temp_frame: str  # state of temporary frame after the function returns
+    returns: Dict[int, str]  # index of RETURN -> state of temporary frame at it
+    body: frozenset  # indexes of instructions which can be executed before the function returns
+
+
+# depth of local frames created by the function, state of temporary frame, data stack depth relative to the call
+State = Tuple[int, str, int]
+
+
+class ImpureFunction(Exception):
+    pass
+
+
+class PureFunctionAnalysis:
+    """
+    Finds functions (targets of CALL) whose result depends only on their inputs and which have no other effects, so
+    their results can be memoized (see Memoizer).
+
+    Function is pure if it reads and writes only data stack, its local frame, temporary frame of the caller (also
+    pushed as its local frame, arguments are usually passed in it) and frames it creates, it does not use global
+    frame, frames below its local frame nor input and output, it calls only pure functions and every path ends by
+    RETURN. Depths of local frames and data stack have to be the same on every path to an instruction, so the effect
+    of the function is known statically. Temporary frame can differ, but it cannot be used then.
+    Summaries of recursive functions are computed iteratively, the call of a function which did not return yet
+    continues nowhere.
+    """
+
+    def __init__(self, program: List[Instruction]):
+        self.program = program
+        self.graph = ControlFlowGraph(program)
+        # target of CALL -> summary, None if no RETURN was reached yet
+        self.summaries: Dict[int, Optional[FunctionSummary]] = {}
+        self.impure: Set[int] = set()
+        # properties of the function being summarized
+        self.minimal_depth = 0
+        self.uses_local_frame = False
+        self.uses_temp_frame = False
+        self.body: Set[int] = set()
+
+    def analyse(self) -> Dict[int, FunctionSummary]:
+        """
+        Returns index of the first instruction -> summary of the pure function.
+        """
+        self.summaries = {instruction.target: None for instruction in self.program if instruction.opcode == 'CALL'
+                          and instruction.target < len(self.program)}
+        changed = True
+        while changed:
+            changed = False
+            for entry in self.summaries:
+                if entry in self.impure:
+                    continue
+                try:
+                    summary = self._summarize(entry)
+                except ImpureFunction:
+                    self.impure.add(entry)
+                    changed = True
+                    continue
+                previous = self.summaries[entry]
+                if summary != previous:
+                    if previous is not None and (summary.stack_change != previous.stack_change
+                                                 or summary.temp_frame not in [previous.temp_frame, MIXED]):
+                        # effect changed by summaries of called functions, the iteration might not converge
+                        self.impure.add(entry)
+                    self.summaries[entry] = summary
+                    changed = True
+        return {entry: summary for entry, summary in self.summaries.items()
+                if summary is not None and entry not in self.impure}
+
+    def _summarize(self, entry: int) -> Optional[FunctionSummary]:
+        self.minimal_depth = 0
+        self.uses_local_frame = False
+        self.uses_temp_frame = False
+        self.body = set()
+        returned: Optional[State] = None
+        returns: Dict[int, str] = {}
+
+        entry_block = self.graph.block_at(entry)
+        states: Dict[int, State] = {entry_block.id: (0, ENTRY, 0)}
+        worklist = [entry_block.id]
+        while worklist:
+            block = self.graph.blocks[worklist.pop()]
+            state = states[block.id]
+            for index in range(block.start, block.end):
+                self.body.add(index)
+                state = self._process(self.program[index], state)
+                if state is None:
+                    # call of function which did not return yet
+                    break
+            if state is None:
+                continue
+
+            if block.last.opcode == 'RETURN':
+                if state[0] != 0:
+                    raise ImpureFunction()
+                returned = state if returned is None else self._meet(returned, state)
+                returns[block.end - 1] = state[1]
+                continue
+            for index in self._successor_indexes(block):
+                if index >= len(self.program):
+                    # program ends
+                    raise ImpureFunction()
+                successor = self.graph.block_of_instruction[index]
+                successor_state = state
+                if successor in states:
+                    successor_state = self._meet(states[successor], state)
+                    if successor_state == states[successor]:
+                        continue
+                states[successor] = successor_state
+                if successor not in worklist:
+                    worklist.append(successor)
+
+        if returned is None:
+            return None
+        return FunctionSummary(-self.minimal_depth, returned[2], self.uses_local_frame, self.uses_temp_frame,
+                               returned[1], returns, frozenset(self.body))
+
+    @staticmethod
+    def _meet(state1: State, state2: State) -> State:
+        if state1[0] != state2[0] or state1[2] != state2[2]:
+            raise ImpureFunction()
+        return state1[0], state1[1] if state1[1] == state2[1] else MIXED, state1[2]
+
+    @staticmethod
+    def _successor_indexes(block: BasicBlock) -> List[int]:
+        # CALL continues by the following instruction when the called function returns
+        last = block.last
+        indexes = []
+        if last.opcode not in ['JUMP', 'CALL']:
+            indexes.append(block.end)
+        if last.target is not None:
+            indexes.append(last.target if last.opcode != 'CALL' else block.end)
+        return indexes
+
+    def _process(self, instruction: Instruction, state: State) -> Optional[State]:
+        """
+        Returns state after the instruction, None if it does not continue.
+        """
+        opcode = instruction.opcode
+        if opcode not in PURE_OPCODES:
+            raise ImpureFunction()
+        depth, temp_frame, stack_depth = state
+
+        for symbol in instruction.args.values():
+            if symbol.type != SymbolType.VAR:
+                continue
+            if symbol.frame == FrameType.GF:
+                raise ImpureFunction()
+            if symbol.frame == FrameType.TF:
+                self._use_temp_frame(temp_frame)
+            if symbol.frame == FrameType.LF and depth == 0:
+                self.uses_local_frame = True
+
+        if opcode == 'CREATEFRAME':
+            return depth, OWN, stack_depth
+        if opcode == 'PUSHFRAME':
+            self._use_temp_frame(temp_frame)
+            return depth + 1, NO_FRAME, stack_depth
+        if opcode == 'POPFRAME':
+            if depth == 0:
+                raise ImpureFunction()
+            return depth - 1, OWN, stack_depth
+        if opcode == 'CALL':
+            if instruction.target in self.impure or instruction.target not in self.summaries:
+                raise ImpureFunction()
+            summary = self.summaries[instruction.target]
+            if summary is None:
+                return None
+            if depth == 0 and summary.uses_local_frame:
+                self.uses_local_frame = True
+            if summary.uses_temp_frame:
+                self._use_temp_frame(temp_frame)
+            self._set_minimal_depth(stack_depth - summary.arguments)
+            if summary.temp_frame != ENTRY:
+                temp_frame = summary.temp_frame
+            return depth, temp_frame, stack_depth + summary.stack_change
+
+        popped, pushed = STACK_EFFECTS.get(opcode, (0, 0))
+        self._set_minimal_depth(stack_depth - popped)
+        return depth, temp_frame, stack_depth - popped + pushed
+
+    def _use_temp_frame(self, temp_frame: str):
+        """
+        Temporary frame is used in the state, it has to be known: frame of the caller or frame created by the function.
+        """
+        if temp_frame == ENTRY:
+            self.uses_temp_frame = True
+        elif temp_frame != OWN:
+            raise ImpureFunction()
+
+    def _set_minimal_depth(self, stack_depth: int):
+        if stack_depth < self.minimal_depth:
+            if stack_depth < -MAX_ARGUMENTS:
+                raise ImpureFunction()
+            self.minimal_depth = stack_depth
@@ -0,0 +1,533 @@
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from ControlFlowGraph import ControlFlowGraph, BasicBlock, TERMINATOR_OPCODES
+from FrameType import FrameType
+from Instruction import Instruction
+from InterpretError import InterpretErrorEnum, InterpretError
+from StringBuffer import concat
+from Symbol import Symbol, SymbolType
+from TypeInference import Types, VariableTypes, VALUE_TYPES, STRING_TYPE
+from Value import ValueType, UNINITIALIZED, TRUE_VALUE, FALSE_VALUE, to_str
+
+INT = ValueType.INT
+BOOL = ValueType.BOOL
+STRING = ValueType.STRING
+NIL = ValueType.NIL
+
+FRAME_NAMES = {FrameType.GF: 'gf', FrameType.LF: 'lf', FrameType.TF: 'tf'}
+
+# maximum number of instructions in one generated function, size of function affects time of compilation
+CHUNK_SIZE = 1000
+
+# part of basic block generated together: (index of the first instruction, instructions)
+Segment = Tuple[int, List[Instruction]]
+
+# arithmetic and relational instructions -> python operator
+OPERATORS = {'ADD': '+', 'SUB': '-', 'MUL': '*', 'IDIV': '//', 'LT': '<', 'GT': '>'}
+
+
+class PythonCompiler:
+    """
+    Lowers whole program into python source, which is compiled by compile() and exec().
+
+    Program is split into chunks of basic blocks, each chunk is one function and a state machine: variable `block`
+    holds index of the first instruction of basic block which is executed next and `while True` loop selects the
+    block by binary tree of comparisons. When control leaves the chunk, its function returns the index and function
+    run_program calls function of the chunk containing it. Frequent instructions are
+    generated inline with values of variables held in python local variables (values of frames), other instructions
+    call function built by ClosureCompiler. Generated code checks operands in the same order as closures, so errors
+    and their codes are the same; index of the executed instruction is kept in variable `pc` for error reporting.
+    """
+
+    def __init__(self):
+        self.lines: List[str] = []
+        self.indent = 0
+        self.length = 0
+        self.types: Optional[List[VariableTypes]] = None
+        # types of variable operands of the instruction being generated
+        self.operand_types: VariableTypes = {}
+        # instructions chunk_start..chunk_end-1 are in the generated function
+        self.chunk_start = 0
+        self.chunk_end = 0
+        self.builders = {
+            "MOVE": self._move,
+            "CREATEFRAME": self._create_frame,
+            "PUSHFRAME": self._push_frame,
+            "POPFRAME": self._pop_frame,
+            "DEFVAR": self._defvar,
+            "CALL": self._call,
+            "RETURN": self._return,
+            "PUSHS": self._pushs,
+            "POPS": self._pops,
+            "ADD": self._arithmetic,
+            "SUB": self._arithmetic,
+            "MUL": self._arithmetic,
+            "IDIV": self._arithmetic,
+            "LT": self._relational,
+            "GT": self._relational,
+            "EQ": self._eq,
+            "AND": self._boolean,
+            "OR": self._boolean,
+            "NOT": self._not,
+            "WRITE": self._write,
+            "CONCAT": self._concat,
+            "STRLEN": self._strlen,
+            "GETCHAR": self._getchar,
+            "JUMP": self._jump,
+            "JUMPIFEQ": self._conditional_jump,
+            "JUMPIFNEQ": self._conditional_jump,
+        }
+
+    def compile(self, program: List[Instruction], ops: List[Callable],
+                types: Optional[List[VariableTypes]] = None) -> Tuple[Callable, str]:
+        """
+        Generates and compiles function executing the program.
+        :param program:
+        :param ops: functions of instructions built by ClosureCompiler, used by instructions which are not inline
+        :param types: types of variable operands proven by TypeInference, checks of proven operands are omitted
+        :return: function accepting interpret and its source
+        """
+        self.types = types
+        namespace = {
+            'InterpretError': InterpretError,
+            'UNINITIALIZED': UNINITIALIZED,
+            'TRUE_VALUE': TRUE_VALUE,
+            'FALSE_VALUE': FALSE_VALUE,
+            'to_str': to_str,
+            'concat': concat,
+            'OPS': ops,
+        }
+        sources = []
+        # functions are compiled one by one, so memory used by compile() is bounded also for large programs
+        for name, source in self.generate(program):
+            exec(compile(source, f'<{name}>', 'exec'), namespace)
+            sources.append(source)
+        return namespace['run_program'], "\n".join(sources)
+
+    def generate(self, program: List[Instruction]) -> Iterator[Tuple[str, str]]:
+        """
+        Generates functions executing parts of the program and function run_program, which calls them.
+        :return: (name, source) of each function
+        """
+        self.length = len(program)
+        graph = ControlFlowGraph(program)
+        chunks = self._split(graph.blocks)
+        for number, segments in enumerate(chunks):
+            yield f"chunk_{number}", self._generate_chunk(number, segments)
+
+        self.lines = []
+        self.indent = 0
+        self._emit("def run_program(interpret):")
+        self.indent += 1
+        self._emit("block = interpret.counter")
+        if chunks:
+            self._emit(f"while block < {self.length}:")
+            self.indent += 1
+            self._tree([segments[0][0] for segments in chunks], 0, len(chunks),
+                       lambda number: self._emit(f"block = chunk_{number}(interpret, block)"))
+            self.indent -= 1
+        self._emit("interpret.counter = block")
+        yield "run_program", "\n".join(self.lines) + "\n"
+
+    @staticmethod
+    def _split(blocks: List[BasicBlock]) -> List[List[Segment]]:
+        """
+        Splits program into chunks of at most CHUNK_SIZE instructions (unless block is longer), longer blocks are
+        split into segments which continue one by another.
+        """
+        chunks: List[List[Segment]] = []
+        size = CHUNK_SIZE
+        for block in blocks:
+            for offset in range(0, len(block.instructions), CHUNK_SIZE):
+                segment = block.instructions[offset:offset + CHUNK_SIZE]
+                if size + len(segment) > CHUNK_SIZE:
+                    chunks.append([])
+                    size = 0
+                chunks[-1].append((block.start + offset, segment))
+                size += len(segment)
+        return chunks
+
+    def _generate_chunk(self, number: int, segments: List[Segment]) -> str:
+        """
+        Generates function executing segments of the chunk, it returns index of the next instruction outside of them.
+        """
+        self.lines = []
+        self.indent = 0
+        start, instructions = segments[-1]
+        self.chunk_start = segments[0][0]
+        self.chunk_end = start + len(instructions)
+
+        self._emit(f"def chunk_{number}(interpret, block, InterpretError=InterpretError, UNINITIALIZED=UNINITIALIZED,")
+        self._emit("            TRUE_VALUE=TRUE_VALUE, FALSE_VALUE=FALSE_VALUE, to_str=to_str, concat=concat, ops=OPS):")
+        self.indent += 1
+        self._emit("memory = interpret.memory")
+        self._emit("gf = memory.global_frame.values")
+        self._emit("local_frames = memory.local_frames")
+        self._emit("lf = local_frames[-1].values if local_frames else None")
+        self._emit("tf = memory.temp_frame.values if memory.temp_frame is not None else None")
+        self._emit("stack = memory.data_stack")
+        self._emit("call_stack = interpret.call_stack")
+        self._emit("write = interpret.output.write")
+        self._emit("pc = block")
+        self._emit("try:")
+        self.indent += 1
+        self._emit("while True:")
+        self.indent += 1
+        self._tree([start for start, _ in segments], 0, len(segments), lambda index: self._block(*segments[index]))
+        self.indent -= 2
+        self._emit("except InterpretError:")
+        self._emit("    interpret.pc = pc")
+        self._emit("    raise")
+        return "\n".join(self.lines) + "\n"
+
+    def _tree(self, starts: List[int], low: int, high: int, leaf: Callable[[int], None]):
+        """
+        Generates binary tree of comparisons of variable block, which selects one of parts low..high-1 by their
+        start indexes.
+        """
+        if high - low == 1:
+            leaf(low)
+            return
+        middle = (low + high) // 2
+        self._emit(f"if block < {starts[middle]}:")
+        self.indent += 1
+        self._tree(starts, low, middle, leaf)
+        self.indent -= 1
+        self._emit("else:")
+        self.indent += 1
+        self._tree(starts, middle, high, leaf)
+        self.indent -= 1
+
+    def _block(self, start: int, instructions: List[Instruction]):
+        self._emit(f"# block {start}")
+        for index, instruction in enumerate(instructions, start):
+            self._emit(f"# {instruction.order}: {instruction.opcode}")
+            self.operand_types = self.types[index] if self.types is not None else {}
+            builder = self.builders.get(instruction.opcode)
+            if builder is None:
+                self._fallback(instruction, index)
+            else:
+                builder(instruction, index, *[instruction.args.get(i) for i in range(1, len(instruction.args) + 1)])
+
+        if instructions[-1].opcode not in TERMINATOR_OPCODES:
+            self._goto(start + len(instructions))
+
+    # helpers
+
+    def _emit(self, line: str):
+        self.lines.append("    " * self.indent + line)
+
+    def _pc(self, index: int):
+        self._emit(f"pc = {index}")
+
+    def _goto(self, index: int):
+        if self.chunk_start <= index < self.chunk_end:
+            self._emit(f"block = {index}")
+            self._emit("continue")
+        else:
+            # block of another chunk or the end of program
+            self._emit(f"return {index}")
+
+    def _goto_dynamic(self):
+        """
+        Continues by block in variable block, which can be in another chunk or the end of program.
+        """
+        if self.chunk_start == 0:
+            self._emit(f"if block >= {self.chunk_end}:")
+        else:
+            self._emit(f"if block < {self.chunk_start} or block >= {self.chunk_end}:")
+        self._emit("    return block")
+        self._emit("continue")
+
+    def _raise(self, error_type: int, message: str = '', condition: Optional[str] = None):
+        error = f"InterpretError({error_type}, {message!r})" if message else f"InterpretError({error_type})"
+        if condition is None:
+            self._emit(f"raise {error}")
+        else:
+            self._emit(f"if {condition}: raise {error}")
+
+    def _known_types(self, symbol: Symbol) -> Optional[Types]:
+        """
+        Returns types of variable proven by TypeInference, proven variable is defined and its frame exists.
+        """
+        return self.operand_types.get((symbol.frame, symbol.slot))
+
+    def _frame(self, symbol: Symbol) -> str:
+        """
+        Checks that frame of the variable exists and returns name of python variable with values of the frame.
+        """
+        frame = FRAME_NAMES[symbol.frame]
+        if symbol.frame != FrameType.GF and self._known_types(symbol) is None:
+            self._raise(InterpretErrorEnum.NON_EXISTING_FRAME, condition=f"{frame} is None")
+        return frame
+
+    def _target(self, var: Symbol) -> str:
+        """
+        Checks that the variable is defined and returns expression of its slot, which can be assigned.
+        """
+        frame = self._frame(var)
+        if self._known_types(var) is not None:
+            return f"{frame}[{var.slot}]"
+        self._raise(InterpretErrorEnum.NON_EXISTING_VAR, f"Non existing variable {var.value}",
+                    f"{frame}[{var.slot}] is None")
+        return f"{frame}[{var.slot}]"
+
+    def _load(self, symbol: Symbol, number: int, check_if_initialized: bool = True) -> str:
+        """
+        Returns expression with value of the symbol, value of variable is loaded into python variable a<number>.
+        """
+        if symbol.type != SymbolType.VAR:
+            return repr(symbol.constant)
+        frame = self._frame(symbol)
+        name = f"a{number}"
+        known_types = self._known_types(symbol)
+        if known_types is not None and (known_types <= VALUE_TYPES or not check_if_initialized):
+            self._emit(f"{name} = {frame}[{symbol.slot}]")
+            return name
+        self._emit(f"{name} = {frame}[{symbol.slot}]")
+        self._raise(InterpretErrorEnum.NON_EXISTING_VAR, f"Non existing variable {symbol.value}", f"{name} is None")
+        if check_if_initialized:
+            self._raise(InterpretErrorEnum.NON_EXISTING_VALUE, "Not initialized value", f"{name} is UNINITIALIZED")
+        return name
+
+    def _operand(self, symbol: Symbol, number: int) -> Tuple[str, str]:
+        """
+        Loads the symbol and returns expressions of its type and python value, constants are inlined.
+        """
+        if symbol.type != SymbolType.VAR:
+            value_type, value = symbol.constant
+            return repr(value_type), repr(value)
+        known_types = self._known_types(symbol)
+        if known_types is not None and len(known_types) == 1 and known_types <= VALUE_TYPES:
+            # type is known, so checks of type are evaluated at compile time
+            self._emit(f"v{number} = {FRAME_NAMES[symbol.frame]}[{symbol.slot}][1]")
+            return repr(next(iter(known_types))), f"v{number}"
+        name = self._load(symbol, number)
+        self._emit(f"t{number}, v{number} = {name}")
+        return f"t{number}", f"v{number}"
+
+    def _check_types(self, checks: List[Tuple[str, int]], message: str = ''):
+        """
+        Raises error if any of type expressions is not the expected type, checks of constants are evaluated now.
+        """
+        conditions = []
+        for type_expression, expected in checks:
+            if type_expression.isdigit():
+                if int(type_expression) != expected:
+                    self._raise(InterpretErrorEnum.WRONG_OPERAND_TYPE, message)
+                    return
+            else:
+                conditions.append(f"{type_expression} != {expected}")
+        if conditions:
+            self._raise(InterpretErrorEnum.WRONG_OPERAND_TYPE, message, " or ".join(conditions))
+
+    def _equals(self, type1: str, value1: str, type2: str, value2: str) -> str:
+        """
+        Generates comparison like EQ and returns expression with its result.
+        """
+        message = "Type of symbol 1 is not equal to the type of symbol 2"
+        if type1.isdigit() and type2.isdigit():
+            if int(type1) == NIL or int(type2) == NIL:
+                return repr(type1 == type2)
+            if type1 != type2:
+                self._raise(InterpretErrorEnum.WRONG_OPERAND_TYPE, message)
+                return "False"
+            return f"{value1} == {value2}"
+        if type1.isdigit():
+            type1, value1, type2, value2 = type2, value2, type1, value1
+
+        if type2.isdigit():
+            # the second operand is constant
+            if int(type2) == NIL:
+                return f"{type1} == {NIL}"
+            self._emit(f"if {type1} == {type2}:")
+            self._emit(f"    r = {value1} == {value2}")
+            self._emit(f"elif {type1} == {NIL}:")
+            self._emit("    r = False")
+            self._emit("else:")
+            self._emit(f"    raise InterpretError({InterpretErrorEnum.WRONG_OPERAND_TYPE}, {message!r})")
+            return "r"
+
+        self._emit(f"if {type1} == {NIL} or {type2} == {NIL}:")
+        self._emit(f"    r = {type1} == {type2}")
+        self._emit(f"elif {type1} != {type2}:")
+        self._emit(f"    raise InterpretError({InterpretErrorEnum.WRONG_OPERAND_TYPE}, {message!r})")
+        self._emit("else:")
+        self._emit(f"    r = {value1} == {value2}")
+        return "r"
+
+    def _fallback(self, instruction: Instruction, index: int):
+        """
+        Instruction is executed by function built by ClosureCompiler.
+        """
+        self._pc(index)
+        if instruction.opcode in TERMINATOR_OPCODES:
+            self._emit(f"block = ops[{index}](interpret)")
+            self._goto_dynamic()
+        else:
+            self._emit(f"ops[{index}](interpret)")
+
+    # frames and function calls
+
+    def _move(self, instruction: Instruction, index: int, var: Symbol, symb: Symbol):
+        self._pc(index)
+        target = self._target(var)
+        value = self._load(symb, 1)
+        self._emit(f"{target} = {value}")
+
+    def _create_frame(self, instruction: Instruction, index: int):
+        self._emit("memory.new_temp_frame()")
+        self._emit("tf = memory.temp_frame.values")
+
+    def _push_frame(self, instruction: Instruction, index: int):
+        self._pc(index)
+        self._emit("memory.push_temp_to_local()")
+        self._emit("lf = tf")
+        self._emit("tf = None")
+
+    def _pop_frame(self, instruction: Instruction, index: int):
+        self._pc(index)
+        self._emit("memory.pop_local_to_temp()")
+        self._emit("tf = lf")
+        self._emit("lf = local_frames[-1].values if local_frames else None")
+
+    def _defvar(self, instruction: Instruction, index: int, var: Symbol):
+        self._pc(index)
+        frame = self._frame(var)
+        self._raise(InterpretErrorEnum.SEMANTIC_ERR, "Redefining variable " + var.value,
+                    f"{frame}[{var.slot}] is not None")
+        self._emit(f"{frame}[{var.slot}] = UNINITIALIZED")
+
+    def _call(self, instruction: Instruction, index: int, label: Symbol):
+        self._emit(f"call_stack.append({index + 1})")
+        self._goto(instruction.target)
+
+    def _return(self, instruction: Instruction, index: int):
+        self._pc(index)
+        self._raise(InterpretErrorEnum.NON_EXISTING_VALUE, condition="not call_stack")
+        self._emit("block = call_stack.pop()")
+        self._goto_dynamic()
+
+    # data stack
+
+    def _pushs(self, instruction: Instruction, index: int, symb: Symbol):
+        self._pc(index)
+        self._emit(f"stack.append({self._load(symb, 1)})")
+
+    def _pops(self, instruction: Instruction, index: int, var: Symbol):
+        self._pc(index)
+        target = self._target(var)
+        self._raise(InterpretErrorEnum.NON_EXISTING_VALUE, "Data stack is empty, cannot pop", "not stack")
+        self._emit(f"{target} = stack.pop()")
+
+    # arithmetic, relational and boolean instructions
+
+    def _arithmetic(self, instruction: Instruction, index: int, var: Symbol, symb1: Symbol, symb2: Symbol):
+        self._pc(index)
+        type1, value1 = self._operand(symb1, 1)
+        type2, value2 = self._operand(symb2, 2)
+        target = self._target(var)
+        self._check_types([(type1, INT), (type2, INT)], "Add/Sub/Mul/IDiv argument is not int")
+        if instruction.opcode == 'IDIV' and value2 in ['0', 'v2']:
+            self._raise(InterpretErrorEnum.WRONG_OPERAND_VALUE, "Division by zero",
+                        "True" if value2 == '0' else "v2 == 0")
+        self._emit(f"{target} = ({INT}, {value1} {OPERATORS[instruction.opcode]} {value2})")
+
+    def _relational(self, instruction: Instruction, index: int, var: Symbol, symb1: Symbol, symb2: Symbol):
+        self._pc(index)
+        type1, value1 = self._operand(symb1, 1)
+        type2, value2 = self._operand(symb2, 2)
+        target = self._target(var)
+        if type1.isdigit() and type2.isdigit():
+            if type1 != type2:
+                self._raise(InterpretErrorEnum.WRONG_OPERAND_TYPE,
+                            "Type of symbol 1 is not equal to the type of symbol 2")
+            elif int(type1) == NIL:
+                self._raise(InterpretErrorEnum.WRONG_OPERAND_TYPE, "Cannot compare with nil")
+        else:
+            self._raise(InterpretErrorEnum.WRONG_OPERAND_TYPE, "Type of symbol 1 is not equal to the type of symbol 2",
+                        f"{type1} != {type2}")
+            self._raise(InterpretErrorEnum.WRONG_OPERAND_TYPE, "Cannot compare with nil", f"{type1} == {NIL}")
+        self._emit(f"{target} = TRUE_VALUE if {value1} {OPERATORS[instruction.opcode]} {value2} else FALSE_VALUE")
+
+    def _eq(self, instruction: Instruction, index: int, var: Symbol, symb1: Symbol, symb2: Symbol):
+        self._pc(index)
+        type1, value1 = self._operand(symb1, 1)
+        type2, value2 = self._operand(symb2, 2)
+        target = self._target(var)
+        result = self._equals(type1, value1, type2, value2)
+        self._emit(f"{target} = TRUE_VALUE if {result} else FALSE_VALUE")
+
+    def _boolean(self, instruction: Instruction, index: int, var: Symbol, symb1: Symbol, symb2: Symbol):
+        self._pc(index)
+        type1, value1 = self._operand(symb1, 1)
+        type2, value2 = self._operand(symb2, 2)
+        target = self._target(var)
+        self._check_types([(type1, BOOL), (type2, BOOL)], "And/Or can be used only with bools")
+        operation = 'and' if instruction.opcode == 'AND' else 'or'
+        self._emit(f"{target} = TRUE_VALUE if ({value1} {operation} {value2}) else FALSE_VALUE")
+
+    def _not(self, instruction: Instruction, index: int, var: Symbol, symb: Symbol):
+        self._pc(index)
+        value_type, value = self._operand(symb, 1)
+        target = self._target(var)
+        self._check_types([(value_type, BOOL)], "Not can be used only with bool")
+        self._emit(f"{target} = FALSE_VALUE if {value} else TRUE_VALUE")
+
+    # input / output
+
+    def _write(self, instruction: Instruction, index: int, symb: Symbol):
+        if symb.type != SymbolType.VAR:
+            self._emit(f"write({to_str(symb.constant)!r})")
+            return
+        self._pc(index)
+        value = self._load(symb, 1)
+        if self._known_types(symb) == STRING_TYPE:
+            self._emit(f"write(str({value}[1]))")
+        else:
+            self._emit(f"write(to_str({value}))")
+
+    # strings
+
+    def _concat(self, instruction: Instruction, index: int, var: Symbol, symb1: Symbol, symb2: Symbol):
+        self._pc(index)
+        type1, value1 = self._operand(symb1, 1)
+        type2, value2 = self._operand(symb2, 2)
+        self._check_types([(type1, STRING), (type2, STRING)], "Both symbols have to be strings.")
+        target = self._target(var)
+        self._emit(f"{target} = ({STRING}, concat({value1}, {value2}))")
+
+    def _strlen(self, instruction: Instruction, index: int, var: Symbol, symb: Symbol):
+        self._pc(index)
+        value_type, value = self._operand(symb, 1)
+        self._check_types([(value_type, STRING)], "Symbol has to be strings.")
+        target = self._target(var)
+        self._emit(f"{target} = ({INT}, len({value}))")
+
+    def _getchar(self, instruction: Instruction, index: int, var: Symbol, symb1: Symbol, symb2: Symbol):
+        self._pc(index)
+        string_type, string = self._operand(symb1, 1)
+        index_type, position = self._operand(symb2, 2)
+        self._check_types([(string_type, STRING), (index_type, INT)], "Wrong operand types for getchar")
+        self._raise(InterpretErrorEnum.WRONG_STRING_OPERATION, "Wrong indexing in getchar", f"{position} < 0")
+        target = self._target(var)
+        self._raise(InterpretErrorEnum.WRONG_STRING_OPERATION, "Wrong indexing in getchar",
+                    f"{position} >= len({string})")
+        self._emit(f"{target} = ({STRING}, {string}[{position}])")
+
+    # program flow
+
+    def _jump(self, instruction: Instruction, index: int, label: Symbol):
+        self._goto(instruction.target)
+
+    def _conditional_jump(self, instruction: Instruction, index: int, label: Symbol, symb1: Symbol, symb2: Symbol):
+        self._pc(index)
+        type1, value1 = self._operand(symb1, 1)
+        type2, value2 = self._operand(symb2, 2)
+        result = self._equals(type1, value1, type2, value2)
+        condition = result if instruction.opcode == 'JUMPIFEQ' else f"not ({result})"
+        self._emit(f"if {condition}:")
+        self.indent += 1
+        self._goto(instruction.target)
+        self.indent -= 1
+        self._goto(index + 1)
@@ -0,0 +1,238 @@
+import json
+import os
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Sequence, TextIO, Tuple
+
+from Frame import Frame
+from Instruction import Instruction
+
+try:
+    import resource
+except ImportError:
+    # not available on Windows, peak RSS is not reported there
+    resource = None
+
+# flags of instructions observed by the instrumented interpretation loop
+CONTROL = 1  # can change call stack, its continuation is not a jump when it did
+DEPTHS = 2  # can increase data stack or local frames
+VARIABLES = 4  # can increase number of live variables
+
+
+class CountingOutput:
+    """
+    Output of WRITE instructions which counts written bytes (UTF-8).
+    """
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+        self.bytes = 0
+
+    def write(self, text: str) -> int:
+        self.bytes += len(text.encode(errors='replace'))
+        return self.stream.write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+class CountingInputReader:
+    """
+    InputReader which counts bytes (UTF-8) of lines read by READ instructions, without line endings.
+    """
+
+    def __init__(self, reader):
+        self.reader = reader
+        self.interactive = reader.interactive
+        self.bytes = 0
+
+    def readline(self) -> Optional[str]:
+        line = self.reader.readline()
+        if line is not None:
+            self.bytes += len(line.encode(errors='replace'))
+        return line
+
+    def buffered(self) -> bool:
+        return self.reader.buffered()
+
+
+def peak_rss_kb() -> Optional[int]:
+    """
+    Returns peak resident set size of this process in KiB, None if it is not known.
+    """
+    if os.path.exists('/proc/self/status'):
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+class Statistics:
+    """
+    Resources consumed by the program, collected by the instrumented interpretation loop (see
+    Interpret._run_statistics), which observes stacks and frames only after instructions flagged by marks.
+    Instructions executed include those fused or skipped by --optimize. Jumps are dispatches which continued elsewhere
+    than at the next instruction without CALL or RETURN, chain of JUMPs threaded by --optimize is taken once.
+    CALL replaced by JUMP (tail call) is counted as CALL together with the JUMPs and RETURN it skips (see
+    transitions), so the numbers do not depend on the optimization, only depth of call stack does.
+    """
+
+    def __init__(self):
+        self.executed = 0
+        self.jumps = 0
+        self.calls = 0
+        self.max_call_stack = 0
+        self.max_data_stack = 0
+        self.max_local_frames = 0
+        self.max_variables = 0  # defined variables in all frames
+        # local frames below the top one observed by the last count of variables -> variables in them and below
+        self.frame_counts: List[Tuple[Frame, int]] = []
+        self.bytes_written = 0
+        self.bytes_read = 0
+        self.parse_time = 0.0  # loading, validation and compilation of the program
+        self.execution_time = 0.0
+
+    @staticmethod
+    def marks(program: List[Instruction], fused_calls: bool, memoized: Iterable[int]) -> bytearray:
+        """
+        Returns flags of instructions observed by the instrumented loop.
+        :param fused_calls: instruction before CALL can be fused with it
+        :param memoized: entries of memoized functions, they restore stacks and frames and return
+        """
+        flags = bytearray(len(program))
+        for index, instruction in enumerate(program):
+            opcode = instruction.opcode
+            if opcode in ['CALL', 'RETURN']:
+                flags[index] |= CONTROL
+            if fused_calls and index + 1 < len(program) and program[index + 1].opcode == 'CALL':
+                flags[index] |= CONTROL
+            if opcode in ['PUSHS', 'PUSHFRAME']:
+                flags[index] |= DEPTHS
+            if opcode in ['DEFVAR', 'CREATEFRAME']:
+                flags[index] |= VARIABLES
+        for index in memoized:
+            flags[index] |= CONTROL | DEPTHS | VARIABLES
+        return flags
+
+    @staticmethod
+    def transitions(program: Sequence[Instruction], tail_calls: Dict[int, int], costs: Dict[Tuple[int, int], int],
+                    threaded: bool) -> Dict[Tuple[int, int], Tuple[int, int, int]]:
+        """
+        Returns transitions between instructions which are not one executed instruction: fused and threaded
+        instructions of --optimize (see PeepholeCompiler.costs) and tail calls. Tail call is counted as CALL, and the
+        JUMPs and RETURN which would be executed after return from it are counted as executed.
+        :param tail_calls: index of CALL replaced by JUMP -> number of JUMPs from its return address to RETURN
+        :param threaded: chains of JUMPs are threaded by --optimize, each chain is taken once
+        :return: (index, index of the next instruction) -> (executed instructions, tail calls, jumps of skipped JUMPs)
+        """
+        transitions = {key: (cost, 0, 0) for key, cost in costs.items()}
+        for index in tail_calls:
+            transitions.setdefault((index, program[index].target), (1, 0, 0))
+        for (index, next_index), (cost, _, _) in list(transitions.items()):
+            calls = [call for call in Statistics._path(program, index, next_index, cost) if call in tail_calls]
+            if calls:
+                skipped = sum(tail_calls[call] + 1 for call in calls)
+                jumps = sum(Statistics._skipped_jumps(program, call + 1, tail_calls[call], threaded) for call in calls)
+                transitions[(index, next_index)] = (cost + skipped, len(calls), jumps)
+        return transitions
+
+    @staticmethod
+    def _skipped_jumps(program: Sequence[Instruction], start: int, count: int, threaded: bool) -> int:
+        """
+        Returns number of jumps taken by count JUMPs from start, JUMP to the next instruction is not a jump.
+        """
+        index = start
+        jumps = 0
+        for _ in range(count):
+            jumps += program[index].target != index + 1
+            index = program[index].target
+        if threaded:
+            return int(index != start + count)
+        return jumps
+
+    @staticmethod
+    def _path(program: Sequence[Instruction], index: int, next_index: int, cost: int) -> List[int]:
+        """
+        Returns indexes of instructions executed by the transition: fused instructions and skipped JUMPs.
+        """
+        for fused in range(1, min(cost, 2) + 1):
+            last = index + fused - 1
+            starts = [program[last].target] if program[last].target is not None else []
+            if program[last].opcode != 'JUMP':
+                starts.append(last + 1)
+            for start in starts:
+                path = list(range(index, last + 1))
+                while len(path) < cost and start < len(program) and program[start].opcode == 'JUMP':
+                    path.append(start)
+                    start = program[start].target
+                if start == next_index and len(path) == cost:
+                    return path
+        return []
+
+    def observe(self, interpret, flags: int, call_depth: int):
+        """
+        Updates maximums after execution of flagged instruction.
+        :param call_depth: length of call stack before the instruction
+        """
+        memory = interpret.memory
+        if flags & CONTROL:
+            depth = len(interpret.call_stack)
+            if depth > call_depth:
+                self.calls += 1
+                self.max_call_stack = max(self.max_call_stack, depth)
+        if flags & DEPTHS:
+            self.max_data_stack = max(self.max_data_stack, len(memory.data_stack))
+            self.max_local_frames = max(self.max_local_frames, len(memory.local_frames))
+        if flags & VARIABLES:
+            self.max_variables = max(self.max_variables, self._variables(memory))
+
+    def _variables(self, memory) -> int:
+        """
+        Returns number of defined variables in all frames. Local frames below the top one cannot change, their counts
+        are kept (see frame_counts), so only global, the top local and temporary frames are scanned.
+        """
+        local_frames = memory.local_frames
+        below = len(local_frames) - 1
+        counts = self.frame_counts
+        # frames popped since the last observation, frame pushed back by PUSHFRAME is the same one
+        while counts and (len(counts) > below or counts[-1][0] is not local_frames[len(counts) - 1]):
+            counts.pop()
+        variables = counts[-1][1] if counts else 0
+        for frame in local_frames[len(counts):below]:
+            variables += len(frame.values) - frame.values.count(None)
+            counts.append((frame, variables))
+        frames = [memory.global_frame]
+        if local_frames:
+            frames.append(local_frames[-1])
+        if memory.temp_frame is not None:
+            frames.append(memory.temp_frame)
+        return variables + sum(len(frame.values) - frame.values.count(None) for frame in frames)
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            'instructions_executed': self.executed,
+            'jumps_taken': self.jumps,
+            'calls': self.calls,
+            'max_call_stack': self.max_call_stack,
+            'max_data_stack': self.max_data_stack,
+            'max_local_frames': self.max_local_frames,
+            'max_live_variables': self.max_variables,
+            'bytes_written': self.bytes_written,
+            'bytes_read': self.bytes_read,
+            'parse_time': self.parse_time,
+            'execution_time': self.execution_time,
+            'peak_rss_kb': peak_rss_kb(),
+        }
+
+    def write(self, path: str):
+        """
+        Writes statistics in JSON to the file, '-' means stderr.
+        """
+        if path == '-':
+            print(json.dumps(self.to_json(), indent=2), file=sys.stderr)
+            return
+        with open(path, 'w') as file:
+            json.dump(self.to_json(), file, indent=2)
@@ -0,0 +1,181 @@
+from typing import List, Optional, Union
+
+# shorter strings are concatenated as python strings, copying them is cheaper than a buffer
+BUFFER_MIN_LENGTH = 256
+
+
+class StringBuffer:
+    """
+    Python value of string which is built by CONCAT or modified by SETCHAR. The newest version owns list of
+    characters, which is extended or changed in place, so loops appending to a string or replacing its characters
+    take linear time instead of quadratic.
+
+    Values are shared by variables and data stack, so every version has to keep its content. When the newest version
+    is changed, it passes the list to the new version and remembers only how it differs from it (length before
+    append or the replaced character). Content of older version is reconstructed from the newer one when it is used,
+    which is rare, usually nothing references older versions and they are freed.
+
+    Buffer behaves like str for len(), indexing and comparisons, str() returns the plain string (cached). Size of
+    the newest version in UTF-8 (for budget of strings) is counted once and then updated by changes.
+    """
+    __slots__ = ('chars', 'newer', 'index', 'old', 'text', 'extra_bytes')
+
+    def __init__(self, chars: List[str]):
+        self.chars: Optional[List[str]] = chars  # characters of the newest version, None in older versions
+        self.newer: Optional[StringBuffer] = None  # version created from this one
+        self.index = 0  # length before append or index of the replaced character
+        self.old: Optional[str] = None  # replaced character, None if the newer version was extended
+        self.text: Optional[str] = None  # content as python string
+        # bytes of UTF-8 above one per character in the newest version, None until encoded_length asks for it
+        self.extra_bytes: Optional[int] = None
+
+    def append(self, text: str) -> 'StringBuffer':
+        if self.chars is None:
+            return StringBuffer(list(str(self)) + list(text))
+        newer = self._pass_to_newer(len(self.chars), None)
+        newer.chars.extend(text)
+        if newer.extra_bytes is not None:
+            newer.extra_bytes += _extra_bytes(text)
+        return newer
+
+    def set_char(self, index: int, char: str) -> 'StringBuffer':
+        if self.chars is None:
+            chars = list(str(self))
+            chars[index] = char
+            return StringBuffer(chars)
+        newer = self._pass_to_newer(index, self.chars[index])
+        newer.chars[index] = char
+        if newer.extra_bytes is not None:
+            newer.extra_bytes += _extra_bytes(char) - _extra_bytes(self.old)
+        return newer
+
+    def _pass_to_newer(self, index: int, old: Optional[str]) -> 'StringBuffer':
+        newer = StringBuffer(self.chars)
+        newer.extra_bytes = self.extra_bytes
+        self.chars = None
+        self.newer = newer
+        self.index = index
+        self.old = old
+        return newer
+
+    def __str__(self) -> str:
+        if self.text is None:
+            self.text = self._flatten()
+        return self.text
+
+    def _flatten(self) -> str:
+        # changes are undone from the nearest version with known content
+        older_versions = []
+        version = self
+        while version.text is None and version.chars is None:
+            older_versions.append(version)
+            version = version.newer
+        text = version.text if version.text is not None else ''.join(version.chars)
+        for older in reversed(older_versions):
+            if older.old is None:
+                text = text[:older.index]
+            else:
+                text = text[:older.index] + older.old + text[older.index + 1:]
+        return text
+
+    def __len__(self) -> int:
+        if self.chars is not None:
+            return len(self.chars)
+        return len(str(self))
+
+    def encoded_length(self) -> int:
+        if self.chars is None:
+            return encoded_length(str(self))
+        if self.extra_bytes is None:
+            self.extra_bytes = sum(_extra_bytes(char) for char in self.chars)
+        return len(self.chars) + self.extra_bytes
+
+    def __getitem__(self, key):
+        if self.chars is not None and type(key) is int:
+            return self.chars[key]
+        return str(self)[key]
+
+    def __add__(self, other):
+        return concat(self, other)
+
+    def __radd__(self, other):
+        return concat(other, self)
+
+    def __eq__(self, other):
+        if isinstance(other, (str, StringBuffer)):
+            return str(self) == str(other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        if isinstance(other, (str, StringBuffer)):
+            return str(self) != str(other)
+        return NotImplemented
+
+    def __lt__(self, other):
+        if isinstance(other, (str, StringBuffer)):
+            return str(self) < str(other)
+        return NotImplemented
+
+    def __gt__(self, other):
+        if isinstance(other, (str, StringBuffer)):
+            return str(self) > str(other)
+        return NotImplemented
+
+    def __le__(self, other):
+        if isinstance(other, (str, StringBuffer)):
+            return str(self) <= str(other)
+        return NotImplemented
+
+    def __ge__(self, other):
+        if isinstance(other, (str, StringBuffer)):
+            return str(self) >= str(other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(str(self))
+
+    def __repr__(self):
+        return repr(str(self))
+
+
+String = Union[str, StringBuffer]
+
+
+def concat(string1: String, string2: String) -> String:
+    """
+    Returns concatenation of strings, the first one is extended in place if it is the newest version of buffer.
+    """
+    if type(string1) is StringBuffer:
+        return string1.append(str(string2))
+    if len(string1) + len(string2) < BUFFER_MIN_LENGTH:
+        return string1 + str(string2)
+    return StringBuffer(list(string1) + list(str(string2)))
+
+
+def set_char(string: String, index: int, char: str) -> String:
+    """
+    Returns string with replaced character, index has to be valid.
+    """
+    if type(string) is StringBuffer:
+        return string.set_char(index, char)
+    if len(string) < BUFFER_MIN_LENGTH:
+        return string[:index] + char + string[index + 1:]
+    chars = list(string)
+    chars[index] = char
+    return StringBuffer(chars)
+
+
+def _extra_bytes(text: str) -> int:
+    # isascii does not scan the string
+    return 0 if text.isascii() else len(text.encode('utf-8', 'surrogatepass')) - len(text)
+
+
+def encoded_length(string: String) -> int:
+    """
+    Returns length of string in UTF-8, strings of input can contain surrogates, which are counted as 3 bytes.
+    """
+    if type(string) is StringBuffer:
+        return string.encoded_length()
+    if string.isascii():
+        return len(string)
+    return len(string.encode('utf-8', 'surrogatepass'))
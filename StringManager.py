@@ -1,7 +1,7 @@
 from Instruction import Instruction
 from InterpretError import InterpretErrorEnum, InterpretError
-from Symbol import SymbolType, Symbol
-from Variable import Variable
+from StringBuffer import String, concat, set_char
+from Value import ValueType
 
 
 class StringManager:
@@ -9,82 +9,66 @@ class StringManager:
         self.interpret = interpret
 
     def concat(self, instruction: Instruction):
-        instruction.check_format(
-            [[SymbolType.VAR], [SymbolType.VAR, SymbolType.STRING], [SymbolType.VAR, SymbolType.STRING]])
-
         symb_var = instruction.args.get(1)
-        symb1: Symbol = self.interpret.memory.symbol_or_var_symbol(instruction.args.get(2))
-        symb2: Symbol = self.interpret.memory.symbol_or_var_symbol(instruction.args.get(3))
+        type1, value1 = self.interpret.memory.value_of(instruction.args.get(2))
+        type2, value2 = self.interpret.memory.value_of(instruction.args.get(3))
 
-        if symb1.type != SymbolType.STRING or symb2.type != SymbolType.STRING:
+        if type1 != ValueType.STRING or type2 != ValueType.STRING:
             raise InterpretError(InterpretErrorEnum.WRONG_OPERAND_TYPE, "Both symbols have to be strings.")
 
-        var: Variable = self.interpret.memory.get_variable(symb_var.value, symb_var.frame)
-        var.symbol_value.value = symb1.value + symb2.value
-        var.symbol_value.type = SymbolType.STRING
+        self.interpret.memory.set_value(symb_var, (ValueType.STRING, concat(value1, value2)))
 
     def strlen(self, instruction: Instruction):
-        instruction.check_format([[SymbolType.VAR], [SymbolType.VAR, SymbolType.STRING]])
-
         symb_var = instruction.args.get(1)
-        symb1: Symbol = self.interpret.memory.symbol_or_var_symbol(instruction.args.get(2))
+        symb_type, symb_value = self.interpret.memory.value_of(instruction.args.get(2))
 
-        if symb1.type != SymbolType.STRING:
+        if symb_type != ValueType.STRING:
             raise InterpretError(InterpretErrorEnum.WRONG_OPERAND_TYPE, "Symbol has to be strings.")
 
-        var: Variable = self.interpret.memory.get_variable(symb_var.value, symb_var.frame)
-        var.symbol_value.value = len(symb1.value)
-        var.symbol_value.type = SymbolType.INT
+        self.interpret.memory.set_value(symb_var, (ValueType.INT, len(symb_value)))
 
     def getchar(self, instruction: Instruction):
-        instruction.check_format(
-            [[SymbolType.VAR], [SymbolType.VAR, SymbolType.STRING], [SymbolType.VAR, SymbolType.INT]])
-
         symb_var = instruction.args.get(1)
-        symb1: Symbol = self.interpret.memory.symbol_or_var_symbol(instruction.args.get(2))
-        symb2: Symbol = self.interpret.memory.symbol_or_var_symbol(instruction.args.get(3))
+        type1, value1 = self.interpret.memory.value_of(instruction.args.get(2))
+        type2, value2 = self.interpret.memory.value_of(instruction.args.get(3))
 
         # check correct types of symbols
-        if symb1.type != SymbolType.STRING or symb2.type != SymbolType.INT:
+        if type1 != ValueType.STRING or type2 != ValueType.INT:
             raise InterpretError(InterpretErrorEnum.WRONG_OPERAND_TYPE, "Wrong operand types for getchar")
 
         # check if indexing is not negative
-        if symb2.value < 0:
+        if value2 < 0:
             raise InterpretError(InterpretErrorEnum.WRONG_STRING_OPERATION, "Wrong indexing in getchar")
 
-        var: Variable = self.interpret.memory.get_variable(symb_var.value, symb_var.frame)
+        self.interpret.memory.check_variable(symb_var)
         try:
-            var.symbol_value.value = symb1.value[symb2.value]
-            var.symbol_value.type = SymbolType.STRING
+            char = value1[value2]
         except Exception:
             raise InterpretError(InterpretErrorEnum.WRONG_STRING_OPERATION, "Wrong indexing in getchar")
+        self.interpret.memory.set_value(symb_var, (ValueType.STRING, char))
 
     def setchar(self, instruction: Instruction):
-        instruction.check_format(
-            [[SymbolType.VAR], [SymbolType.VAR, SymbolType.INT], [SymbolType.VAR, SymbolType.STRING]])
-
         symb_var = instruction.args.get(1)
-        symb1: Symbol = self.interpret.memory.symbol_or_var_symbol(instruction.args.get(2))
-        symb2: Symbol = self.interpret.memory.symbol_or_var_symbol(instruction.args.get(3))
-        var: Variable = self.interpret.memory.get_variable(symb_var.value, symb_var.frame)
+        type1, value1 = self.interpret.memory.value_of(instruction.args.get(2))
+        type2, value2 = self.interpret.memory.value_of(instruction.args.get(3))
 
         # check if variable is initialized
-        self.interpret.memory.symbol_or_var_symbol(symb_var)
+        var_type, var_value = self.interpret.memory.value_of(symb_var)
 
-        if symb1.type != SymbolType.INT or symb2.type != SymbolType.STRING or var.symbol_value.type != SymbolType.STRING:
+        if type1 != ValueType.INT or type2 != ValueType.STRING or var_type != ValueType.STRING:
             raise InterpretError(InterpretErrorEnum.WRONG_OPERAND_TYPE, "Wrong operand values for setchar")
 
         # check if indexing is not negative
-        if symb1.value < 0:
+        if value1 < 0:
             raise InterpretError(InterpretErrorEnum.WRONG_STRING_OPERATION, "Wrong indexing in setchar")
 
         try:
-            var.symbol_value.value = self._replace_string(var.symbol_value.value, symb1.value, symb2.value[0])
-            var.symbol_value.type = SymbolType.STRING
+            value = self._replace_string(var_value, value1, value2[0])
         except:
             raise InterpretError(InterpretErrorEnum.WRONG_STRING_OPERATION, "Wrong indexing in setchar")
+        self.interpret.memory.set_value(symb_var, (ValueType.STRING, value))
 
-    def _replace_string(self, s: str, index: int, replace_with: str) -> str:
+    def _replace_string(self, s: String, index: int, replace_with: str) -> String:
         if index >= len(s):
             raise InterpretError(InterpretErrorEnum.WRONG_STRING_OPERATION)
-        return s[:index] + replace_with + s[index + 1:]
+        return set_char(s, index, replace_with)
@@ -1,9 +1,41 @@
+import sys
 from enum import Enum
+from functools import lru_cache
 
 from FrameType import FrameType
 from InterpretError import InterpretErrorEnum, InterpretError
 import re
 
+# escape sequence \ddd, where ddd is decimal code of the character
+ESCAPE_PATTERN = re.compile(r"\\(\d{3})")
+
+# maximal number of decoded strings remembered by decode_string
+DECODED_STRINGS_CACHE_SIZE = 4096
+
+
+def _decode_escape(match: re.Match) -> str:
+    return chr(int(match.group(1)))
+
+
+def decode_escapes(value: str) -> str:
+    """
+    Replaces escape sequences in string in one pass.
+    """
+    if '\\' in value:
+        value = ESCAPE_PATTERN.sub(_decode_escape, value)
+    return value
+
+
+@lru_cache(maxsize=DECODED_STRINGS_CACHE_SIZE)
+def decode_string(value: str) -> str:
+    """
+    Decodes string literal of the program. Programs repeat the same literals, so decoded strings are memoized and
+    interned, equal literals are then the same object and are compared by identity. Input of READ is decoded by
+    decode_escapes, its lines are rarely repeated and would only keep memory and evict the literals.
+    """
+    return sys.intern(decode_escapes(value))
+
+
 class SymbolType(Enum):
     INT='int'
     BOOL='bool'
@@ -22,12 +54,14 @@ class Symbol:
     def __init__(self, type: SymbolType, value):
         self.type: SymbolType = type
         self.value = value
+        self.constant = None  # runtime value of constant argument, assigned by ProgramCompiler
 
         try:
             # eg. LF@var1
             if self.type == SymbolType.VAR:
                 self.frame = FrameType[value[0:2]] # LF
                 self.value = value[3:] # var1
+                self.slot: int = None  # index of variable in frame, assigned by ProgramCompiler
             elif self.type == SymbolType.INT:
                 self.value = int(self.value)
             elif self.type == SymbolType.NIL:
@@ -47,6 +81,17 @@ class Symbol:
         except (ValueError, TypeError):
             raise InterpretError(InterpretErrorEnum.UNEXPECTED_XML, "Wrong value")
 
+    @classmethod
+    def parsed(cls, type: SymbolType, value, constant=None) -> 'Symbol':
+        """
+        Creates symbol from already parsed value, constructor would parse the value again.
+        """
+        symbol = cls.__new__(cls)
+        symbol.type = type
+        symbol.value = value
+        symbol.constant = constant
+        return symbol
+
     def __eq__(self, o: object) -> bool:
         return self.type == o.type and self.value == o.value
 
@@ -54,33 +99,6 @@ class Symbol:
     def __str__(self):
         return f"Symbol {self.type}: {self.value}"
 
-    # used for value
-    def to_str(self):
-        if self.type == SymbolType.NIL:
-            return ''
-        elif self.type == SymbolType.BOOL:
-            return 'true' if self.value else 'false'
-        else:
-            return str(self.value)
-
-    def type_to_str(self):
-        if self.type == SymbolType.NIL:
-            return 'nil'
-        elif self.type == SymbolType.BOOL:
-            return 'bool'
-        elif self.type == SymbolType.STRING:
-            return 'string'
-        elif self.type == SymbolType.INT:
-            return 'int'
-        elif self.type == SymbolType.NOT_INITIALIZED:
-            return ''
-
     # find \ddd occurence
     def _parse_string(self, value: str) -> str:
-        pattern = re.compile(r"\\(\d{3})")
-        for match in pattern.finditer(value):
-            numeric_value_of_char = int(match.group(1))
-            if not(0 <= numeric_value_of_char <= 999):
-                raise InterpretError(InterpretErrorEnum.WRONG_OPERAND_TYPE)
-            value = value.replace(match.group(0), chr(numeric_value_of_char))
-        return value
+        return decode_string(value)
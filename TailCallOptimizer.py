@@ -0,0 +1,73 @@
+import copy
+from collections import Counter
+from typing import Dict, List, Optional, Set
+
+from ControlFlowGraph import ControlFlowGraph, CALL
+from Instruction import Instruction
+
+
+class TailCallOptimizer:
+    """
+    Replaces CALL whose return address continues by RETURN (directly or through JUMP instructions) by JUMP. Called
+    function then returns directly to the caller of the current function, so tail recursion runs in constant
+    call stack.
+
+    CALL is replaced only when it is proven to be executed inside a function (call stack is not empty). At the top
+    level the original RETURN would fail after the called function returns, the optimized program would fail in
+    the called function, so the error would be reported with a different instruction.
+    """
+
+    def __init__(self):
+        # name of optimization -> how many times it was applied
+        self.optimizations: Counter = Counter()
+        # index of replaced CALL -> number of JUMP instructions from its return address to RETURN
+        self.tail_calls: Dict[int, int] = {}
+
+    def optimize(self, program: List[Instruction]) -> List[Instruction]:
+        """
+        Returns program with tail calls replaced by jumps, instructions of the given program are not modified.
+        """
+        graph = ControlFlowGraph(program)
+        top_level = self._top_level_blocks(graph)
+        optimized = list(program)
+        for index, instruction in enumerate(program):
+            if instruction.opcode != 'CALL' or graph.block_of_instruction[index] in top_level:
+                continue
+            jumps = self._jumps_to_return(program, index + 1)
+            if jumps is not None:
+                jump = copy.copy(instruction)
+                jump.opcode = 'JUMP'
+                optimized[index] = jump
+                self.tail_calls[index] = jumps
+                self.optimizations["tail calls"] += 1
+        return optimized
+
+    @staticmethod
+    def _top_level_blocks(graph: ControlFlowGraph) -> Set[int]:
+        """
+        Returns ids of blocks which can be executed with empty call stack. Every call which returned is represented
+        by CALL_RETURN edge, so such blocks are reachable from the start without CALL edges.
+        """
+        if not graph.blocks:
+            return set()
+        reached = {0}
+        stack = [0]
+        while stack:
+            for successor, kind in graph.blocks[stack.pop()].successors:
+                if kind != CALL and successor not in reached:
+                    reached.add(successor)
+                    stack.append(successor)
+        return reached
+
+    @staticmethod
+    def _jumps_to_return(program: List[Instruction], index: int) -> Optional[int]:
+        """
+        Returns number of JUMP instructions from the index to RETURN, None if it does not continue by RETURN.
+        """
+        visited = set()
+        while index < len(program) and program[index].opcode == 'JUMP' and index not in visited:
+            visited.add(index)
+            index = program[index].target
+        if index < len(program) and program[index].opcode == 'RETURN':
+            return len(visited)
+        return None
@@ -0,0 +1,168 @@
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from ControlFlowGraph import ControlFlowGraph, BasicBlock, CALL_RETURN
+from FrameType import FrameType
+from Instruction import Instruction
+from ProgramValidator import ProgramValidator, VAR
+from Symbol import Symbol, SymbolType
+from Value import ValueType
+
+Types = FrozenSet[int]
+# variable (frame, slot) -> possible type tags of its value, ValueType.NOT_INITIALIZED for defined variable without
+# value; variable which is not in the dictionary can be undefined or its frame can be missing
+VariableTypes = Dict[Tuple[FrameType, int], Types]
+
+INT_TYPE: Types = frozenset([ValueType.INT])
+BOOL_TYPE: Types = frozenset([ValueType.BOOL])
+STRING_TYPE: Types = frozenset([ValueType.STRING])
+VALUE_TYPES: Types = frozenset([ValueType.INT, ValueType.BOOL, ValueType.STRING, ValueType.NIL])
+ALL_TYPES: Types = VALUE_TYPES | {ValueType.NOT_INITIALIZED}
+
+READ_TYPES = {'int': ValueType.INT, 'bool': ValueType.BOOL, 'string': ValueType.STRING}
+
+# types of value stored to the variable (the first argument), MOVE, READ and DEFVAR are handled separately
+RESULT_TYPES = {
+    'ADD': INT_TYPE, 'SUB': INT_TYPE, 'MUL': INT_TYPE, 'IDIV': INT_TYPE, 'STRLEN': INT_TYPE, 'STRI2INT': INT_TYPE,
+    'LT': BOOL_TYPE, 'GT': BOOL_TYPE, 'EQ': BOOL_TYPE, 'AND': BOOL_TYPE, 'OR': BOOL_TYPE, 'NOT': BOOL_TYPE,
+    'INT2CHAR': STRING_TYPE, 'CONCAT': STRING_TYPE, 'GETCHAR': STRING_TYPE, 'SETCHAR': STRING_TYPE,
+    'TYPE': STRING_TYPE, 'POPS': VALUE_TYPES,
+}
+
+# number of argument -> types the operand has when the instruction did not fail
+REQUIRED_TYPES = {
+    'ADD': {2: INT_TYPE, 3: INT_TYPE},
+    'SUB': {2: INT_TYPE, 3: INT_TYPE},
+    'MUL': {2: INT_TYPE, 3: INT_TYPE},
+    'IDIV': {2: INT_TYPE, 3: INT_TYPE},
+    'LT': {2: VALUE_TYPES - {ValueType.NIL}, 3: VALUE_TYPES - {ValueType.NIL}},
+    'GT': {2: VALUE_TYPES - {ValueType.NIL}, 3: VALUE_TYPES - {ValueType.NIL}},
+    'AND': {2: BOOL_TYPE, 3: BOOL_TYPE},
+    'OR': {2: BOOL_TYPE, 3: BOOL_TYPE},
+    'NOT': {2: BOOL_TYPE},
+    'INT2CHAR': {2: INT_TYPE},
+    'STRI2INT': {2: STRING_TYPE, 3: INT_TYPE},
+    'CONCAT': {2: STRING_TYPE, 3: STRING_TYPE},
+    'STRLEN': {2: STRING_TYPE},
+    'GETCHAR': {2: STRING_TYPE, 3: INT_TYPE},
+    'SETCHAR': {1: STRING_TYPE, 2: INT_TYPE, 3: STRING_TYPE},
+    'TYPE': {2: ALL_TYPES},
+}
+
+
+class TypeInference:
+    """
+    Flow-sensitive inference of types of variables in compiled program, based on control flow graph.
+
+    Known type of variable also proves that the variable is defined and its frame exists, so compilers can build
+    variants of instructions without checks of operands (see TypedCompiler and PythonCompiler). Types are refined
+    by instructions which succeeded, e.g. operands of ADD are ints after it. Local and temporary variables are
+    tracked until their frame changes, nothing is known after CALL returns, because called function can change
+    anything.
+    """
+
+    def __init__(self, program: List[Instruction]):
+        self.program = program
+
+    def infer(self) -> List[VariableTypes]:
+        """
+        Returns types of variable operands before each instruction, variables with unknown types are missing.
+        """
+        graph = ControlFlowGraph(self.program)
+        states = graph.forward({}, self._transfer, self._meet, self._edge)
+
+        operand_types: List[VariableTypes] = [{} for _ in self.program]
+        for block_id, state in states.items():
+            block = graph.blocks[block_id]
+            state = dict(state)
+            for index, instruction in enumerate(block.instructions, block.start):
+                types = {}
+                for symbol in instruction.args.values():
+                    key = self._key(symbol)
+                    if key is not None and key in state:
+                        types[key] = state[key]
+                operand_types[index] = types
+                self._process(instruction, state)
+        return operand_types
+
+    # dataflow analysis
+
+    def _transfer(self, block: BasicBlock, state: VariableTypes) -> VariableTypes:
+        state = dict(state)
+        for instruction in block.instructions:
+            self._process(instruction, state)
+        return state
+
+    @staticmethod
+    def _meet(state1: VariableTypes, state2: VariableTypes) -> VariableTypes:
+        return {key: types | state2[key] for key, types in state1.items() if key in state2}
+
+    @staticmethod
+    def _edge(block: BasicBlock, successor: BasicBlock, kind: str, state: VariableTypes) -> VariableTypes:
+        return {} if kind == CALL_RETURN else state
+
+    def _process(self, instruction: Instruction, state: VariableTypes):
+        """
+        Updates types by effect of the instruction, when it does not fail.
+        """
+        opcode = instruction.opcode
+        if opcode == 'CREATEFRAME':
+            self._drop_frame(state, FrameType.TF)
+            return
+        if opcode == 'PUSHFRAME':
+            self._move_frame(state, FrameType.TF, FrameType.LF)
+            return
+        if opcode == 'POPFRAME':
+            self._move_frame(state, FrameType.LF, FrameType.TF)
+            return
+
+        correct_format = ProgramValidator.FORMATS[opcode]
+        required = REQUIRED_TYPES.get(opcode, {})
+        for number, symbol in instruction.args.items():
+            key = self._key(symbol)
+            if key is None or (correct_format[number - 1] == VAR and number not in required):
+                continue
+            # read operand is defined and initialized (TYPE allows uninitialized)
+            types = state.get(key, ALL_TYPES) & required.get(number, VALUE_TYPES)
+            if types:
+                state[key] = types
+
+        if correct_format and correct_format[0] == VAR:
+            key = self._key(instruction.args.get(1))
+            result = self._result_types(instruction, state)
+            if result:
+                state[key] = result
+            else:
+                state.pop(key, None)
+
+    def _result_types(self, instruction: Instruction, state: VariableTypes) -> Optional[Types]:
+        opcode = instruction.opcode
+        if opcode == 'DEFVAR':
+            return frozenset([ValueType.NOT_INITIALIZED])
+        if opcode == 'MOVE':
+            return self._symbol_types(instruction.args.get(2), state)
+        if opcode == 'READ':
+            read_type = READ_TYPES.get(instruction.args.get(2).value)
+            return frozenset([read_type, ValueType.NIL]) if read_type is not None else VALUE_TYPES
+        return RESULT_TYPES.get(opcode)
+
+    def _symbol_types(self, symbol: Symbol, state: VariableTypes) -> Optional[Types]:
+        if symbol.type != SymbolType.VAR:
+            return frozenset([symbol.constant[0]])
+        return state.get(self._key(symbol))
+
+    @staticmethod
+    def _drop_frame(state: VariableTypes, frame: FrameType):
+        for key in [key for key in state if key[0] == frame]:
+            del state[key]
+
+    def _move_frame(self, state: VariableTypes, source: FrameType, target: FrameType):
+        moved = {(target, slot): types for (frame, slot), types in state.items() if frame == source}
+        self._drop_frame(state, source)
+        self._drop_frame(state, target)
+        state.update(moved)
+
+    @staticmethod
+    def _key(symbol: Symbol) -> Optional[Tuple[FrameType, int]]:
+        if symbol.type != SymbolType.VAR:
+            return None
+        return symbol.frame, symbol.slot
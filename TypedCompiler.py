@@ -0,0 +1,280 @@
+import operator
+from collections import Counter
+from typing import Any, Callable, List, Optional
+
+from ClosureCompiler import ClosureCompiler, INT, BOOL, STRING, NIL
+from FrameType import FrameType
+from Instruction import Instruction
+from InterpretError import InterpretErrorEnum, InterpretError
+from Memory import Memory
+from StringBuffer import concat
+from Symbol import Symbol, SymbolType
+from TypeInference import VariableTypes, Types, VALUE_TYPES, INT_TYPE, BOOL_TYPE, STRING_TYPE
+from Value import Value, TRUE_VALUE, FALSE_VALUE, to_str
+
+
+class TypedCompiler(ClosureCompiler):
+    """
+    Closure compiler which uses types proven by TypeInference: when types of all operands are known, instruction is
+    compiled into variant without checks of frames, variables and types. Checks of values (division by zero, index
+    of string) stay. Other instructions are compiled by generic builders, so ill-typed programs fail the same way.
+    """
+
+    def __init__(self, types: Optional[List[VariableTypes]] = None):
+        super().__init__()
+        # index of instruction -> types of its variable operands
+        self.types = types
+        # opcode -> method building variant without checks, it returns None if types are not proven
+        self.typed_builders = {
+            "MOVE": self._typed_move,
+            "PUSHS": self._typed_pushs,
+            "ADD": self._typed_arithmetic,
+            "SUB": self._typed_arithmetic,
+            "MUL": self._typed_arithmetic,
+            "IDIV": self._typed_arithmetic,
+            "LT": self._typed_relational,
+            "GT": self._typed_relational,
+            "EQ": self._typed_relational,
+            "AND": self._typed_boolean,
+            "OR": self._typed_boolean,
+            "NOT": self._typed_not,
+            "WRITE": self._typed_write,
+            "CONCAT": self._typed_concat,
+            "STRLEN": self._typed_strlen,
+            "GETCHAR": self._typed_getchar,
+            "JUMPIFEQ": self._typed_conditional_jump,
+            "JUMPIFNEQ": self._typed_conditional_jump,
+        }
+        # name of optimization -> how many times it was applied
+        self.optimizations: Counter = Counter()
+
+    OPERATIONS = {
+        'ADD': operator.add, 'SUB': operator.sub, 'MUL': operator.mul, 'IDIV': ClosureCompiler._checked_floordiv,
+        'LT': operator.lt, 'GT': operator.gt, 'EQ': operator.eq, 'AND': lambda a, b: a and b,
+        'OR': lambda a, b: a or b,
+    }
+
+    def _compile_instruction(self, instruction: Instruction, index: int, next_index: int = None) -> Callable:
+        builder = self.typed_builders.get(instruction.opcode)
+        if self.types is not None and builder is not None:
+            args = instruction.args
+            op = builder(instruction, index + 1 if next_index is None else next_index, self.types[index],
+                         *[args.get(i) for i in range(1, len(args) + 1)])
+            if op is not None:
+                self.optimizations["type specialized instructions"] += 1
+                return op
+        return super()._compile_instruction(instruction, index, next_index)
+
+    # proven types
+
+    @staticmethod
+    def _types_of(types: VariableTypes, symbol: Symbol) -> Optional[Types]:
+        if symbol.type != SymbolType.VAR:
+            return frozenset([symbol.constant[0]])
+        return types.get((symbol.frame, symbol.slot))
+
+    def _proven(self, types: VariableTypes, expected: Types, *symbols: Symbol) -> bool:
+        """
+        Returns True if all symbols are initialized values of expected types.
+        """
+        for symbol in symbols:
+            symbol_types = self._types_of(types, symbol)
+            if symbol_types is None or not symbol_types <= expected:
+                return False
+        return True
+
+    def _same_type(self, types: VariableTypes, symb1: Symbol, symb2: Symbol) -> bool:
+        """
+        Returns True if both symbols have the same type, which is not nil.
+        """
+        types1 = self._types_of(types, symb1)
+        return (types1 is not None and len(types1) == 1 and types1 <= VALUE_TYPES and NIL not in types1
+                and types1 == self._types_of(types, symb2))
+
+    @staticmethod
+    def _is_defined(types: VariableTypes, var: Symbol) -> bool:
+        return (var.frame, var.slot) in types
+
+    # operand accessors without checks
+
+    @staticmethod
+    def _unchecked_frame_values(symbol: Symbol) -> Callable[[Memory], List[Value]]:
+        if symbol.frame == FrameType.GF:
+            return lambda memory: memory.global_frame.values
+        elif symbol.frame == FrameType.LF:
+            return lambda memory: memory.local_frames[-1].values
+        return lambda memory: memory.temp_frame.values
+
+    def _unchecked_value(self, symbol: Symbol) -> Callable[[Memory], Value]:
+        if symbol.type != SymbolType.VAR:
+            constant = symbol.constant
+            return lambda memory: constant
+        frame_values = self._unchecked_frame_values(symbol)
+        slot = symbol.slot
+        return lambda memory: frame_values(memory)[slot]
+
+    def _python_value(self, symbol: Symbol) -> Callable[[Memory], Any]:
+        """
+        Returns getter of python value of the symbol (without type tag).
+        """
+        if symbol.type != SymbolType.VAR:
+            constant = symbol.constant[1]
+            return lambda memory: constant
+        slot = symbol.slot
+        if symbol.frame == FrameType.GF:
+            return lambda memory: memory.global_frame.values[slot][1]
+        frame_values = self._unchecked_frame_values(symbol)
+        return lambda memory: frame_values(memory)[slot][1]
+
+    # builders
+
+    def _typed_move(self, instruction: Instruction, next_index: int, types: VariableTypes, var: Symbol,
+                    symb: Symbol):
+        if not self._is_defined(types, var) or not self._proven(types, VALUE_TYPES, symb):
+            return None
+        target = self._unchecked_frame_values(var)
+        slot = var.slot
+        source = self._unchecked_value(symb)
+
+        def op(interpret):
+            memory = interpret.memory
+            target(memory)[slot] = source(memory)
+            return next_index
+        return op
+
+    def _typed_pushs(self, instruction: Instruction, next_index: int, types: VariableTypes, symb: Symbol):
+        if not self._proven(types, VALUE_TYPES, symb):
+            return None
+        source = self._unchecked_value(symb)
+
+        def op(interpret):
+            memory = interpret.memory
+            memory.data_stack.append(source(memory))
+            return next_index
+        return op
+
+    def _typed_arithmetic(self, instruction: Instruction, next_index: int, types: VariableTypes, var: Symbol,
+                          symb1: Symbol, symb2: Symbol):
+        if not self._is_defined(types, var) or not self._proven(types, INT_TYPE, symb1, symb2):
+            return None
+        return self._build_typed_binary(self.OPERATIONS[instruction.opcode], INT, next_index, var, symb1, symb2)
+
+    def _typed_relational(self, instruction: Instruction, next_index: int, types: VariableTypes, var: Symbol,
+                          symb1: Symbol, symb2: Symbol):
+        if not self._is_defined(types, var) or not self._same_type(types, symb1, symb2):
+            return None
+        return self._build_typed_binary(self.OPERATIONS[instruction.opcode], BOOL, next_index, var, symb1, symb2)
+
+    def _typed_boolean(self, instruction: Instruction, next_index: int, types: VariableTypes, var: Symbol,
+                       symb1: Symbol, symb2: Symbol):
+        if not self._is_defined(types, var) or not self._proven(types, BOOL_TYPE, symb1, symb2):
+            return None
+        return self._build_typed_binary(self.OPERATIONS[instruction.opcode], BOOL, next_index, var, symb1, symb2)
+
+    def _typed_concat(self, instruction: Instruction, next_index: int, types: VariableTypes, var: Symbol,
+                      symb1: Symbol, symb2: Symbol):
+        if not self._is_defined(types, var) or not self._proven(types, STRING_TYPE, symb1, symb2):
+            return None
+        return self._build_typed_binary(concat, STRING, next_index, var, symb1, symb2)
+
+    def _build_typed_binary(self, operation: Callable, result_type: int, next_index: int, var: Symbol,
+                            symb1: Symbol, symb2: Symbol):
+        target = self._unchecked_frame_values(var)
+        slot = var.slot
+        first = self._python_value(symb1)
+        second = self._python_value(symb2)
+
+        if result_type == BOOL:
+            def op(interpret):
+                memory = interpret.memory
+                target(memory)[slot] = TRUE_VALUE if operation(first(memory), second(memory)) else FALSE_VALUE
+                return next_index
+            return op
+
+        def op(interpret):
+            memory = interpret.memory
+            target(memory)[slot] = (result_type, operation(first(memory), second(memory)))
+            return next_index
+        return op
+
+    def _typed_not(self, instruction: Instruction, next_index: int, types: VariableTypes, var: Symbol,
+                   symb: Symbol):
+        if not self._is_defined(types, var) or not self._proven(types, BOOL_TYPE, symb):
+            return None
+        target = self._unchecked_frame_values(var)
+        slot = var.slot
+        source = self._python_value(symb)
+
+        def op(interpret):
+            memory = interpret.memory
+            target(memory)[slot] = FALSE_VALUE if source(memory) else TRUE_VALUE
+            return next_index
+        return op
+
+    def _typed_write(self, instruction: Instruction, next_index: int, types: VariableTypes, symb: Symbol):
+        if not self._proven(types, VALUE_TYPES, symb):
+            return None
+        if self._proven(types, STRING_TYPE, symb):
+            source = self._python_value(symb)
+
+            def op(interpret):
+                interpret.output.write(str(source(interpret.memory)))
+                return next_index
+            return op
+
+        source = self._unchecked_value(symb)
+
+        def op(interpret):
+            interpret.output.write(to_str(source(interpret.memory)))
+            return next_index
+        return op
+
+    def _typed_strlen(self, instruction: Instruction, next_index: int, types: VariableTypes, var: Symbol,
+                      symb: Symbol):
+        if not self._is_defined(types, var) or not self._proven(types, STRING_TYPE, symb):
+            return None
+        target = self._unchecked_frame_values(var)
+        slot = var.slot
+        source = self._python_value(symb)
+
+        def op(interpret):
+            memory = interpret.memory
+            target(memory)[slot] = (INT, len(source(memory)))
+            return next_index
+        return op
+
+    def _typed_getchar(self, instruction: Instruction, next_index: int, types: VariableTypes, var: Symbol,
+                       symb1: Symbol, symb2: Symbol):
+        if (not self._is_defined(types, var) or not self._proven(types, STRING_TYPE, symb1)
+                or not self._proven(types, INT_TYPE, symb2)):
+            return None
+        target = self._unchecked_frame_values(var)
+        slot = var.slot
+        first = self._python_value(symb1)
+        second = self._python_value(symb2)
+
+        def op(interpret):
+            memory = interpret.memory
+            string = first(memory)
+            index = second(memory)
+            if index < 0 or index >= len(string):
+                raise InterpretError(InterpretErrorEnum.WRONG_STRING_OPERATION, "Wrong indexing in getchar")
+            target(memory)[slot] = (STRING, string[index])
+            return next_index
+        return op
+
+    def _typed_conditional_jump(self, instruction: Instruction, next_index: int, types: VariableTypes,
+                                label: Symbol, symb1: Symbol, symb2: Symbol):
+        if not self._same_type(types, symb1, symb2):
+            return None
+        target = instruction.target
+        first = self._python_value(symb1)
+        second = self._python_value(symb2)
+        jump_if_equal = instruction.opcode == 'JUMPIFEQ'
+
+        def op(interpret):
+            memory = interpret.memory
+            if (first(memory) == second(memory)) == jump_if_equal:
+                return target
+            return next_index
+        return op
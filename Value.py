@@ -0,0 +1,107 @@
+from typing import Any, Optional, Tuple
+
+from InterpretError import InterpretError, InterpretErrorEnum
+from Symbol import Symbol, SymbolType, decode_escapes
+
+
+class ValueType:
+    """
+    Type tags of runtime values. Small integers are compared faster than members of SymbolType.
+    """
+    INT = 0
+    BOOL = 1
+    STRING = 2
+    NIL = 3
+    NOT_INITIALIZED = 4
+
+
+# Runtime value is an immutable pair (type tag, python value). Values are never modified, so they can be shared
+# by variables and data stack without copying. Symbol is used only for arguments of loaded instructions.
+Value = Tuple[int, Any]
+
+TYPE_NAMES = ('int', 'bool', 'string', 'nil', '')
+
+NIL_VALUE: Value = (ValueType.NIL, None)
+TRUE_VALUE: Value = (ValueType.BOOL, True)
+FALSE_VALUE: Value = (ValueType.BOOL, False)
+
+# value of defined variable which was not initialized yet
+UNINITIALIZED: Value = (ValueType.NOT_INITIALIZED, None)
+
+_TYPE_OF_SYMBOL = {
+    SymbolType.INT: ValueType.INT,
+    SymbolType.BOOL: ValueType.BOOL,
+    SymbolType.STRING: ValueType.STRING,
+    SymbolType.NIL: ValueType.NIL,
+}
+
+
+def from_symbol(symbol: Symbol) -> Value:
+    """
+    Converts constant argument of instruction into runtime value.
+    """
+    if symbol.type == SymbolType.NIL:
+        return NIL_VALUE
+    if symbol.type == SymbolType.BOOL:
+        return bool_value(symbol.value)
+    return _TYPE_OF_SYMBOL[symbol.type], symbol.value
+
+
+def from_input(read_type: SymbolType, text: Optional[str]) -> Value:
+    """
+    Converts line of input read by READ into value of the type, nil if input has ended or the line is not valid.
+    """
+    if text is None:
+        return NIL_VALUE
+    if read_type == SymbolType.INT:
+        # the most common type is converted directly
+        try:
+            return ValueType.INT, int(text)
+        except ValueError:
+            return NIL_VALUE
+    if read_type == SymbolType.STRING:
+        # lines of input are not memoized as literals by Symbol
+        return ValueType.STRING, decode_escapes(text)
+
+    try:
+        return from_symbol(Symbol(read_type, text))  # conversion is done in symbol
+    except InterpretError as err:
+        # error in Symbol creation -> wrong type so use NIL
+        if err.error_type == InterpretErrorEnum.UNEXPECTED_XML:
+            return NIL_VALUE
+        raise
+
+
+def bool_value(value: bool) -> Value:
+    return TRUE_VALUE if value else FALSE_VALUE
+
+
+def to_str(value: Value) -> str:
+    """
+    Returns value as it is printed by WRITE.
+    """
+    value_type, python_value = value
+    if value_type == ValueType.NIL:
+        return ''
+    elif value_type == ValueType.BOOL:
+        return 'true' if python_value else 'false'
+    else:
+        return str(python_value)
+
+
+def type_to_str(value: Value) -> str:
+    """
+    Returns name of the type as it is returned by TYPE, empty string for not initialized value.
+    """
+    return TYPE_NAMES[value[0]]
+
+
+def to_debug_str(value: Value) -> str:
+    """
+    Returns value in the same format as constants in IPPcode22, used by DPRINT and BREAK.
+    """
+    if value[0] == ValueType.NOT_INITIALIZED:
+        return 'not initialized'
+    if value[0] == ValueType.NIL:
+        return 'nil@nil'
+    return f"{type_to_str(value)}@{to_str(value)}"
@@ -1,51 +1,49 @@
 import sys
-from typing import List, Dict
-from xml.etree.ElementTree import Element
+from typing import List, Dict, Optional
 from InterpretError import *
 from Symbol import Symbol, SymbolType
 from Instruction import Instruction
 import xml.etree.ElementTree as ET
 
+# size of blocks in which the source is passed to the XML parser
+CHUNK_SIZE = 1 << 16
+
+ARG_TAGS = {'arg1': 1, 'arg2': 2, 'arg3': 3}
+SYMBOL_TYPES = {symbol_type.name.lower(): symbol_type for symbol_type in SymbolType}
+
 
 class XmlInstructionsFactory:
 
     def load_instructions(self, source) -> Dict[int, Instruction]:
         """
         Loads instructions from XML file into dictionary. If source is None, then use stdin.
+        XML is parsed incrementally by event driven parser, every instruction is created as soon as its element is
+        closed, so no XML tree is built.
         :param source:
         :return:
         """
-        instructions: Dict[int, Instruction] = {}
-
         if source is None:
             source = sys.stdin
 
+        builder = _InstructionsBuilder(self)
+        parser = ET.XMLParser(target=builder)
         try:
-            xml_source = ET.parse(source)
-        except Exception as exc:
+            chunk = source.read(CHUNK_SIZE)
+            while chunk:
+                parser.feed(chunk)
+                chunk = source.read(CHUNK_SIZE)
+            parser.close()
+        except ET.ParseError as exc:
             raise InterpretError(InterpretErrorEnum.WRONG_XML_FORMAT, str(exc))
-        program_xml = xml_source.getroot()
-        if program_xml.tag != 'program' or program_xml.attrib['language'] != 'IPPcode22':
-            raise InterpretError(InterpretErrorEnum.UNEXPECTED_XML, "Wrong program tag")
-
-        # load all instructions to program
-        for child_xml in program_xml:
-            if child_xml.tag != 'instruction':
-                raise InterpretError(InterpretErrorEnum.UNEXPECTED_XML)
 
-            instruction: Instruction = self._create_instruction(child_xml)
+        # malformed XML has priority over wrong structure, so structure error is raised after whole XML is read
+        if builder.error is not None:
+            raise builder.error
+        return builder.instructions
 
-            # check whether order is not already defined
-            if instruction.order in instructions:
-                raise InterpretError(InterpretErrorEnum.UNEXPECTED_XML)
-            # save instruction with its id
-            instructions[int(instruction.order)] = instruction
-        return instructions
-
-    def _create_instruction(self, xml_node: Element) -> Instruction:
-        opcode = xml_node.attrib.get('opcode')
-        order = xml_node.attrib.get('order')
-        args = self._build_args(xml_node)
+    def create_instruction(self, attrib: Dict[str, str], args: Dict[int, Symbol]) -> Instruction:
+        opcode = attrib.get('opcode')
+        order = attrib.get('order')
 
         try:
             order = int(order)
@@ -55,32 +53,93 @@ class XmlInstructionsFactory:
         if not isinstance(opcode, str) or order <= 0:
             raise InterpretError(InterpretErrorEnum.UNEXPECTED_XML)
 
-        return Instruction(opcode, int(order), args)
-
-    def _build_args(self, xml_node: Element) -> Dict[int, Symbol]:
-        """
-        Validates and builds arguments from xml node into dictionary, where key is arg number
-        :param xml_node:
-        :return:
-        """
-        args: Dict[int, Symbol] = {}
-        for child_node in xml_node:
-            if child_node.tag not in ['arg1', 'arg2', 'arg3']:
-                raise InterpretError(InterpretErrorEnum.UNEXPECTED_XML)
-            value = child_node.text
-            arg_number = int(child_node.tag[3:])  # arg2 -> 2
-
-            try:
-                # generate from enum
-                symbol_type = SymbolType[child_node.attrib['type'].upper()]
-            except KeyError:
-                raise InterpretError(InterpretErrorEnum.UNEXPECTED_XML, "Cannot find SymbolType")
-            if arg_number in args:
-                raise InterpretError(InterpretErrorEnum.UNEXPECTED_XML)
-            args[arg_number] = Symbol(symbol_type, value)
-
         for i in range(1, len(args) + 1):
             if args.get(i) is None:
                 raise InterpretError(InterpretErrorEnum.UNEXPECTED_XML, f"Wrong arguments")
 
-        return args
+        return Instruction(opcode, int(order), args)
+
+    def create_arg(self, attrib: Dict[str, str], value: Optional[str]) -> Symbol:
+        try:
+            # generate from enum
+            symbol_type = SYMBOL_TYPES[attrib['type'].lower()]
+        except KeyError:
+            raise InterpretError(InterpretErrorEnum.UNEXPECTED_XML, "Cannot find SymbolType")
+        return Symbol(symbol_type, value)
+
+
+class _InstructionsBuilder:
+    """
+    Target of XMLParser, receives events of the parser and builds instructions from them.
+    The first error is saved and the rest of the document is only checked by the parser.
+    """
+
+    def __init__(self, factory: XmlInstructionsFactory):
+        self.factory = factory
+        self.instructions: Dict[int, Instruction] = {}
+        self.error: Optional[InterpretError] = None
+        self.depth = 0
+
+        # instruction which is being built
+        self.instruction_attrib: Dict[str, str] = {}
+        self.args: Dict[int, Symbol] = {}
+
+        # argument which is being built
+        self.arg_number = 0
+        self.arg_attrib: Dict[str, str] = {}
+        self.arg_text: List[str] = []
+        self.arg_has_child = False
+
+    def start(self, tag: str, attrib: Dict[str, str]):
+        self.depth += 1
+        if self.error is not None:
+            return
+        try:
+            if self.depth == 1:
+                if tag != 'program' or attrib.get('language') != 'IPPcode22':
+                    raise InterpretError(InterpretErrorEnum.UNEXPECTED_XML, "Wrong program tag")
+            elif self.depth == 2:
+                if tag != 'instruction':
+                    raise InterpretError(InterpretErrorEnum.UNEXPECTED_XML)
+                self.instruction_attrib = attrib
+                self.args = {}
+            elif self.depth == 3:
+                if tag not in ARG_TAGS:
+                    raise InterpretError(InterpretErrorEnum.UNEXPECTED_XML)
+                self.arg_number = ARG_TAGS[tag]  # arg2 -> 2
+                if self.arg_number in self.args:
+                    raise InterpretError(InterpretErrorEnum.UNEXPECTED_XML)
+                self.arg_attrib = attrib
+                self.arg_text = []
+                self.arg_has_child = False
+            elif self.depth == 4:
+                # only text before the first child element is value of argument
+                self.arg_has_child = True
+        except InterpretError as err:
+            self.error = err
+
+    def data(self, data: str):
+        if self.depth == 3 and not self.arg_has_child:
+            self.arg_text.append(data)
+
+    def end(self, tag: str):
+        self.depth -= 1
+        if self.error is not None:
+            return
+        try:
+            if self.depth == 2:
+                value = ''.join(self.arg_text) if self.arg_text else None
+                self.args[self.arg_number] = self.factory.create_arg(self.arg_attrib, value)
+            elif self.depth == 1:
+                instruction = self.factory.create_instruction(self.instruction_attrib, self.args)
+
+                # check whether order is not already defined
+                if instruction.order in self.instructions:
+                    raise InterpretError(InterpretErrorEnum.UNEXPECTED_XML)
+                # save instruction with its id
+                self.instructions[instruction.order] = instruction
+        except InterpretError as err:
+            self.error = err
+
+    def close(self):
+        return self.instructions
@@ -0,0 +1,40 @@
+"""
+Microbenchmark of decoding string literals (escape sequences \\ddd).
+
+Usage: python3 -m benchmarks.decode_strings [--count N]
+"""
+import argparse
+import re
+import timeit
+
+from Symbol import decode_string, decode_escapes
+
+ESCAPE_DENSE = ''.join(f"\\{code:03d}" for code in range(32, 96)) * 4
+ESCAPE_FREE = 'abcdefghijklmnopqrstuvwxyz0123456789' * 8
+
+
+def decode_string_original(value: str) -> str:
+    """
+    Decoding used before, the pattern is compiled and the string is copied for every escape sequence.
+    """
+    pattern = re.compile(r"\\(\d{3})")
+    for match in pattern.finditer(value):
+        value = value.replace(match.group(0), chr(int(match.group(1))))
+    return value
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measures decoding of string literals')
+    parser.add_argument('--count', type=int, default=20000, help='number of decoded strings')
+    args = parser.parse_args()
+
+    for name, value in (('escape-dense', ESCAPE_DENSE), ('escape-free', ESCAPE_FREE)):
+        assert decode_string_original(value) == decode_string(value)
+        for variant, function in (('original', decode_string_original), ('single pass', decode_escapes),
+                                  ('memoized', decode_string)):
+            seconds = min(timeit.repeat(lambda: function(value), number=args.count, repeat=3))
+            print(f"{name:<13} {variant:<12} {seconds / args.count * 1e6:9.3f} us/string")
+
+
+if __name__ == '__main__':
+    main()
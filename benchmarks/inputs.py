@@ -0,0 +1,84 @@
+"""
+Benchmark of one program executed with many inputs: loaded for every input by Interpret.load_program and loaded
+once as Program executed by run.
+
+Usage: python3 -m benchmarks.inputs [--inputs N] [--engine ENGINE] [--optimize]
+"""
+import argparse
+import io
+import time
+
+from Program import ProgramLoader
+from benchmarks.workloads import to_xml
+from interpret import Interpret, run
+
+# reads numbers until the end of input and writes their sum and maximum
+SUM_MAX = """
+DEFVAR GF@value
+DEFVAR GF@sum
+DEFVAR GF@max
+DEFVAR GF@type
+DEFVAR GF@greater
+MOVE GF@sum int@0
+MOVE GF@max int@0
+LABEL loop
+READ GF@value int
+TYPE GF@type GF@value
+JUMPIFEQ end GF@type string@nil
+ADD GF@sum GF@sum GF@value
+GT GF@greater GF@value GF@max
+JUMPIFEQ loop GF@greater bool@false
+MOVE GF@max GF@value
+JUMP loop
+LABEL end
+WRITE GF@sum
+WRITE string@\\032
+WRITE GF@max
+"""
+
+
+def reload_each(source: bytes, inputs: list, engine: str, optimize: bool) -> list:
+    outputs = []
+    for text in inputs:
+        output = io.StringIO()
+        interpret = Interpret(io.BytesIO(source), io.StringIO(text), engine, output)
+        interpret.optimize = optimize
+        interpret.load_program()
+        interpret.run()
+        outputs.append(output.getvalue())
+    return outputs
+
+
+def load_once(source: bytes, inputs: list, engine: str, optimize: bool) -> list:
+    loader = ProgramLoader(engine)
+    loader.optimize = optimize
+    program = loader.load(io.BytesIO(source))
+    outputs = []
+    for text in inputs:
+        output = io.StringIO()
+        run(program, io.StringIO(text), output)
+        outputs.append(output.getvalue())
+    return outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measures one program executed with many inputs')
+    parser.add_argument('--inputs', type=int, default=10000, help='number of inputs')
+    parser.add_argument('--engine', choices=Interpret.ENGINES, default='closure')
+    parser.add_argument('--optimize', action='store_true', help='optimizations of closure engine')
+    args = parser.parse_args()
+
+    source = to_xml(SUM_MAX)
+    inputs = ["".join(f"{(number * 7919 + index) % 1000}\n" for index in range(10)) for number in range(args.inputs)]
+    results = []
+    for name, execute in (('load for every input', reload_each), ('load once', load_once)):
+        start = time.perf_counter()
+        outputs = execute(source, inputs, args.engine, args.optimize)
+        seconds = time.perf_counter() - start
+        results.append(outputs)
+        print(f"{name:<22} {args.inputs / seconds:12,.0f} inputs/s {seconds:8.3f} s")
+    assert results[0] == results[1]
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""
+Benchmark of recursive calls (fib, ackermann) with and without reuse of frames.
+
+Usage: python3 -m benchmarks.recursion [--fib N] [--ackermann M N] [--engine ENGINE]
+"""
+import argparse
+import io
+import time
+
+import Memory as memory_module
+from Frame import Frame
+from benchmarks.workloads import FIB, to_xml
+from interpret import Interpret
+
+# arguments are passed in TF@m and TF@n
+ACKERMANN = """
+CREATEFRAME
+DEFVAR TF@m
+MOVE TF@m int@{m}
+DEFVAR TF@n
+MOVE TF@n int@{n}
+PUSHFRAME
+CALL ack
+POPFRAME
+WRITE TF@ret
+EXIT int@0
+LABEL ack
+DEFVAR LF@ret
+JUMPIFEQ m0 LF@m int@0
+CREATEFRAME
+DEFVAR TF@m
+DEFVAR TF@n
+JUMPIFEQ n0 LF@n int@0
+MOVE TF@m LF@m
+SUB TF@n LF@n int@1
+PUSHFRAME
+CALL ack
+POPFRAME
+MOVE LF@ret TF@ret
+CREATEFRAME
+DEFVAR TF@m
+DEFVAR TF@n
+SUB TF@m LF@m int@1
+MOVE TF@n LF@ret
+PUSHFRAME
+CALL ack
+POPFRAME
+MOVE LF@ret TF@ret
+RETURN
+LABEL n0
+SUB TF@m LF@m int@1
+MOVE TF@n int@1
+PUSHFRAME
+CALL ack
+POPFRAME
+MOVE LF@ret TF@ret
+RETURN
+LABEL m0
+ADD LF@ret LF@n int@1
+RETURN
+"""
+
+
+class CountingFrame(Frame):
+    __slots__ = ()
+    created = 0
+
+    def __init__(self, names):
+        CountingFrame.created += 1
+        super().__init__(names)
+
+
+def fib_calls(n: int) -> int:
+    a, b = 1, 1  # calls of fib(0), fib(1)
+    for _ in range(n - 1):
+        a, b = b, a + b + 1
+    return b if n > 0 else a
+
+
+def ackermann_calls(m: int, n: int) -> int:
+    calls = 0
+    stack = [m]
+    while stack:
+        m = stack.pop()
+        calls += 1
+        if m == 0:
+            n += 1
+        elif n == 0:
+            stack.append(m - 1)
+            n = 1
+        else:
+            stack.append(m - 1)
+            stack.append(m)
+            n -= 1
+    return calls
+
+
+def run(source: bytes, engine: str, frame_pool_size: int):
+    output = io.StringIO()
+    interpret = Interpret(io.BytesIO(source), None, engine, output)
+    interpret.frame_pool_size = frame_pool_size
+    interpret.load_program()
+    CountingFrame.created = 0
+    start = time.perf_counter()
+    try:
+        interpret.run()
+    except SystemExit:
+        pass
+    return time.perf_counter() - start, CountingFrame.created, output.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measures recursive calls with and without reuse of frames')
+    parser.add_argument('--fib', type=int, default=20, help='argument of fib')
+    parser.add_argument('--ackermann', type=int, nargs=2, default=(2, 300), metavar=('M', 'N'),
+                        help='arguments of ackermann')
+    parser.add_argument('--engine', choices=Interpret.ENGINES, default='closure')
+    args = parser.parse_args()
+
+    memory_module.Frame = CountingFrame
+    m, n = args.ackermann
+    programs = (
+        (f'fib({args.fib})', to_xml(FIB.format(n=args.fib)), fib_calls(args.fib)),
+        (f'ackermann({m}, {n})', to_xml(ACKERMANN.format(m=m, n=n)), ackermann_calls(m, n)),
+    )
+    for name, source, calls in programs:
+        results = []
+        for frame_pool_size in (0, memory_module.FRAME_POOL_SIZE):
+            seconds, frames, output = min(run(source, args.engine, frame_pool_size) for _ in range(3))
+            results.append(output)
+            print(f"{name:<18} frame pool {frame_pool_size:>4}: {calls / seconds:12,.0f} calls/s "
+                  f"{frames:>10} frames allocated, result {output}")
+        assert results[0] == results[1]
+
+
+if __name__ == '__main__':
+    main()
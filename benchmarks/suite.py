@@ -0,0 +1,228 @@
+"""
+Benchmark suite of generated workloads (see benchmarks.workloads). Every workload is loaded and run by Interpret
+in this process (parse time, instructions per second) and once by interpret.py in a new process (peak RSS).
+Results are written to JSON, which can be used as a baseline of the next run to find regressions.
+
+Usage: python3 -m benchmarks.suite [--engine ENGINE] [--optimize] [--scale S] [--repeat N] [--only NAME ...]
+                                   [--output FILE] [--baseline FILE] [--threshold T]
+"""
+import argparse
+import io
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Tuple
+
+from benchmarks.workloads import WORKLOADS, DEFAULT_SIZES, Workload, to_xml
+from interpret import Interpret
+
+INTERPRET_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'interpret.py')
+
+# metric -> True if higher value is better
+METRICS = {
+    'instructions_per_second': True,
+    'parse_time': False,
+    'peak_rss_kb': False,
+}
+
+
+def size_of(name: str, scale: float) -> int:
+    if name == 'fib':
+        # number of calls grows by golden ratio with the argument
+        return max(1, DEFAULT_SIZES[name] + round(math.log(scale, (1 + math.sqrt(5)) / 2)))
+    return max(1, round(DEFAULT_SIZES[name] * scale))
+
+
+def new_interpret(workload: Workload, engine: str, optimize: bool) -> Interpret:
+    interpret = Interpret(io.BytesIO(workload.source), io.StringIO(workload.input), engine, io.StringIO())
+    interpret.optimize = optimize
+    return interpret
+
+
+def count_instructions(workload: Workload) -> int:
+    """
+    Returns number of instructions executed by the program, without optimizations.
+    """
+    interpret = new_interpret(workload, 'closure', False)
+    interpret.load_program()
+    ops = interpret.ops
+    counter = 0
+    executed = 0
+    try:
+        while counter < len(ops):
+            executed += 1
+            counter = ops[counter](interpret)
+    except SystemExit:
+        pass
+    return executed
+
+
+def run_once(workload: Workload, engine: str, optimize: bool) -> Tuple[float, float]:
+    """
+    Returns seconds spent by loading and by running the program.
+    """
+    interpret = new_interpret(workload, engine, optimize)
+    start = time.perf_counter()
+    interpret.load_program()
+    loaded = time.perf_counter()
+    try:
+        interpret.run()
+    except SystemExit:
+        pass
+    return loaded - start, time.perf_counter() - loaded
+
+
+# runs interpret.py given as the first argument and prints its peak RSS in KiB to stderr, peak RSS reported by
+# getrusage includes the memory of the parent process before exec on Linux, VmHWM of the new process does not
+PEAK_RSS_WRAPPER = """
+import os, resource, runpy, sys
+sys.argv = sys.argv[1:]
+sys.path.insert(0, os.path.dirname(sys.argv[0]))
+try:
+    runpy.run_path(sys.argv[0], run_name='__main__')
+finally:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak = peak // 1024 if sys.platform == 'darwin' else peak
+    if os.path.exists('/proc/self/status'):
+        with open('/proc/self/status') as status:
+            peak = next((int(line.split()[1]) for line in status if line.startswith('VmHWM:')), peak)
+    print('peak-rss', peak, file=sys.stderr)
+"""
+
+
+def run_process(source_path: str, input_path: str, engine: str, optimize: bool) -> Tuple[float, int]:
+    """
+    Runs interpret.py in a new process, returns its wall time in seconds and peak RSS in KiB.
+    """
+    command = [sys.executable, '-c', PEAK_RSS_WRAPPER, INTERPRET_PATH, '--source', source_path, '--input',
+               input_path, '--engine', engine]
+    if optimize:
+        command.append('--optimize')
+    start = time.perf_counter()
+    process = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    seconds = time.perf_counter() - start
+    peak_rss = 0
+    for line in process.stderr.splitlines():
+        if line.startswith('peak-rss '):
+            peak_rss = int(line.split()[1])
+    return seconds, peak_rss
+
+
+def measure_startup(args, directory: str) -> float:
+    """
+    Returns wall time of interpret.py which interprets empty program.
+    """
+    source_path = os.path.join(directory, 'empty.xml')
+    with open(source_path, 'wb') as file:
+        file.write(to_xml(''))
+    command = [sys.executable, INTERPRET_PATH, '--source', source_path, '--input', os.devnull, '--engine',
+               args.engine]
+    seconds = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        subprocess.run(command, stdout=subprocess.DEVNULL)
+        seconds.append(time.perf_counter() - start)
+    return min(seconds)
+
+
+def measure(name: str, workload: Workload, args, directory: str) -> Dict[str, Any]:
+    instructions = count_instructions(workload)
+    parse_time, run_time = min(run_once(workload, args.engine, args.optimize) for _ in range(args.repeat))
+
+    source_path = os.path.join(directory, f'{name}.xml')
+    input_path = os.path.join(directory, f'{name}.in')
+    with open(source_path, 'wb') as file:
+        file.write(workload.source)
+    with open(input_path, 'w') as file:
+        file.write(workload.input)
+    process_time, peak_rss = run_process(source_path, input_path, args.engine, args.optimize)
+    return {
+        'size': len(workload.source),
+        'instructions': instructions,
+        'parse_time': parse_time,
+        'run_time': run_time,
+        'instructions_per_second': instructions / run_time if run_time else 0.0,
+        'process_time': process_time,
+        'peak_rss_kb': peak_rss,
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> Tuple[List[str], bool]:
+    """
+    Returns lines of comparison with the baseline and whether some metric is worse by more than the threshold.
+    """
+    lines = []
+    regression = False
+    for name, result in results['workloads'].items():
+        base = baseline.get('workloads', {}).get(name)
+        if base is None:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            old, new = base.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = -change if higher_is_better else change
+            flag = 'REGRESSION' if worse > threshold else ''
+            regression = regression or worse > threshold
+            lines.append(f"{name:<16} {metric:<24} {old:>14.4g} -> {new:>14.4g} {100 * change:>+8.1f} % {flag}")
+    old, new = baseline.get('startup_time'), results['startup_time']
+    if old:
+        change = (new - old) / old
+        flag = 'REGRESSION' if change > threshold else ''
+        regression = regression or change > threshold
+        lines.append(f"{'startup':<16} {'startup_time':<24} {old:>14.4g} -> {new:>14.4g} {100 * change:>+8.1f} % {flag}")
+    return lines, regression
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Runs generated workloads and compares results with a baseline')
+    parser.add_argument('--engine', choices=Interpret.ENGINES, default='closure')
+    parser.add_argument('--optimize', action='store_true', help='optimizations of closure engine')
+    parser.add_argument('--scale', type=float, default=1.0, help='multiplier of sizes of workloads')
+    parser.add_argument('--repeat', type=int, default=3, help='number of runs, the fastest one is reported')
+    parser.add_argument('--only', nargs='+', choices=list(WORKLOADS), metavar='NAME',
+                        help=f'run only the workloads: {", ".join(WORKLOADS)}')
+    parser.add_argument('--output', type=str, metavar='FILE', help='write results in JSON to the file')
+    parser.add_argument('--baseline', type=str, metavar='FILE', help='compare results with JSON of previous run')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='relative change of metric reported as regression (default 0.1)')
+    args = parser.parse_args()
+
+    results: Dict[str, Any] = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'engine': args.engine,
+        'optimize': args.optimize,
+        'scale': args.scale,
+        'workloads': {},
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        results['startup_time'] = measure_startup(args, directory)
+        print(f"startup {results['startup_time'] * 1000:.1f} ms")
+        for name in args.only or WORKLOADS:
+            workload = WORKLOADS[name](size_of(name, args.scale))
+            result = results['workloads'][name] = measure(name, workload, args, directory)
+            print(f"{name:<16} {result['instructions']:>10} instructions {result['instructions_per_second']:>12,.0f} "
+                  f"instructions/s, parse {result['parse_time'] * 1000:8.1f} ms, "
+                  f"run {result['run_time'] * 1000:8.1f} ms, peak RSS {result['peak_rss_kb'] / 1024:6.1f} MiB")
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        lines, regression = compare(results, baseline, args.threshold)
+        print("\n".join(lines))
+        if regression:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
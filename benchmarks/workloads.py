@@ -0,0 +1,230 @@
+"""
+Generated IPPcode22 workloads of benchmarks, each one is parameterized by its size.
+"""
+import random
+from typing import Callable, Dict, NamedTuple
+from xml.sax.saxutils import escape
+
+# result of function is returned in LF@ret, argument is passed in TF@n
+FIB = """
+CREATEFRAME
+DEFVAR TF@n
+MOVE TF@n int@{n}
+PUSHFRAME
+CALL fib
+POPFRAME
+WRITE TF@ret
+EXIT int@0
+LABEL fib
+DEFVAR LF@ret
+LT LF@ret LF@n int@2
+JUMPIFEQ base LF@ret bool@true
+CREATEFRAME
+DEFVAR TF@n
+SUB TF@n LF@n int@1
+PUSHFRAME
+CALL fib
+POPFRAME
+MOVE LF@ret TF@ret
+CREATEFRAME
+DEFVAR TF@n
+SUB TF@n LF@n int@2
+PUSHFRAME
+CALL fib
+POPFRAME
+ADD LF@ret LF@ret TF@ret
+RETURN
+LABEL base
+MOVE LF@ret LF@n
+RETURN
+"""
+
+
+class Workload(NamedTuple):
+    source: bytes  # XML representation of the program
+    input: str  # standard input of the program
+
+
+def to_xml(source: str, order_step: int = 1, shuffled: bool = False) -> bytes:
+    """
+    Converts program in IPPcode22 (without header and comments) into XML representation.
+    :param source: one instruction per line
+    :param order_step: difference of orders of consecutive instructions
+    :param shuffled: instruction elements are in random (but reproducible) order, their orders stay
+    """
+    lines = []
+    for order, line in enumerate((line.split() for line in source.strip().splitlines()), 1):
+        opcode, operands = line[0], line[1:]
+        args = []
+        for number, operand in enumerate(operands, 1):
+            prefix, _, value = operand.partition('@')
+            if prefix in ('GF', 'LF', 'TF'):
+                arg_type, value = 'var', operand
+            elif opcode == 'READ' and number == 2:
+                arg_type, value = 'type', operand
+            elif value or prefix in ('int', 'bool', 'string', 'nil'):
+                arg_type = prefix
+            else:
+                arg_type, value = 'label', operand
+            args.append(f'<arg{number} type="{arg_type}">{escape(value)}</arg{number}>')
+        lines.append(f'<instruction order="{order * order_step}" opcode="{opcode}">{"".join(args)}</instruction>')
+    if shuffled:
+        random.Random(0).shuffle(lines)
+    return "\n".join(['<?xml version="1.0" encoding="UTF-8"?>', '<program language="IPPcode22">', *lines,
+                      '</program>']).encode()
+
+
+def loop(size: int) -> Workload:
+    """
+    Integer arithmetic and conditional jumps.
+    """
+    return Workload(to_xml(f"""
+DEFVAR GF@i
+DEFVAR GF@sum
+DEFVAR GF@cond
+MOVE GF@i int@0
+MOVE GF@sum int@0
+LABEL loop
+MUL GF@cond GF@i int@3
+ADD GF@sum GF@sum GF@cond
+IDIV GF@cond GF@i int@7
+SUB GF@sum GF@sum GF@cond
+ADD GF@i GF@i int@1
+LT GF@cond GF@i int@{size}
+JUMPIFEQ loop GF@cond bool@true
+WRITE GF@sum
+"""), '')
+
+
+def fib(size: int) -> Workload:
+    """
+    Recursive calls with arguments in frames (CREATEFRAME, PUSHFRAME, CALL, RETURN, POPFRAME).
+    """
+    return Workload(to_xml(FIB.format(n=size)), '')
+
+
+def concat(size: int) -> Workload:
+    """
+    String built by CONCAT of single characters.
+    """
+    return Workload(to_xml(f"""
+DEFVAR GF@i
+DEFVAR GF@text
+DEFVAR GF@length
+MOVE GF@i int@0
+MOVE GF@text string@
+LABEL loop
+CONCAT GF@text GF@text string@x
+ADD GF@i GF@i int@1
+JUMPIFNEQ loop GF@i int@{size}
+STRLEN GF@length GF@text
+WRITE GF@length
+"""), '')
+
+
+def getchar_setchar(size: int) -> Workload:
+    """
+    Scan of string by GETCHAR which replaces every vowel by SETCHAR.
+    """
+    return Workload(to_xml(f"""
+DEFVAR GF@i
+DEFVAR GF@text
+DEFVAR GF@char
+DEFVAR GF@length
+MOVE GF@text string@{'abcdefghijklmnopqrstuvwxyz' * (size // 26 + 1)}
+STRLEN GF@length GF@text
+MOVE GF@i int@0
+LABEL loop
+GETCHAR GF@char GF@text GF@i
+JUMPIFEQ skip GF@char string@a
+JUMPIFEQ skip GF@char string@e
+JUMPIFEQ skip GF@char string@o
+JUMP next
+LABEL skip
+SETCHAR GF@text GF@i string@_
+LABEL next
+ADD GF@i GF@i int@1
+JUMPIFNEQ loop GF@i GF@length
+GETCHAR GF@char GF@text int@4
+WRITE GF@char
+"""), '')
+
+
+def stack(size: int) -> Workload:
+    """
+    Arithmetic on data stack (PUSHS, POPS and stack instructions).
+    """
+    return Workload(to_xml(f"""
+DEFVAR GF@i
+DEFVAR GF@sum
+MOVE GF@i int@0
+MOVE GF@sum int@0
+LABEL loop
+PUSHS GF@sum
+PUSHS GF@i
+PUSHS int@2
+MULS
+ADDS
+POPS GF@sum
+PUSHS GF@i
+PUSHS int@1
+ADDS
+POPS GF@i
+PUSHS GF@i
+PUSHS int@{size}
+JUMPIFNEQS loop
+WRITE GF@sum
+"""), '')
+
+
+def read(size: int) -> Workload:
+    """
+    READ of integers until the end of input.
+    """
+    return Workload(to_xml("""
+DEFVAR GF@value
+DEFVAR GF@sum
+DEFVAR GF@type
+MOVE GF@sum int@0
+LABEL loop
+READ GF@value int
+TYPE GF@type GF@value
+JUMPIFEQ end GF@type string@nil
+ADD GF@sum GF@sum GF@value
+JUMP loop
+LABEL end
+WRITE GF@sum
+"""), "".join(f"{number}\n" for number in range(size)))
+
+
+def sparse(size: int) -> Workload:
+    """
+    Long straight-line program with sparse orders of instructions in shuffled XML, measures mostly loading.
+    """
+    lines = ["DEFVAR GF@a", "MOVE GF@a int@0"]
+    lines.extend(f"ADD GF@a GF@a int@{number % 10}" for number in range(size))
+    lines.append("WRITE GF@a")
+    return Workload(to_xml("\n".join(lines), order_step=1000, shuffled=True), '')
+
+
+# name -> generator of workload of given size
+WORKLOADS: Dict[str, Callable[[int], Workload]] = {
+    'loop': loop,
+    'fib': fib,
+    'concat': concat,
+    'getchar-setchar': getchar_setchar,
+    'stack': stack,
+    'read': read,
+    'sparse': sparse,
+}
+
+# name -> size for scale 1
+DEFAULT_SIZES: Dict[str, int] = {
+    'loop': 100000,
+    'fib': 20,
+    'concat': 100000,
+    'getchar-setchar': 50000,
+    'stack': 50000,
+    'read': 100000,
+    'sparse': 50000,
+}
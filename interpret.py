@@ -1,36 +1,81 @@
 import sys
-from typing import TextIO, Dict, List
+import random
+import time
+from typing import BinaryIO, TextIO, Dict, List, Callable, Optional, Sequence
 
 from ArithmeticManager import ArithmeticManager
+from Budget import Budget, BudgetExceeded
+from ClosureCompiler import ClosureCompiler
 from DataStackManager import DataStackManager
 from DebugManager import DebugManager
 from FrameFuncManager import *
+from FunctionProfiler import FunctionProfiler
 from IOManager import IOManager
+from InputReader import InputReader
 from Instruction import Instruction
 from JumpManager import JumpManager
-from Memory import Memory
+from Memory import Memory, FRAME_POOL_SIZE
+from Memoizer import Memoizer, MEMO_CACHE_SIZE, PendingCall
+from Program import Program, ProgramLoader
+from ProgramCache import ProgramCache
+from Profiler import Profiler
+from Statistics import Statistics, CountingOutput, CountingInputReader, CONTROL
 from StringManager import StringManager
 from TypeManager import TypeManager
-from XmlInstructionsFactory import XmlInstructionsFactory
 from InterpretError import *
 import argparse
 
+# size of buffer for output of WRITE instructions
+OUTPUT_BUFFER_SIZE = 1 << 16
+
 
 class Interpret:
     """
-    Interpret is responsible for holding data about instructions, labels and counter.
-    It manages whole flow of interpretation.
+    Interpret is responsible for one execution of loaded Program: it holds memory, call stack, counter, input and
+    output and manages whole flow of interpretation. Program can be loaded by the interpret itself (load_program)
+    or shared by many interprets (from_program), which are cheap to create.
     """
 
-    def __init__(self, source: TextIO, input: TextIO):
+    ENGINES = ['closure', 'reference', 'pycompile']
+
+    def __init__(self, source: BinaryIO, input: TextIO, engine: str = 'closure', output: TextIO = None):
         self.input = input
+        self.input_reader = InputReader(input if input is not None else sys.stdin)
         self.source = source
+        self.output = output if output is not None else sys.stdout  # output of WRITE instructions
+        self.engine = engine
+        self.cache: Optional[ProgramCache] = None
+        self.optimize = False  # peephole optimizations of closure engine
+        self.report_optimizations = False  # print applied optimizations and number of dispatches to stderr
+        self.compiler: Optional[ClosureCompiler] = None
+        self.tail_calls = True  # CALL followed by RETURN inside function is executed as JUMP
+        self.frame_pool_size = FRAME_POOL_SIZE  # maximum number of discarded frames kept for reuse, 0 disables reuse
+        self.memo_cache_size = 0  # maximum number of memoized results of pure functions, 0 disables memoization
+        self.memoizer: Optional[Memoizer] = None
+        self.memo_pending: List[PendingCall] = []  # calls of memoized functions being executed
+        self.profile = False  # count executions and time of instructions, print report to stderr
+        self.profile_json: Optional[str] = None  # file for profile in JSON
+        self.profiler: Optional[Profiler] = None
+        self.profile_functions = False  # call graph profile of functions, printed to stderr
+        self.flamegraph: Optional[str] = None  # file for collapsed stacks of the call graph profile
+        self.function_profiler: Optional[FunctionProfiler] = None
+        self.budget: Optional[Budget] = None  # limits of execution checked by the interpretation loop
+        self.statistics: Optional[Statistics] = None  # resources consumed by the program, collected when set
         self.memory = Memory()
-        self.instructions: Dict[int, Instruction] = {}
+        self.loaded: Optional[Program] = None
+        self.program: Sequence[Instruction] = ()
         self.labels: Dict[str, int] = {}
+        self.ops: Sequence[Callable] = ()  # compiled instructions, each returns index of the next instruction
+        self.program_function: Optional[Callable] = None  # whole program compiled into python by pycompile engine
+        self.program_source = ''  # source of program_function
         self.call_stack: List[int] = []
-        self.counter: int = 1
+        self.counter: int = 0  # index of the next instruction in program
+        self.pc: int = 0  # index of the instruction being executed
+
+        # method of manager for each opcode, built when the first instruction is executed by managers
+        self.method_for_opcode: Optional[Dict[str, Callable]] = None
 
+    def _methods_for_opcodes(self) -> Dict[str, Callable]:
         frameFuncManager = FrameFuncManager(self)
         dataStackManager = DataStackManager(self)
         arithmeticManager = ArithmeticManager(self)
@@ -40,7 +85,7 @@ class Interpret:
         jumpManager = JumpManager(self)
         debugManager = DebugManager(self)
 
-        self.method_for_opcode = {
+        return {
             "MOVE": frameFuncManager.move,
             "CREATEFRAME": frameFuncManager.create_frame,
             "PUSHFRAME": frameFuncManager.push_frame,
@@ -75,64 +120,331 @@ class Interpret:
             "JUMPIFNEQ": jumpManager.jumpifneq,
             "EXIT": jumpManager.exit,
             "DPRINT": debugManager.dprint,
-            "BREAK": debugManager.break_fn
+            "BREAK": debugManager.break_fn,
+            # STACK extension
+            "CLEARS": dataStackManager.clears,
+            "ADDS": arithmeticManager.adds,
+            "SUBS": arithmeticManager.subs,
+            "MULS": arithmeticManager.muls,
+            "IDIVS": arithmeticManager.idivs,
+            "LTS": arithmeticManager.lts,
+            "GTS": arithmeticManager.gts,
+            "EQS": arithmeticManager.eqs,
+            "ANDS": arithmeticManager.ands,
+            "ORS": arithmeticManager.ors,
+            "NOTS": arithmeticManager.nots,
+            "INT2CHARS": arithmeticManager.int2chars,
+            "STRI2INTS": arithmeticManager.stri2ints,
+            "JUMPIFEQS": jumpManager.jumpifeqs,
+            "JUMPIFNEQS": jumpManager.jumpifneqs,
         }
 
-    def parse_instructions(self):
+    @classmethod
+    def from_program(cls, program: Program, input: Optional[TextIO] = None, output: Optional[TextIO] = None,
+                     frame_pool_size: int = FRAME_POOL_SIZE) -> 'Interpret':
         """
-        Loads instructions from source file / stdin into dictionary and checks if all instructions have implementation
-        :return:
+        Creates execution of loaded program, which does not parse nor compile it again.
         """
-        factory = XmlInstructionsFactory()
+        interpret = cls(None, input, program.engine, output)
+        interpret.frame_pool_size = frame_pool_size
+        interpret.use_program(program)
+        return interpret
 
-        self.instructions = factory.load_instructions(self.source)
+    def load_program(self):
+        """
+        Loads, validates and compiles program from source with options of this interpret (see ProgramLoader).
+        :return:
+        """
+        loader = ProgramLoader(self.engine, self.cache)
+        loader.optimize = self.optimize
+        loader.tail_calls = self.tail_calls
+        loader.memo_cache_size = self.memo_cache_size
+        self.use_program(loader.load(self.source))
 
-        # check if all instructions have implementation
-        opcode_keys = self.method_for_opcode.keys()
-        for key, instruction in self.instructions.items():
-            if instruction.opcode not in opcode_keys:
-                raise InterpretError(InterpretErrorEnum.UNEXPECTED_XML, f"Wrong opcode {instruction.opcode}")
+    def use_program(self, program: Program):
+        """
+        Prepares execution of loaded program from its beginning: creates memory with slots for its variables.
+        :param program:
+        :return:
+        """
+        self.loaded = program
+        self.engine = program.engine
+        self.optimize = program.optimize
+        self.program = program.instructions
+        self.labels = program.labels
+        self.ops = program.ops
+        self.compiler = program.compiler
+        self.memoizer = program.memoizer
+        self.program_function = program.program_function
+        self.program_source = program.program_source
+        self.memory = Memory(list(program.global_names), list(program.local_names), self.frame_pool_size)
+        self.call_stack = []
+        self.counter = 0
+        self.pc = 0
+        self.memo_pending = []
 
     def run(self):
         """
-        Interpretation starts on instruction with order set to 1 and then is incremented up to last instructions.
-        Order numbers does not need to go in sequence but they are run in ascending order.
+        Interpretation starts on instruction with the lowest order and continues in ascending order of instructions.
+        Order numbers does not need to go in sequence, program is already compiled into dense list.
         :return:
         """
-        if len(self.instructions) == 0:
-            last_order_number = 0
-        else:
-            last_order_number = max(self.instructions.keys())
-        while self.counter <= last_order_number:
-            self.run_instruction(self.counter)
-            self.counter += 1
+        if self.statistics is not None:
+            self._run_statistics()
+            return
+        if self.budget is not None:
+            self._run_budgeted()
+            return
+        if self.profile:
+            self._run_profiling()
+            return
+        if self.profile_functions:
+            self._run_function_profiling()
+            return
+        if self.report_optimizations:
+            self._run_counting()
+            return
+        if self.program_function is not None:
+            try:
+                self.program_function(self)
+            finally:
+                self.output.flush()
+            return
 
-    def save_labels_and_remove(self):
+        ops = self.ops
+        ops_length = len(ops)
+        counter = self.counter
+        try:
+            while counter < ops_length:
+                counter = ops[counter](self)
+        except InterpretError:
+            # counter still holds index of the failed instruction
+            self.pc = counter
+            raise
+        finally:
+            # also when program is stopped by EXIT
+            self.output.flush()
+        self.counter = counter
+
+    def _run_budgeted(self):
         """
-        Saves all labels from instructions into own dictionary and removes them from instructions dictionary.
+        Same as run, but budgets are checked before the first instruction and then after every interval of
+        instructions returned by the check, the inner loop only counts the interval down.
         :return:
         """
-        for key in list(self.instructions.keys()):
-            instruction = self.instructions[key]
-            if instruction.opcode == 'LABEL':
-                # call method for instruction and remove label instruction from instructions
-                self.method_for_opcode.get('LABEL')(instruction)
-                del self.instructions[key]
+        budget = self.budget
+        ops = budget.wrap(self.program, self.ops)
+        ops_length = len(ops)
+        counter = self.counter
+        executed = 0
+        step = 0
+        budget.start()
+        try:
+            while counter < ops_length:
+                step = 0
+                interval = budget.check(self, executed)
+                for step in range(interval):
+                    if counter >= ops_length:
+                        executed += step
+                        break
+                    counter = ops[counter](self)
+                else:
+                    executed += interval
+        except BudgetExceeded as exceeded:
+            self.pc = counter
+            budget.stop(exceeded, self, executed + step)
+        except InterpretError:
+            self.pc = counter
+            raise
+        finally:
+            self.output.flush()
+        self.counter = counter
 
-    def run_instruction(self, order) -> bool:
+    def _run_statistics(self):
         """
-        Finds correct method which will perform the instruction and executes it.
-        :param order:
+        Same as run, but also counts executed instructions and jumps and observes stacks and frames after flagged
+        instructions (see Statistics.marks). WRITE and READ go through counting wrappers of output and input.
+        Budgets are checked in the same way as by _run_budgeted, if they are set.
+        :return:
+        """
+        statistics = self.statistics
+        budget = self.budget
+        marks = statistics.marks(self.program, self.optimize, self.memoizer.summaries if self.memoizer else [])
+        transitions = statistics.transitions(self.program, self.loaded.tail_calls if self.loaded else {},
+                                             self.compiler.costs if self.optimize else {}, self.optimize)
+        output, input_reader = self.output, self.input_reader
+        self.output, self.input_reader = CountingOutput(output), CountingInputReader(input_reader)
+        call_stack = self.call_stack
+        ops = budget.wrap(self.program, self.ops) if budget is not None else self.ops
+        ops_length = len(ops)
+        counter = self.counter
+        executed = 0
+        jumps = 0
+        tail_calls = 0
+        dispatched = 0  # instructions counted by budget, superinstructions once
+        stopped_before = False
+        # instructions until the next check of budgets, negative value never reaches zero without budgets
+        remaining = -1
+        if budget is not None:
+            budget.start()
+            remaining = 0
+        start = time.perf_counter()
+        try:
+            while counter < ops_length:
+                if not remaining:
+                    remaining = budget.check(self, dispatched)
+                remaining -= 1
+                flags = marks[counter]
+                if flags:
+                    depth = len(call_stack)
+                    next_counter = ops[counter](self)
+                    statistics.observe(self, flags, depth)
+                else:
+                    next_counter = ops[counter](self)
+                dispatched += 1
+                transition = transitions.get((counter, next_counter))
+                if transition is None:
+                    executed += 1
+                    if next_counter != counter + 1 and not (flags & CONTROL and len(call_stack) != depth):
+                        jumps += 1
+                else:
+                    cost, calls, skipped_jumps = transition
+                    executed += cost
+                    if calls:
+                        tail_calls += calls
+                        jumps += skipped_jumps
+                    # fused instructions continue sequentially after all of them
+                    elif next_counter != counter + cost and not (flags & CONTROL and len(call_stack) != depth):
+                        jumps += 1
+                counter = next_counter
+        except BudgetExceeded as exceeded:
+            self.pc = counter
+            # check of budgets stops the program before the instruction
+            stopped_before = not exceeded.in_instruction
+            budget.stop(exceeded, self, dispatched)
+        except InterpretError:
+            self.pc = counter
+            raise
+        finally:
+            self.output.flush()
+            # failed instruction and EXIT are counted too
+            statistics.executed = executed + (counter < ops_length and not stopped_before)
+            statistics.jumps = jumps
+            statistics.calls += tail_calls
+            statistics.bytes_written = self.output.bytes
+            statistics.bytes_read = self.input_reader.bytes
+            statistics.execution_time = time.perf_counter() - start
+            self.output, self.input_reader = output, input_reader
+        self.counter = counter
+
+    def _run_counting(self):
+        """
+        Same as run, but also counts dispatches and instructions which would be executed without optimizations.
+        Report of optimizations is printed to stderr when the program ends.
+        :return:
+        """
+        ops = self.ops
+        ops_length = len(ops)
+        counter = self.counter
+        costs = self.compiler.costs
+        dispatches = 0
+        executed = 0
+        try:
+            while counter < ops_length:
+                next_counter = ops[counter](self)
+                dispatches += 1
+                executed += costs.get((counter, next_counter), 1)
+                counter = next_counter
+        except InterpretError:
+            self.pc = counter
+            raise
+        finally:
+            self.output.flush()
+            print(self.compiler.report(dispatches, executed), file=sys.stderr)
+        self.counter = counter
+
+    def _run_profiling(self):
+        """
+        Same as run, but also measures count and time of executed instructions. Report is printed to stderr (and
+        written to JSON file) when the program ends.
+        :return:
+        """
+        self.profiler = Profiler(self.program)
+        counts = self.profiler.counts
+        times = self.profiler.times
+        clock = time.perf_counter
+        ops = self.ops
+        ops_length = len(ops)
+        counter = self.counter
+        try:
+            while counter < ops_length:
+                # counted before it is executed, so failed instruction and EXIT are counted too
+                counts[counter] += 1
+                start = clock()
+                next_counter = ops[counter](self)
+                times[counter] += clock() - start
+                counter = next_counter
+        except InterpretError:
+            self.pc = counter
+            raise
+        finally:
+            self.output.flush()
+            print(self.profiler.report(), file=sys.stderr)
+            if self.profile_json:
+                self.profiler.write_json(self.profile_json)
+        self.counter = counter
+
+    def _run_function_profiling(self):
+        """
+        Same as run, but also counts executed instructions and reports boundaries of functions to function profiler.
+        Report is printed to stderr (and collapsed stacks written) when the program ends.
         :return:
         """
-        instruction = self.instructions.get(order)
-        if not instruction:
-            return False
-        method = self.method_for_opcode.get(instruction.opcode.upper())
+        profiler = self.function_profiler = FunctionProfiler(self.program, self.labels)
+        boundaries = profiler.boundaries(self.optimize, self.memoizer.summaries if self.memoizer else [])
+        call_stack = self.call_stack
+        ops = self.ops
+        ops_length = len(ops)
+        counter = self.counter
+        executed = 0
+        profiler.start()
+        try:
+            while counter < ops_length:
+                executed += 1
+                if boundaries[counter]:
+                    depth = len(call_stack)
+                    next_counter = ops[counter](self)
+                    profiler.boundary(executed, depth, len(call_stack), counter, next_counter)
+                    counter = next_counter
+                else:
+                    counter = ops[counter](self)
+        except InterpretError:
+            self.pc = counter
+            raise
+        finally:
+            profiler.stop(executed)
+            self.output.flush()
+            print(profiler.report(), file=sys.stderr)
+            if self.flamegraph:
+                profiler.write_flamegraph(self.flamegraph)
+        self.counter = counter
+
+    def run_instruction(self, index) -> int:
+        """
+        Finds correct method which will perform the instruction and executes it.
+        :param index: index of instruction in program
+        :return: index of the next instruction
+        """
+        instruction = self.program[index]
+        self.pc = index
+        self.counter = index + 1
+        if self.method_for_opcode is None:
+            self.method_for_opcode = self._methods_for_opcodes()
+        method = self.method_for_opcode.get(instruction.opcode)
 
         if method:
             method(instruction)
-            return True
+            return self.counter
         else:
             raise InterpretError(InterpretErrorEnum.SEMANTIC_ERR,
                                  "I do not have implementation for " + instruction.opcode)
@@ -145,68 +457,202 @@ class Interpret:
             raise InterpretError(InterpretErrorEnum.NON_EXISTING_VALUE)
         self.counter = self.call_stack.pop()
 
-    def save_label(self, label_name, label_counter):
-        if label_name in self.labels:
-            raise InterpretError(InterpretErrorEnum.SEMANTIC_ERR, f"Redefining label {label_name}")
-        # save current counter
-        self.labels[label_name] = label_counter
-
-    def jump_label(self, label_name):
-        self.does_label_exist(label_name)
-        self.counter = self.labels.get(label_name)
+    def jump(self, instruction: Instruction):
+        self.counter = instruction.target
 
-    def does_label_exist(self, label_name):
-        if label_name not in self.labels:
-            raise InterpretError(InterpretErrorEnum.SEMANTIC_ERR, f"Not defined label {label_name}")
+    def current_order(self) -> int:
+        """
+        Returns order number of the instruction being executed, 0 if no instruction was executed yet.
+        :return:
+        """
+        if self.pc >= len(self.program):
+            return 0
+        return self.program[self.pc].order
 
     def input_one_value(self):
         """
-        Loads one value either from stdin or from file
+        Loads one line of input either from stdin or from file, None at the end of input
         :return:
         """
-        if self.input is None:
-            # from input
-            return input()
-        else:
-            value = self.input.readline()
-            if value == '':
-                return None
-            return value.rstrip("\n")
+        if not self.input_reader.buffered():
+            # reading can wait for user or partner on pipe, which have to see the output before they answer
+            self.output.flush()
+        return self.input_reader.readline()
 
     def __str__(self):
         return f"Interpret: \n Counter: {self.counter}\n Memory: {str(self.memory)}\n Labels: {str(self.labels)}"
 
 
+def run(program: Program, stdin: Optional[TextIO] = None, stdout: Optional[TextIO] = None) -> int:
+    """
+    Executes loaded program by new interpret, program can be executed any number of times without loading it again.
+    :param stdin: input of READ instructions, sys.stdin by default
+    :param stdout: output of WRITE instructions, sys.stdout by default
+    :return: exit code of EXIT instruction, 0 when the program ends after its last instruction
+    :raises InterpretError: when the program fails
+    """
+    interpret = Interpret.from_program(program, stdin, stdout)
+    try:
+        interpret.run()
+    except SystemExit as exit_instruction:
+        return exit_instruction.code
+    return 0
+
+
 def main():
     parser = argparse.ArgumentParser(description='Interprets XML representation of the language IPPCode22')
     parser.add_argument('--source', type=str, help='source file with XML representation of program')
     parser.add_argument('--input', type=str,
                         help='file containing input sequences for the program that is being interpreted')
+    parser.add_argument('--engine', choices=Interpret.ENGINES, default='closure',
+                        help='closure compiled instructions (default), reference implementation by managers or '
+                             'pycompile, which compiles whole program into one python function')
+    parser.add_argument('--cache-dir', type=str,
+                        help='directory for cache of compiled programs, program from --source is compiled only once')
+    parser.add_argument('--output', type=str, help='file for output of the program, stdout by default')
+    parser.add_argument('--optimize', action='store_true',
+                        help='peephole optimizations (jump threading, fused compare and branch) of closure engine')
+    parser.add_argument('--optimize-report', action='store_true',
+                        help='same as --optimize, also prints applied optimizations and number of dispatches to stderr')
+    parser.add_argument('--no-tail-calls', action='store_true',
+                        help='execute every CALL with new return address, also CALL followed by RETURN')
+    parser.add_argument('--frame-pool', type=int, default=FRAME_POOL_SIZE, metavar='SIZE',
+                        help=f'maximum number of discarded frames reused by CREATEFRAME (default {FRAME_POOL_SIZE}), '
+                             '0 allocates every frame')
+    parser.add_argument('--memoize', type=int, default=0, metavar='SIZE',
+                        help='cache up to SIZE results of pure functions (closure engine), 0 disables memoization')
+    parser.add_argument('--memoize-report', action='store_true',
+                        help=f'memoize (default size {MEMO_CACHE_SIZE}) and print statistics of the cache to stderr')
+    parser.add_argument('--profile', action='store_true',
+                        help='print execution counts and time of opcodes and instructions to stderr')
+    parser.add_argument('--profile-json', type=str, metavar='FILE',
+                        help='same as --profile, also writes the profile in JSON to the file')
+    parser.add_argument('--profile-functions', type=float, nargs='?', const=1.0, default=0.0, metavar='RATE',
+                        help='print call graph profile of functions to stderr, only in RATE fraction of runs '
+                             '(chosen randomly, 1 by default)')
+    parser.add_argument('--flamegraph', type=str, metavar='FILE',
+                        help='with --profile-functions, write collapsed stacks for flamegraph tools to the file')
+    parser.add_argument('--max-instructions', type=int, metavar='N',
+                        help='stop the program after N executed instructions (superinstructions of --optimize count '
+                             'once)')
+    parser.add_argument('--timeout', type=float, metavar='SECONDS', help='stop the program after SECONDS of wall time')
+    parser.add_argument('--max-data-stack', type=int, metavar='N', help='stop the program with more than N values on '
+                                                                        'data stack')
+    parser.add_argument('--max-call-stack', type=int, metavar='N', help='stop the program with more than N nested '
+                                                                        'calls')
+    parser.add_argument('--max-frames', type=int, metavar='N',
+                        help='stop the program with more than N local and temporary frames')
+    parser.add_argument('--max-string-length', type=int, metavar='N',
+                        help='stop the program when its variables and data stack hold strings longer than N '
+                             'bytes (UTF-8) in total')
+    parser.add_argument('--stats', type=str, nargs='?', const='-', metavar='FILE',
+                        help='write statistics of consumed resources in JSON to the file (stderr by default) when the '
+                             'program ends')
+    parser.add_argument('--dump-python', type=str, metavar='FILE',
+                        help='write python source generated by pycompile engine to the file')
     args = parser.parse_args()
 
+    interpret = None
     try:
         source_file = None
         input_file = None
 
         if args.source:
-            source_file = open(args.source)
+            source_file = open(args.source, 'rb')
         if args.input:
             input_file = open(args.input)
 
         if source_file == input_file is None:
             raise InterpretError(InterpretErrorEnum.ARG_ERR, "At least one from source/input arguments have to be set.")
+        optimize = args.optimize or args.optimize_report
+        if optimize and args.engine != 'closure':
+            raise InterpretError(InterpretErrorEnum.ARG_ERR, "Optimizations are supported only by closure engine.")
+        if args.frame_pool < 0:
+            raise InterpretError(InterpretErrorEnum.ARG_ERR, "Size of frame pool cannot be negative.")
+        memo_cache_size = args.memoize or (MEMO_CACHE_SIZE if args.memoize_report else 0)
+        if memo_cache_size < 0:
+            raise InterpretError(InterpretErrorEnum.ARG_ERR, "Size of memoization cache cannot be negative.")
+        if memo_cache_size and args.engine != 'closure':
+            raise InterpretError(InterpretErrorEnum.ARG_ERR, "Memoization is supported only by closure engine.")
+        profile = args.profile or args.profile_json is not None
+        if profile and args.engine == 'pycompile':
+            raise InterpretError(InterpretErrorEnum.ARG_ERR, "Profiling is not supported by pycompile engine.")
+        if profile and args.optimize_report:
+            raise InterpretError(InterpretErrorEnum.ARG_ERR, "Profile and report of optimizations are exclusive.")
+        if not 0 <= args.profile_functions <= 1:
+            raise InterpretError(InterpretErrorEnum.ARG_ERR, "Rate of profiled runs has to be between 0 and 1.")
+        profile_functions = random.random() < args.profile_functions
+        if profile_functions and args.engine == 'pycompile':
+            raise InterpretError(InterpretErrorEnum.ARG_ERR, "Profiling is not supported by pycompile engine.")
+        if profile_functions and (profile or args.optimize_report):
+            raise InterpretError(InterpretErrorEnum.ARG_ERR, "Only one profile or report can be collected.")
+        limits = [args.max_instructions, args.timeout, args.max_data_stack, args.max_call_stack, args.max_frames,
+                  args.max_string_length]
+        budget = None
+        if any(limit is not None for limit in limits):
+            if any(limit < 0 for limit in limits if limit is not None):
+                raise InterpretError(InterpretErrorEnum.ARG_ERR, "Budgets of execution cannot be negative.")
+            if args.engine == 'pycompile':
+                raise InterpretError(InterpretErrorEnum.ARG_ERR, "Budgets are not supported by pycompile engine.")
+            if profile or profile_functions or args.optimize_report:
+                raise InterpretError(InterpretErrorEnum.ARG_ERR, "Budgets cannot be combined with profile or report.")
+            budget = Budget(*limits)
+        if args.stats and args.engine == 'pycompile':
+            raise InterpretError(InterpretErrorEnum.ARG_ERR, "Statistics are not supported by pycompile engine.")
+        if args.stats and (profile or profile_functions or args.optimize_report):
+            raise InterpretError(InterpretErrorEnum.ARG_ERR, "Only one profile or report can be collected.")
+        if args.dump_python and args.engine != 'pycompile':
+            raise InterpretError(InterpretErrorEnum.ARG_ERR, "Python source is generated only by pycompile engine.")
 
-        interpret = Interpret(source_file, input_file)
-        interpret.parse_instructions()
-        interpret.save_labels_and_remove()
-        interpret.run()
+        if args.output:
+            output_file = open(args.output, 'w', buffering=OUTPUT_BUFFER_SIZE)
+        else:
+            # stdout is line buffered when it is terminal, WRITE output is written in large blocks instead
+            output_file = open(sys.stdout.fileno(), 'w', buffering=OUTPUT_BUFFER_SIZE, encoding=sys.stdout.encoding,
+                               errors=sys.stdout.errors, closefd=False)
+
+        loader = ProgramLoader(args.engine, ProgramCache(args.cache_dir) if args.cache_dir and source_file else None)
+        loader.optimize = optimize
+        loader.tail_calls = not args.no_tail_calls
+        loader.memo_cache_size = memo_cache_size
+        statistics = Statistics() if args.stats else None
+        try:
+            start = time.perf_counter()
+            try:
+                program = loader.load(source_file)
+            finally:
+                if statistics is not None:
+                    statistics.parse_time = time.perf_counter() - start
+            if args.dump_python:
+                with open(args.dump_python, 'w') as dump_file:
+                    dump_file.write(program.program_source)
+
+            interpret = Interpret.from_program(program, input_file, output_file, args.frame_pool)
+            interpret.profile = profile
+            interpret.profile_json = args.profile_json
+            interpret.profile_functions = profile_functions
+            interpret.flamegraph = args.flamegraph
+            interpret.report_optimizations = args.optimize_report
+            interpret.budget = budget
+            interpret.statistics = statistics
+            try:
+                interpret.run()
+            finally:
+                if args.memoize_report and program.memoizer is not None:
+                    print(program.memoizer.report(), file=sys.stderr)
+        finally:
+            # also when the program is stopped by EXIT or an error
+            if statistics is not None:
+                statistics.write(args.stats)
 
         if source_file:
             source_file.close()
         if input_file:
             input_file.close()
+        output_file.close()
     except InterpretError as err:
-        print(f"Error in instruction {interpret.counter}: ", err)
+        order = interpret.current_order() if interpret else 0
+        print(f"Error in instruction {order}: ", err)
         sys.exit(err.error_type)
 
 
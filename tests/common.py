@@ -0,0 +1,30 @@
+"""
+Helpers of tests, programs are written in IPPcode22 (without header) and executed by interpret.py in a new process.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+from typing import Sequence, Tuple
+
+from benchmarks.workloads import to_xml
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INTERPRET = os.path.join(ROOT, 'interpret.py')
+
+
+def run_interpret(source: str, input: str = '', options: Sequence[str] = (), timeout: float = 60) -> Tuple[str, int]:
+    """
+    Runs interpret.py with the program and its input in files, returns its standard output and exit code.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        source_path = os.path.join(directory, 'source.xml')
+        input_path = os.path.join(directory, 'input.txt')
+        with open(source_path, 'wb') as source_file:
+            source_file.write(to_xml(source))
+        with open(input_path, 'w') as input_file:
+            input_file.write(input)
+        completed = subprocess.run([sys.executable, INTERPRET, '--source', source_path, '--input', input_path,
+                                    *options], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=timeout,
+                                   universal_newlines=True)
+    return completed.stdout, completed.returncode
@@ -0,0 +1,82 @@
+import unittest
+
+from InterpretError import InterpretErrorEnum
+from StringBuffer import StringBuffer, concat, encoded_length, set_char
+from tests.common import run_interpret
+
+# copies of the string read from input are counted only by periodic scan of all values
+READ_AND_COPY = """
+DEFVAR GF@s
+READ GF@s string
+LABEL loop
+PUSHS GF@s
+JUMP loop
+"""
+
+# string of n characters of two bytes built by CONCAT in a buffer, then its first character is replaced by ASCII
+CONCAT_TWO_BYTES = """
+DEFVAR GF@s
+DEFVAR GF@i
+MOVE GF@s string@
+MOVE GF@i int@0
+LABEL loop
+CONCAT GF@s GF@s string@ž
+ADD GF@i GF@i int@1
+JUMPIFNEQ loop GF@i int@{n}
+SETCHAR GF@s int@0 string@z
+STRLEN GF@i GF@s
+WRITE GF@i
+"""
+
+
+class BudgetTest(unittest.TestCase):
+    def test_read_counts_length_of_strings(self):
+        for options in [[], ['--optimize'], ['--engine', 'reference'], ['--stats', '-']]:
+            with self.subTest(options=options):
+                output, exit_code = run_interpret(READ_AND_COPY, 'x' * 1000000 + '\n',
+                                                  ['--max-string-length', '1000', *options])
+                self.assertEqual(exit_code, InterpretErrorEnum.STRING_BUDGET)
+                self.assertTrue(output.startswith('Error in instruction 2: '), output)
+                self.assertIn('executed 2 instructions', output)
+
+    def test_length_of_strings_in_bytes(self):
+        # 400 characters of 3 bytes
+        for options in [[], ['--engine', 'reference']]:
+            with self.subTest(options=options):
+                output, exit_code = run_interpret(READ_AND_COPY, '€' * 400 + '\n', ['--max-string-length', '1000',
+                                                                                     *options])
+                self.assertEqual(exit_code, InterpretErrorEnum.STRING_BUDGET)
+                self.assertTrue(output.startswith('Error in instruction 2: '), output)
+                self.assertIn('strings 1200 bytes', output)
+
+                output, exit_code = run_interpret(CONCAT_TWO_BYTES.format(n=600), '', ['--max-string-length', '1000',
+                                                                                       *options])
+                self.assertEqual(exit_code, InterpretErrorEnum.STRING_BUDGET)
+                self.assertIn('strings 1002 bytes', output)
+                self.assertEqual(run_interpret(CONCAT_TWO_BYTES.format(n=600), '', ['--max-string-length', '1200',
+                                                                                    *options]), ('600', 0))
+
+    def test_encoded_length_of_buffers(self):
+        string = concat('ž' * 200, 'abc' * 100)
+        self.assertIs(type(string), StringBuffer)
+        older = string
+        self.assertEqual(encoded_length(string), 700)
+        string = concat(string, '€')
+        string = set_char(string, 0, 'z')
+        string = set_char(string, 1, '€')
+        self.assertEqual(encoded_length(string), len(str(string).encode()))
+        self.assertEqual(encoded_length(older), 700)
+        self.assertEqual(encoded_length('\udc80x'), 4)
+
+    def test_budgets_do_not_change_output(self):
+        output = run_interpret(READ_AND_COPY.replace('JUMP loop', 'WRITE GF@s'), 'abc\n',
+                               ['--max-string-length', '1000', '--max-instructions', '100'])
+        self.assertEqual(output, ('abc', 0))
+        # value read into the string variable is not a string
+        output = run_interpret(READ_AND_COPY.replace('string', 'int').replace('JUMP loop', 'WRITE GF@s'), '12\n',
+                               ['--max-string-length', '1000'])
+        self.assertEqual(output, ('12', 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
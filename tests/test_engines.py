@@ -0,0 +1,344 @@
+"""
+Differential tests: sample programs executed with every engine and option have to produce the same output and exit
+code as the reference engine (managers, without optimizations).
+"""
+import os
+import tempfile
+import unittest
+
+from benchmarks.workloads import FIB
+from tests.common import run_interpret
+from tests.test_memoizer import FIB_WITH_FRAME_ARGUMENT, INCREMENT_ARGUMENT, TAIL_RECURSIVE_LOOP
+
+ARITHMETIC = """
+DEFVAR GF@i
+DEFVAR GF@sum
+DEFVAR GF@cond
+MOVE GF@i int@0
+MOVE GF@sum int@0
+LABEL loop
+MUL GF@cond GF@i int@3
+ADD GF@sum GF@sum GF@cond
+IDIV GF@cond GF@i int@7
+SUB GF@sum GF@sum GF@cond
+ADD GF@i GF@i int@1
+LT GF@cond GF@i int@100
+JUMPIFEQ loop GF@cond bool@true
+WRITE GF@sum
+WRITE string@\\010
+GT GF@cond GF@sum int@-5
+WRITE GF@cond
+NOT GF@cond GF@cond
+OR GF@cond GF@cond bool@false
+AND GF@cond GF@cond bool@true
+WRITE GF@cond
+EQ GF@cond nil@nil nil@nil
+WRITE GF@cond
+WRITE nil@nil
+MOVE GF@i int@-31
+WRITE GF@i
+IDIV GF@i GF@i int@4
+WRITE GF@i
+"""
+
+# constant branches and unreachable blocks for dataflow optimizations
+CONSTANTS = """
+DEFVAR GF@a
+DEFVAR GF@b
+MOVE GF@a int@2
+ADD GF@b GF@a int@3
+JUMPIFEQ five GF@b int@5
+WRITE string@unreachable
+LABEL five
+MUL GF@a GF@b GF@b
+JUMPIFNEQ end GF@a int@25
+WRITE GF@a
+JUMP end
+WRITE string@dead
+LABEL end
+JUMP last
+LABEL last
+WRITE GF@b
+"""
+
+STRINGS = """
+DEFVAR GF@s
+DEFVAR GF@c
+DEFVAR GF@i
+DEFVAR GF@n
+DEFVAR GF@t
+MOVE GF@s string@
+MOVE GF@i int@0
+LABEL build
+INT2CHAR GF@c GF@i
+ADD GF@n GF@i int@97
+INT2CHAR GF@c GF@n
+CONCAT GF@s GF@s GF@c
+ADD GF@i GF@i int@1
+JUMPIFNEQ build GF@i int@26
+WRITE GF@s
+STRLEN GF@n GF@s
+WRITE GF@n
+MOVE GF@i int@0
+LABEL upper
+GETCHAR GF@c GF@s GF@i
+STRI2INT GF@n GF@s GF@i
+SUB GF@n GF@n int@32
+INT2CHAR GF@c GF@n
+SETCHAR GF@s GF@i GF@c
+ADD GF@i GF@i int@2
+LT GF@t GF@i int@26
+JUMPIFEQ upper GF@t bool@true
+WRITE GF@s
+CONCAT GF@t string@ř\\032a\\035 GF@s
+WRITE GF@t
+TYPE GF@t GF@t
+WRITE GF@t
+TYPE GF@t GF@i
+WRITE GF@t
+DEFVAR GF@u
+TYPE GF@t GF@u
+WRITE GF@t
+WRITE string@|
+"""
+
+INPUT = """
+DEFVAR GF@v
+DEFVAR GF@t
+READ GF@v int
+WRITE GF@v
+READ GF@v int
+TYPE GF@t GF@v
+WRITE GF@t
+READ GF@v bool
+WRITE GF@v
+READ GF@v bool
+WRITE GF@v
+READ GF@v string
+WRITE GF@v
+READ GF@v string
+CONCAT GF@v GF@v string@!
+WRITE GF@v
+READ GF@v int
+WRITE GF@v
+READ GF@v string
+TYPE GF@t GF@v
+WRITE GF@t
+"""
+
+STACK = """
+DEFVAR GF@v
+PUSHS int@7
+PUSHS int@3
+ADDS
+PUSHS int@2
+SUBS
+PUSHS int@4
+MULS
+PUSHS int@3
+IDIVS
+POPS GF@v
+WRITE GF@v
+PUSHS int@1
+PUSHS int@2
+LTS
+PUSHS int@1
+PUSHS int@2
+GTS
+ORS
+PUSHS bool@true
+ANDS
+NOTS
+POPS GF@v
+WRITE GF@v
+PUSHS int@65
+INT2CHARS
+PUSHS string@xyz
+PUSHS int@1
+STRI2INTS
+PUSHS nil@nil
+PUSHS nil@nil
+EQS
+POPS GF@v
+WRITE GF@v
+POPS GF@v
+WRITE GF@v
+POPS GF@v
+WRITE GF@v
+PUSHS int@5
+PUSHS int@5
+JUMPIFEQS equal
+WRITE string@no
+LABEL equal
+PUSHS int@5
+PUSHS int@6
+JUMPIFNEQS different
+WRITE string@no
+LABEL different
+PUSHS int@1
+PUSHS int@2
+CLEARS
+PUSHS string@end
+POPS GF@v
+WRITE GF@v
+"""
+
+FRAMES = """
+DEFVAR GF@r
+CREATEFRAME
+DEFVAR TF@a
+MOVE TF@a int@1
+PUSHFRAME
+CREATEFRAME
+DEFVAR TF@a
+MOVE TF@a int@2
+PUSHFRAME
+WRITE LF@a
+POPFRAME
+WRITE LF@a
+WRITE TF@a
+CREATEFRAME
+DEFVAR TF@b
+MOVE TF@b LF@a
+POPFRAME
+WRITE TF@a
+PUSHS int@3
+CALL twice
+POPS GF@r
+WRITE GF@r
+EXIT int@3
+LABEL twice
+CREATEFRAME
+PUSHFRAME
+DEFVAR LF@x
+POPS LF@x
+ADD LF@x LF@x LF@x
+PUSHS LF@x
+POPFRAME
+RETURN
+"""
+
+# copies of strings are not changed by SETCHAR and CONCAT of the original
+ALIASING = """
+DEFVAR GF@a
+DEFVAR GF@b
+MOVE GF@a string@abc
+MOVE GF@b GF@a
+SETCHAR GF@a int@0 string@x
+CONCAT GF@a GF@a string@d
+WRITE GF@a
+WRITE GF@b
+PUSHS GF@a
+CONCAT GF@a GF@a string@e
+POPS GF@b
+WRITE GF@b
+WRITE GF@a
+CREATEFRAME
+DEFVAR TF@c
+MOVE TF@c GF@a
+PUSHFRAME
+CONCAT LF@c LF@c string@f
+WRITE GF@a
+WRITE LF@c
+"""
+
+# program which fails after output, error code of each one is in comment
+ERRORS = [
+    # 57 division by zero
+    "DEFVAR GF@a\nWRITE string@before\nIDIV GF@a int@1 int@0",
+    # 54 undefined variable
+    "WRITE string@before\nWRITE GF@missing",
+    # 56 uninitialized variable
+    "DEFVAR GF@a\nWRITE string@before\nWRITE GF@a",
+    # 55 missing frame
+    "WRITE string@before\nDEFVAR TF@a",
+    "CREATEFRAME\nPUSHFRAME\nPOPFRAME\nPOPFRAME",
+    # 53 wrong types of operands
+    "DEFVAR GF@a\nADD GF@a int@1 string@x",
+    "DEFVAR GF@a\nMOVE GF@a int@1\nLABEL l\nCONCAT GF@a GF@a string@x\nJUMP l",
+    # 58 wrong index of string
+    "DEFVAR GF@a\nGETCHAR GF@a string@abc int@3",
+    "DEFVAR GF@a\nMOVE GF@a string@abc\nSETCHAR GF@a int@-1 string@x",
+    # 52 redefinition
+    "DEFVAR GF@a\nDEFVAR GF@a",
+    # 56 empty stacks
+    "DEFVAR GF@a\nPOPS GF@a",
+    "RETURN",
+    # 57 wrong exit code and value of INT2CHAR
+    "EXIT int@50",
+    "DEFVAR GF@a\nINT2CHAR GF@a int@-1",
+    # error inside recursion
+    "CALL f\nLABEL f\nCREATEFRAME\nPUSHFRAME\nDEFVAR LF@x\nMOVE LF@x LF@x\nRETURN",
+    # errors inside pure functions, of their second call and inside tail call
+    "CALL f\nEXIT int@0\nLABEL f\nPUSHFRAME\nPOPFRAME\nRETURN",
+    "DEFVAR GF@r\nPUSHS int@2\nCALL f\nPUSHS int@2\nCALL f\nADDS\nPOPS GF@r\nWRITE GF@r\nPUSHS int@0\nCALL f\n"
+    "EXIT int@0\nLABEL f\nCREATEFRAME\nPUSHFRAME\nDEFVAR LF@a\nPOPS LF@a\nPUSHS int@12\nPUSHS LF@a\nIDIVS\n"
+    "POPFRAME\nRETURN",
+    "CREATEFRAME\nPUSHFRAME\nDEFVAR LF@x\nMOVE LF@x int@1\nPUSHS int@6\nCALL f\nLABEL f\nPUSHS LF@x\nIDIVS\n"
+    "CALL g\nRETURN\nLABEL g\nPUSHS int@0\nIDIVS\nRETURN",
+]
+
+SOURCES = {
+    'arithmetic': (ARITHMETIC, ''),
+    'constants': (CONSTANTS, ''),
+    'strings': (STRINGS, ''),
+    'input': (INPUT, '42\nnot a number\ntrue\nTRUE\nline with spaces\n\n-7'),
+    'stack': (STACK, ''),
+    'frames': (FRAMES, ''),
+    'aliasing': (ALIASING, ''),
+    'fib': (FIB.format(n=12), ''),
+    'fib with frame argument': (FIB_WITH_FRAME_ARGUMENT.format(n=12), ''),
+    'increment argument': (INCREMENT_ARGUMENT, ''),
+    'tail recursive loop': (TAIL_RECURSIVE_LOOP, ''),
+    **{f'error {number}': (source, '') for number, source in enumerate(ERRORS, 1)},
+}
+
+BUDGETS = ['--max-instructions', '1000000', '--timeout', '60', '--max-data-stack', '1000', '--max-call-stack', '1000',
+           '--max-frames', '1000', '--max-string-length', '1000000']
+
+# name -> options of interpret.py
+OPTIONS = {
+    'closure': [],
+    'pycompile': ['--engine', 'pycompile'],
+    'optimize': ['--optimize'],
+    'optimize report': ['--optimize-report'],
+    'no tail calls': ['--no-tail-calls'],
+    'optimize without tail calls': ['--optimize', '--no-tail-calls'],
+    'without frame pool': ['--frame-pool', '0'],
+    'memoize': ['--memoize', '100'],
+    'memoize optimized': ['--memoize', '100', '--optimize'],
+    'memoize one result': ['--memoize', '1'],
+    'profile': ['--profile'],
+    'profile functions': ['--profile-functions'],
+    'budgets': BUDGETS,
+    'budgets optimized': ['--optimize', *BUDGETS],
+    'stats': ['--stats', os.devnull],
+    'stats with budgets': ['--stats', os.devnull, '--optimize', *BUDGETS],
+}
+
+
+class EnginesTest(unittest.TestCase):
+    def test_same_results_as_reference_engine(self):
+        for name, (source, input) in SOURCES.items():
+            expected = run_interpret(source, input, ['--engine', 'reference'])
+            for options_name, options in OPTIONS.items():
+                with self.subTest(program=name, options=options_name):
+                    self.assertEqual(run_interpret(source, input, options), expected)
+
+    def test_same_results_from_cache(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for name, (source, input) in SOURCES.items():
+                expected = run_interpret(source, input, ['--engine', 'reference'])
+                for options in [['--cache-dir', directory], ['--cache-dir', directory, '--optimize']]:
+                    with self.subTest(program=name, options=options):
+                        self.assertEqual(run_interpret(source, input, options), expected)
+
+    def test_expected_results(self):
+        # results of the reference engine itself
+        self.assertEqual(run_interpret(*SOURCES['frames'], ['--engine', 'reference']), ('21216', 3))
+        self.assertEqual(run_interpret(*SOURCES['fib'], ['--engine', 'reference']), ('144', 0))
+        self.assertEqual(run_interpret(*SOURCES['stack'], ['--engine', 'reference']), ('10falsetrue121Aend', 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
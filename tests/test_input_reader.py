@@ -0,0 +1,98 @@
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from typing import Iterator
+
+from InputReader import InputReader
+from benchmarks.workloads import to_xml
+from tests.common import INTERPRET
+
+# answers the first line of input
+ANSWER = """
+DEFVAR GF@line
+READ GF@line string
+WRITE GF@line
+WRITE string@\\010
+"""
+
+# answers each line of input until the end of input
+ECHO = """
+DEFVAR GF@line
+DEFVAR GF@type
+LABEL loop
+READ GF@line string
+TYPE GF@type GF@line
+JUMPIFEQ end GF@type string@nil
+WRITE GF@line
+WRITE string@\\010
+JUMP loop
+LABEL end
+"""
+
+
+class InputReaderTest(unittest.TestCase):
+    def test_lines_of_blocks(self):
+        reader = InputReader(io.StringIO("1\nab\r\ncd\n\nlast"), block_size=3)
+        self.assertEqual([reader.readline() for _ in range(6)], ['1', 'ab\r', 'cd', '', 'last', None])
+
+    def test_lines_of_binary_stream(self):
+        # line endings are translated, character can be split between reads
+        stream = io.TextIOWrapper(io.BufferedReader(io.BytesIO("á\r\nžž\rx\n".encode())), encoding='utf-8')
+        reader = InputReader(stream, block_size=1)
+        self.assertEqual([reader.readline() for _ in range(4)], ['á', 'žž', 'x', None])
+
+    def test_answer_of_pipe_before_end_of_input(self):
+        # partner waits for the answer before it writes more lines or closes the pipe
+        with self._start(ANSWER) as process:
+            process.stdin.write('first\n')
+            process.stdin.flush()
+            self.assertEqual(self._readline(process.stdout, 3), 'first\n')
+            self.assertEqual(process.wait(10), 0)
+
+    def test_output_flushed_before_read_of_pipe(self):
+        # partner waits for the answer to each line before it writes the next one
+        with self._start(ECHO) as process:
+            for line in ['first', 'second']:
+                process.stdin.write(line + '\n')
+                process.stdin.flush()
+                self.assertEqual(self._readline(process.stdout, 3), line + '\n')
+            process.stdin.close()
+            self.assertEqual(process.wait(10), 0)
+
+    @staticmethod
+    @contextlib.contextmanager
+    def _start(source: str) -> Iterator[subprocess.Popen]:
+        """
+        Starts interpret.py with the program, its standard input and output are pipes.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            source_path = os.path.join(directory, 'source.xml')
+            with open(source_path, 'wb') as source_file:
+                source_file.write(to_xml(source))
+            process = subprocess.Popen([sys.executable, INTERPRET, '--source', source_path], stdin=subprocess.PIPE,
+                                       stdout=subprocess.PIPE, universal_newlines=True)
+            try:
+                yield process
+            finally:
+                process.kill()
+                process.wait()
+                if not process.stdin.closed:
+                    process.stdin.close()
+                process.stdout.close()
+
+    @staticmethod
+    def _readline(stream, timeout: float) -> str:
+        lines = []
+        reader = threading.Thread(target=lambda: lines.append(stream.readline()), daemon=True)
+        reader.start()
+        reader.join(timeout)
+        return lines[0] if lines else ''
+
+
+if __name__ == '__main__':
+    unittest.main()
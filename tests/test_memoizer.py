@@ -0,0 +1,197 @@
+import io
+import itertools
+import threading
+import unittest
+from typing import Iterator
+
+from Program import ProgramLoader
+from benchmarks.workloads import to_xml
+from interpret import Interpret, run
+from tests.common import run_interpret
+
+# accumulates n + (n - 1) + ... + 1 to acc by tail call, arguments acc and n are passed on data stack
+TAIL_RECURSIVE_LOOP = """
+DEFVAR GF@r
+PUSHS int@3
+PUSHS int@2
+CALL loop
+POPS GF@r
+WRITE GF@r
+WRITE string@\\044
+PUSHS int@0
+PUSHS int@3
+CALL loop
+POPS GF@r
+WRITE GF@r
+WRITE string@\\044
+PUSHS int@10
+PUSHS int@1
+CALL loop
+POPS GF@r
+WRITE GF@r
+WRITE string@\\044
+PUSHS int@0
+PUSHS int@3
+CALL loop
+POPS GF@r
+WRITE GF@r
+EXIT int@0
+LABEL loop
+CREATEFRAME
+PUSHFRAME
+DEFVAR LF@n
+DEFVAR LF@acc
+POPS LF@n
+POPS LF@acc
+JUMPIFEQ end LF@n int@0
+ADD LF@acc LF@acc LF@n
+SUB LF@n LF@n int@1
+PUSHS LF@acc
+PUSHS LF@n
+POPFRAME
+CALL loop
+RETURN
+LABEL end
+PUSHS LF@acc
+POPFRAME
+RETURN
+"""
+
+# argument is passed in temporary frame of the caller, which is pushed by the function and returned with LF@ret
+FIB_WITH_FRAME_ARGUMENT = """
+CREATEFRAME
+DEFVAR TF@n
+MOVE TF@n int@{n}
+CALL fib
+WRITE TF@ret
+EXIT int@0
+LABEL fib
+PUSHFRAME
+DEFVAR LF@ret
+LT LF@ret LF@n int@2
+JUMPIFEQ base LF@ret bool@true
+CREATEFRAME
+DEFVAR TF@n
+SUB TF@n LF@n int@1
+CALL fib
+MOVE LF@ret TF@ret
+CREATEFRAME
+DEFVAR TF@n
+SUB TF@n LF@n int@2
+CALL fib
+ADD LF@ret LF@ret TF@ret
+POPFRAME
+RETURN
+LABEL base
+MOVE LF@ret LF@n
+POPFRAME
+RETURN
+"""
+
+# function increments variable in temporary frame of the caller
+INCREMENT_ARGUMENT = """
+CREATEFRAME
+DEFVAR TF@n
+MOVE TF@n int@1
+CALL inc
+WRITE TF@n
+MOVE TF@n int@1
+CALL inc
+WRITE TF@n
+CALL inc
+WRITE TF@n
+EXIT int@0
+LABEL inc
+ADD TF@n TF@n int@1
+RETURN
+"""
+
+# fib of number from input, argument and result are passed on data stack
+FIB_OF_INPUT = """
+DEFVAR GF@n
+READ GF@n int
+PUSHS GF@n
+CALL fib
+POPS GF@n
+WRITE GF@n
+EXIT int@0
+LABEL fib
+CREATEFRAME
+PUSHFRAME
+DEFVAR LF@n
+DEFVAR LF@c
+POPS LF@n
+LT LF@c LF@n int@2
+JUMPIFEQ base LF@c bool@true
+SUB LF@c LF@n int@1
+PUSHS LF@c
+CALL fib
+SUB LF@c LF@n int@2
+PUSHS LF@c
+CALL fib
+ADDS
+POPFRAME
+RETURN
+LABEL base
+PUSHS LF@n
+POPFRAME
+RETURN
+"""
+
+
+class MemoizerTest(unittest.TestCase):
+    def test_hit_inside_tail_call_chain(self):
+        # cached result of inner call ends outer calls of the chain, which entered it by JUMP
+        for options in [[], ['--optimize'], ['--no-tail-calls']]:
+            with self.subTest(options=options):
+                self.assertEqual(run_interpret(TAIL_RECURSIVE_LOOP, options=['--memoize', '100', *options]),
+                                 ('6,6,11,6', 0))
+
+    def test_arguments_in_temporary_frame(self):
+        for source, output in [(FIB_WITH_FRAME_ARGUMENT.format(n=20), '6765'), (INCREMENT_ARGUMENT, '223')]:
+            loader = ProgramLoader()
+            loader.memo_cache_size = 100
+            summary, = loader.load(io.BytesIO(to_xml(source))).memoizer.summaries.values()
+            self.assertTrue(summary.uses_temp_frame)
+            for options in [['--memoize', '100'], ['--memoize', '100', '--optimize'], ['--memoize', '1']]:
+                with self.subTest(output=output, options=options):
+                    self.assertEqual(run_interpret(source, options=options), (output, 0))
+
+    def test_overlapping_executions_of_program(self):
+        loader = ProgramLoader()
+        loader.memo_cache_size = 100
+        program = loader.load(io.BytesIO(to_xml(FIB_OF_INPUT)))
+        interprets = [Interpret.from_program(program, io.StringIO(f"{n}\n"), io.StringIO()) for n in [15, 12, 20]]
+        # executions alternate after every instruction
+        for _ in itertools.zip_longest(*map(self._steps, interprets)):
+            pass
+        self.assertEqual([interpret.output.getvalue() for interpret in interprets], ['610', '144', '6765'])
+        self.assertGreater(program.memoizer.hits, 0)
+
+    def test_executions_of_program_in_threads(self):
+        loader = ProgramLoader()
+        loader.memo_cache_size = 10
+        program = loader.load(io.BytesIO(to_xml(FIB_OF_INPUT)))
+        outputs = [io.StringIO() for _ in range(8)]
+        threads = [threading.Thread(target=run, args=(program, io.StringIO(f"{10 + number % 4 * 5}\n"), output))
+                   for number, output in enumerate(outputs)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([output.getvalue() for output in outputs], ['55', '610', '6765', '75025'] * 2)
+
+    @staticmethod
+    def _steps(interpret: Interpret) -> Iterator[None]:
+        ops = interpret.ops
+        counter = 0
+        try:
+            while counter < len(ops):
+                counter = ops[counter](interpret)
+                yield
+        except SystemExit:
+            pass
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import hashlib
+import io
+import marshal
+import os
+import random
+import struct
+import tempfile
+import unittest
+
+from Program import ProgramLoader
+from ProgramCache import ProgramCache
+from benchmarks.workloads import to_xml
+from tests.common import run_interpret
+
+SOURCE = """
+DEFVAR GF@i
+MOVE GF@i int@3
+LABEL loop
+WRITE GF@i
+SUB GF@i GF@i int@1
+JUMPIFNEQ loop GF@i int@0
+"""
+
+
+class ProgramCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = ProgramCache(self.directory.name)
+        source = to_xml(SOURCE)
+        self.key = self.cache.key(source)
+        self.cache.store(self.key, ProgramLoader.compile_program(ProgramLoader.parse_instructions(io.BytesIO(source))))
+        with open(self._path(), 'rb') as file:
+            self.entry = file.read()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _path(self) -> str:
+        return os.path.join(self.directory.name, self.key + '.ippc')
+
+    def _write(self, entry: bytes):
+        with open(self._path(), 'wb') as file:
+            file.write(entry)
+
+    def test_stored_entry_is_loaded(self):
+        program, labels, global_names, local_names = self.cache.load(self.key)
+        self.assertEqual([instruction.opcode for instruction in program], ['DEFVAR', 'MOVE', 'WRITE', 'SUB',
+                                                                            'JUMPIFNEQ'])
+        self.assertEqual(labels, {'loop': 2})
+        self.assertEqual(global_names, ['i'])
+
+    def test_corrupted_entries_are_misses(self):
+        generator = random.Random(0)
+        for _ in range(200):
+            entry = bytearray(self.entry)
+            for _ in range(generator.randint(1, 4)):
+                position = generator.randrange(len(ProgramCache.HEADER), len(entry))
+                entry[position] = (entry[position] + generator.randint(1, 255)) % 256
+            self._write(bytes(entry))
+            self.assertIsNone(self.cache.load(self.key))
+        for length in range(0, len(self.entry), 7):
+            self._write(self.entry[:length])
+            self.assertIsNone(self.cache.load(self.key))
+
+    def test_entries_which_are_not_programs_are_misses(self):
+        # digests match, marshal fails by MemoryError or the content is not a program
+        for payload in [b'[' + struct.pack('<i', 0x7fffffff), marshal.dumps((self.key, {}, [], [], [('MOVE',)])),
+                        marshal.dumps(None)]:
+            self._write(ProgramCache.HEADER + hashlib.sha256(payload).digest() + payload)
+            self.assertIsNone(self.cache.load(self.key))
+
+    def test_interpret_compiles_corrupted_entry_again(self):
+        payload = b'[' + struct.pack('<i', 0x7fffffff)
+        self._write(ProgramCache.HEADER + hashlib.sha256(payload).digest() + payload)
+        self.assertEqual(run_interpret(SOURCE, options=['--cache-dir', self.directory.name]), ('321', 0))
+        with open(self._path(), 'rb') as file:
+            self.assertEqual(file.read(), self.entry)
+
+
+if __name__ == '__main__':
+    unittest.main()
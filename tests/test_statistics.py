@@ -0,0 +1,85 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from typing import Any, Dict, Sequence
+
+from tests.common import run_interpret
+
+# every call defines three variables in its frame, recursion is not a tail call
+DEEP_RECURSION = """
+DEFVAR GF@n
+MOVE GF@n int@0
+CALL f
+WRITE GF@n
+EXIT int@0
+LABEL f
+CREATEFRAME
+DEFVAR TF@a
+DEFVAR TF@b
+DEFVAR TF@c
+PUSHFRAME
+ADD GF@n GF@n int@1
+JUMPIFEQ end GF@n int@{depth}
+CALL f
+LABEL end
+POPFRAME
+RETURN
+"""
+
+
+class StatisticsTest(unittest.TestCase):
+    @staticmethod
+    def _statistics(source: str, options: Sequence[str] = ()) -> Dict[str, Any]:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'stats.json')
+            run_interpret(source, options=['--stats', path, *options])
+            with open(path) as file:
+                return json.load(file)
+
+    def test_deep_recursion(self):
+        for options in [[], ['--optimize']]:
+            with self.subTest(options=options):
+                start = time.perf_counter()
+                statistics = self._statistics(DEEP_RECURSION.format(depth=20000), options)
+                self.assertLess(time.perf_counter() - start, 10)
+                self.assertEqual(statistics['max_live_variables'], 1 + 3 * 20000)
+                self.assertEqual(statistics['max_call_stack'], 20000)
+                self.assertEqual(statistics['max_local_frames'], 20000)
+
+    def test_variables_of_popped_frames(self):
+        # frame popped and pushed again between observations keeps its count, temporary frame is discarded
+        source = """
+CREATEFRAME
+DEFVAR TF@a
+PUSHFRAME
+CREATEFRAME
+DEFVAR TF@b
+DEFVAR TF@c
+PUSHFRAME
+CREATEFRAME
+DEFVAR TF@a
+DEFVAR TF@b
+DEFVAR TF@c
+POPFRAME
+PUSHFRAME
+DEFVAR LF@a
+DEFVAR LF@d
+DEFVAR LF@e
+"""
+        self.assertEqual(self._statistics(source)['max_live_variables'], 1 + 5)
+        self.assertEqual(self._statistics(source.replace('DEFVAR LF@e\n', ''))['max_live_variables'], 1 + 2 + 3)
+
+    def test_tail_calls_do_not_change_counts(self):
+        source = DEEP_RECURSION.format(depth=50).replace('CALL f\nLABEL end\nPOPFRAME', 'POPFRAME\nCALL f\nLABEL end')
+        with_tail_calls = self._statistics(source)
+        without_tail_calls = self._statistics(source, ['--no-tail-calls'])
+        for name in ['instructions_executed', 'jumps_taken', 'calls', 'max_live_variables']:
+            self.assertEqual(with_tail_calls[name], without_tail_calls[name], name)
+        self.assertEqual(with_tail_calls['max_call_stack'], 1)
+        self.assertEqual(without_tail_calls['max_call_stack'], 50)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,24 @@
+import unittest
+
+from Symbol import SymbolType, decode_string
+from Value import ValueType, NIL_VALUE, from_input
+
+
+class FromInputTest(unittest.TestCase):
+    def test_strings_are_not_memoized_as_literals(self):
+        decode_string('literal\\032of\\032program')
+        cached = decode_string.cache_info().currsize
+        values = [from_input(SymbolType.STRING, f"line\\032{number}") for number in range(100)]
+        self.assertEqual(values[7], (ValueType.STRING, 'line 7'))
+        self.assertEqual(decode_string.cache_info().currsize, cached)
+
+    def test_values_of_types(self):
+        self.assertEqual(from_input(SymbolType.STRING, ''), (ValueType.STRING, ''))
+        self.assertEqual(from_input(SymbolType.INT, '-12'), (ValueType.INT, -12))
+        self.assertEqual(from_input(SymbolType.INT, 'x'), NIL_VALUE)
+        self.assertEqual(from_input(SymbolType.BOOL, 'TRUE')[1], True)
+        self.assertEqual(from_input(SymbolType.STRING, None), NIL_VALUE)
+
+
+if __name__ == '__main__':
+    unittest.main()